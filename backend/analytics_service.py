@@ -0,0 +1,493 @@
+"""
+Analytics Service - Write-behind aggregation of analytics counters
+Batches counter increments in memory and flushes them to MongoDB with a single $inc,
+keeping time-bucketed (minute/hour/day) rollups for time-series queries.
+Blog view counts are buffered the same way and written with one bulk_write per flush.
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+from bson import Binary
+from pymongo import UpdateOne
+
+from database import (
+    analytics_collection, analytics_buckets_collection, analytics_hll_collection,
+    blogs_collection, is_mongodb_available
+)
+from hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+# Pending increments are flushed at least this often...
+FLUSH_INTERVAL_SECONDS = float(os.getenv('ANALYTICS_FLUSH_INTERVAL', '5'))
+# ...or as soon as this many increments are waiting. Together they bound how many
+# events a crashed worker can lose.
+MAX_PENDING_EVENTS = int(os.getenv('ANALYTICS_MAX_PENDING', '500'))
+# How often minute buckets are rolled up into hour and day buckets
+ROLLUP_INTERVAL_SECONDS = float(os.getenv('ANALYTICS_ROLLUP_INTERVAL', '60'))
+# Minute buckets are only needed for recent charts and rollups; MongoDB expires them
+MINUTE_RETENTION_DAYS = int(os.getenv('ANALYTICS_MINUTE_RETENTION_DAYS', '7'))
+# How long the merged all-time unique visitor estimate is reused
+UNIQUE_VISITORS_CACHE_SECONDS = float(os.getenv('ANALYTICS_UNIQUE_CACHE_SECONDS', '60'))
+
+# Each worker process writes its own daily sketch; readers merge them
+WORKER_ID = uuid.uuid4().hex
+
+GRANULARITIES = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1)
+}
+
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Truncate a UTC timestamp to the start of its minute/hour/day bucket"""
+    if granularity == "minute":
+        return moment.replace(second=0, microsecond=0)
+    if granularity == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    if granularity == "day":
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    raise ValueError(f"Unknown granularity: {granularity}")
+
+
+class AnalyticsService:
+    """In-memory counter aggregator flushed periodically to the analytics collections"""
+
+    def __init__(
+        self,
+        collection=None,
+        buckets_collection=None,
+        hll_collection=None,
+        views_collection=None,
+        flush_interval: float = FLUSH_INTERVAL_SECONDS,
+        max_pending: int = MAX_PENDING_EVENTS,
+        rollup_interval: float = ROLLUP_INTERVAL_SECONDS
+    ):
+        """
+        Args:
+            collection: Analytics collection holding the single all-time counters document
+            buckets_collection: Collection of time-bucketed counter documents
+            hll_collection: Collection of daily unique-visitor sketches (one per worker and day)
+            views_collection: Collection of documents with a `views` counter, keyed by `id` (blog posts)
+            flush_interval: Seconds between background flushes
+            max_pending: Pending increments that trigger an early flush
+            rollup_interval: Seconds between hour/day rollups
+        """
+        self.collection = collection
+        self.buckets_collection = buckets_collection
+        self.hll_collection = hll_collection
+        self.views_collection = views_collection
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.rollup_interval = rollup_interval
+        self._pending: Counter = Counter()
+        # (minute bucket, field) -> amount
+        self._pending_buckets: Counter = Counter()
+        self._pending_events = 0
+        # document id -> views not yet written
+        self._pending_views: Counter = Counter()
+        # document id -> views this worker has written since it started
+        self._flushed_views: Counter = Counter()
+        # Hours whose minute buckets changed since the last rollup
+        self._dirty_hours: Set[datetime] = set()
+        # This worker's unique-visitor sketches per day, and the days changed since the last flush
+        self._sketches: Dict[datetime, HyperLogLog] = {}
+        self._dirty_days: Set[datetime] = set()
+        self._unique_cache: Optional[tuple] = None
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._rollup_task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.rollups = 0
+        self.last_flush: Optional[str] = None
+        self.last_rollup: Optional[str] = None
+
+    def increment(self, field: str, amount: int = 1) -> None:
+        """
+        Record a counter increment; never touches the database
+
+        Args:
+            field: Counter field in the analytics document (e.g. 'total_visits')
+            amount: Amount to add
+        """
+        self._pending[field] += amount
+        self._pending_buckets[(bucket_start(datetime.utcnow(), "minute"), field)] += amount
+        self._pending_events += 1
+        if self._pending_events >= self.max_pending:
+            self._wakeup.set()
+
+    def record_view(self, doc_id: str) -> None:
+        """
+        Record a view of a blog post; never touches the database
+
+        Args:
+            doc_id: The post's `id`
+        """
+        self._pending_views[doc_id] += 1
+        self._pending_events += 1
+        if self._pending_events >= self.max_pending:
+            self._wakeup.set()
+
+    def recorded_views(self, doc_id: str) -> int:
+        """Return every view of a post recorded by this worker, written or not"""
+        return self._flushed_views.get(doc_id, 0) + self._pending_views.get(doc_id, 0)
+
+    def add_visitor(self, visitor_key: str) -> None:
+        """
+        Record a visitor in today's unique-visitor sketch; never touches the database
+
+        Args:
+            visitor_key: Stable identifier for the visitor (hashed, never stored)
+        """
+        day = bucket_start(datetime.utcnow(), "day")
+        sketch = self._sketches.get(day)
+        if sketch is None:
+            sketch = self._sketches[day] = HyperLogLog()
+        if sketch.add(visitor_key):
+            self._dirty_days.add(day)
+
+    def pending(self) -> Dict[str, int]:
+        """Return the increments not yet written to MongoDB"""
+        return dict(self._pending)
+
+    async def flush(self) -> Dict[str, int]:
+        """
+        Write all pending increments: one $inc on the totals document plus one
+        upsert per touched minute bucket
+
+        Returns:
+            The increments that were written (empty if nothing was pending or the write failed)
+        """
+        async with self._flush_lock:
+            await self._write_sketches()
+            await self._write_views()
+            self._pending_events = sum(self._pending_views.values())
+
+            if not self._pending and not self._pending_buckets:
+                return {}
+
+            batch = dict(self._pending)
+            bucket_batch = dict(self._pending_buckets)
+            self._pending.clear()
+            self._pending_buckets.clear()
+
+            if self.collection is None or not is_mongodb_available():
+                self._restore(batch, bucket_batch)
+                return {}
+
+            try:
+                if batch:
+                    await self.collection.update_one(
+                        {},
+                        {
+                            "$inc": batch,
+                            "$set": {"last_updated": datetime.utcnow().isoformat()}
+                        },
+                        upsert=True
+                    )
+            except Exception as e:
+                logger.error(f"Failed to flush analytics counters: {e}")
+                self.failed_flushes += 1
+                self._restore(batch, bucket_batch)
+                return {}
+
+            try:
+                await self._write_minute_buckets(bucket_batch)
+            except Exception as e:
+                # Totals are already written; only retry the buckets
+                logger.error(f"Failed to flush analytics buckets: {e}")
+                self.failed_flushes += 1
+                self._restore({}, bucket_batch)
+
+            self.flushes += 1
+            self.last_flush = datetime.utcnow().isoformat()
+            return batch
+
+    async def _write_minute_buckets(self, bucket_batch: Dict) -> None:
+        """Upsert the pending increments into their minute bucket documents"""
+        if not bucket_batch or self.buckets_collection is None:
+            return
+
+        per_minute: Dict[datetime, Dict[str, int]] = {}
+        for (minute, field), amount in bucket_batch.items():
+            per_minute.setdefault(minute, {})[f"counts.{field}"] = amount
+
+        operations = [
+            UpdateOne(
+                {"granularity": "minute", "bucket": minute},
+                {
+                    "$inc": increments,
+                    "$setOnInsert": {"expires_at": minute + timedelta(days=MINUTE_RETENTION_DAYS)}
+                },
+                upsert=True
+            )
+            for minute, increments in per_minute.items()
+        ]
+        await self.buckets_collection.bulk_write(operations, ordered=False)
+        self._dirty_hours.update(bucket_start(minute, "hour") for minute in per_minute)
+
+    async def _write_views(self) -> None:
+        """Add the buffered view counts to their posts with one unordered bulk_write"""
+        if not self._pending_views or self.views_collection is None or not is_mongodb_available():
+            return
+
+        views = dict(self._pending_views)
+        self._pending_views.clear()
+        try:
+            await self.views_collection.bulk_write([
+                UpdateOne({"id": doc_id}, {"$inc": {"views": amount}})
+                for doc_id, amount in views.items()
+            ], ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to flush blog views: {e}")
+            self.failed_flushes += 1
+            for doc_id, amount in views.items():
+                self._pending_views[doc_id] += amount
+            return
+        self._flushed_views.update(views)
+
+    async def _write_sketches(self) -> None:
+        """Store this worker's changed daily sketches and forget days that are over"""
+        if not self._dirty_days or self.hll_collection is None or not is_mongodb_available():
+            return
+
+        days = self._dirty_days
+        self._dirty_days = set()
+        try:
+            await self.hll_collection.bulk_write([
+                UpdateOne(
+                    {"day": day, "worker": WORKER_ID},
+                    {"$set": {
+                        "registers": Binary(self._sketches[day].to_bytes()),
+                        "updated_at": datetime.utcnow()
+                    }},
+                    upsert=True
+                )
+                for day in days
+            ], ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to flush unique visitor sketches: {e}")
+            self._dirty_days |= days
+            return
+
+        today = bucket_start(datetime.utcnow(), "day")
+        for day in [d for d in self._sketches if d < today and d not in self._dirty_days]:
+            del self._sketches[day]
+
+    async def _merged_sketch(self, query: Dict, days: Optional[Set[datetime]] = None) -> Dict[datetime, HyperLogLog]:
+        """Merge stored sketches (all workers) with this worker's unflushed ones, per day"""
+        per_day: Dict[datetime, HyperLogLog] = {}
+        if self.hll_collection is not None and is_mongodb_available():
+            async for doc in self.hll_collection.find(query, {"_id": 0, "day": 1, "registers": 1}):
+                sketch = per_day.setdefault(doc["day"], HyperLogLog())
+                sketch.merge(HyperLogLog(registers=bytes(doc["registers"])))
+        for day, sketch in self._sketches.items():
+            if days is None or day in days:
+                per_day.setdefault(day, HyperLogLog()).merge(sketch)
+        return per_day
+
+    async def unique_visitors(self) -> int:
+        """Estimate all-time unique visitors by merging every daily sketch"""
+        if self._unique_cache and self._unique_cache[0] > time.monotonic():
+            return self._unique_cache[1]
+
+        total = HyperLogLog()
+        for sketch in (await self._merged_sketch({})).values():
+            total.merge(sketch)
+        value = total.count()
+        self._unique_cache = (time.monotonic() + UNIQUE_VISITORS_CACHE_SECONDS, value)
+        return value
+
+    async def unique_visitors_timeseries(self, start: datetime, end: datetime) -> Dict:
+        """
+        Estimate unique visitors per day and over the whole range
+
+        Args:
+            start: Inclusive UTC start
+            end: Exclusive UTC end
+
+        Returns:
+            {"points": [{"bucket", "value"}], "total": distinct visitors across the range}
+        """
+        first = bucket_start(start, "day")
+        days = set()
+        current = first
+        while current < end:
+            days.add(current)
+            current += GRANULARITIES["day"]
+
+        per_day = await self._merged_sketch({"day": {"$gte": first, "$lt": end}}, days)
+        total = HyperLogLog()
+        points = []
+        for day in sorted(days):
+            sketch = per_day.get(day)
+            points.append({"bucket": day.isoformat(), "value": sketch.count() if sketch else 0})
+            if sketch:
+                total.merge(sketch)
+        return {"points": points, "total": total.count()}
+
+    def _restore(self, batch: Dict[str, int], bucket_batch: Dict) -> None:
+        """Put a batch that could not be written back in front of newer increments"""
+        for field, amount in batch.items():
+            self._pending[field] += amount
+        for key, amount in bucket_batch.items():
+            self._pending_buckets[key] += amount
+
+    async def _recompute_bucket(self, granularity: str, start: datetime, source: str) -> None:
+        """Rebuild one rollup bucket from the finer buckets it covers"""
+        end = start + GRANULARITIES[granularity]
+        pipeline = [
+            {"$match": {"granularity": source, "bucket": {"$gte": start, "$lt": end}}},
+            {"$project": {"counts": {"$objectToArray": "$counts"}}},
+            {"$unwind": "$counts"},
+            {"$group": {"_id": "$counts.k", "total": {"$sum": "$counts.v"}}}
+        ]
+        rows = await self.buckets_collection.aggregate(pipeline).to_list(length=None)
+        counts = {row["_id"]: row["total"] for row in rows}
+        # A full recompute (not $inc) keeps rollups idempotent across workers
+        await self.buckets_collection.update_one(
+            {"granularity": granularity, "bucket": start},
+            {"$set": {"counts": counts, "rolled_up_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    async def rollup(self) -> int:
+        """
+        Recompute the hour and day buckets touched since the last rollup
+
+        Returns:
+            Number of hour buckets recomputed
+        """
+        if self.buckets_collection is None or not is_mongodb_available():
+            return 0
+
+        # Always include the current hour so rollups written by another worker catch up
+        hours = self._dirty_hours | {bucket_start(datetime.utcnow(), "hour")}
+        self._dirty_hours = set()
+        try:
+            for hour in sorted(hours):
+                await self._recompute_bucket("hour", hour, "minute")
+            for day in sorted({bucket_start(hour, "day") for hour in hours}):
+                await self._recompute_bucket("day", day, "hour")
+        except Exception as e:
+            logger.error(f"Analytics rollup failed: {e}")
+            self._dirty_hours |= hours
+            return 0
+
+        self.rollups += 1
+        self.last_rollup = datetime.utcnow().isoformat()
+        return len(hours)
+
+    async def timeseries(
+        self,
+        metric: str,
+        granularity: str,
+        start: datetime,
+        end: datetime
+    ) -> List[Dict]:
+        """
+        Read a metric from the precomputed buckets, one point per bucket
+
+        Args:
+            metric: Counter field (e.g. 'total_visits')
+            granularity: 'minute', 'hour' or 'day'
+            start: Inclusive UTC start
+            end: Exclusive UTC end
+
+        Returns:
+            List of {"bucket": ISO timestamp, "value": count}, zero-filled
+        """
+        step = GRANULARITIES[granularity]
+        first = bucket_start(start, granularity)
+
+        values: Dict[datetime, int] = {}
+        if self.buckets_collection is not None and is_mongodb_available():
+            cursor = self.buckets_collection.find(
+                {"granularity": granularity, "bucket": {"$gte": first, "$lt": end}},
+                {"_id": 0, "bucket": 1, f"counts.{metric}": 1}
+            )
+            async for doc in cursor:
+                values[doc["bucket"]] = doc.get("counts", {}).get(metric, 0)
+
+        points = []
+        current = first
+        while current < end:
+            points.append({"bucket": current.isoformat(), "value": values.get(current, 0)})
+            current += step
+        return points
+
+    async def _run(self) -> None:
+        """Background loop flushing on the interval or when the pending bound is hit"""
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _run_rollups(self) -> None:
+        """Background loop rolling minute buckets up into hours and days"""
+        while True:
+            await asyncio.sleep(self.rollup_interval)
+            await self.rollup()
+
+    def start(self) -> None:
+        """Start the background flush and rollup loops (call on app startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._rollup_task is None:
+            self._rollup_task = asyncio.create_task(self._run_rollups())
+
+    async def stop(self) -> None:
+        """Stop the background loops and write whatever is still pending (call on app shutdown)"""
+        for task in (self._task, self._rollup_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._rollup_task = None
+        await self.flush()
+        await self.rollup()
+
+    def stats(self) -> Dict:
+        """Return flush statistics for the admin dashboard"""
+        return {
+            "pending": self.pending(),
+            "pending_views": sum(self._pending_views.values()),
+            "flush_interval_seconds": self.flush_interval,
+            "max_pending_events": self.max_pending,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "last_flush": self.last_flush,
+            "rollup_interval_seconds": self.rollup_interval,
+            "rollups": self.rollups,
+            "last_rollup": self.last_rollup
+        }
+
+
+# Global analytics service instance
+_analytics_service = None
+
+def get_analytics_service() -> AnalyticsService:
+    """Get or create the global analytics service instance"""
+    global _analytics_service
+    if _analytics_service is None:
+        _analytics_service = AnalyticsService(
+            analytics_collection, analytics_buckets_collection, analytics_hll_collection,
+            blogs_collection
+        )
+    return _analytics_service
@@ -0,0 +1,208 @@
+"""
+Cache Service - In-process read-through cache for portfolio content
+Serves the public GET endpoints from memory and is invalidated by the admin write handlers
+"""
+
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Entries expire after this many seconds even without an explicit invalidation.
+# This also bounds how stale another uvicorn worker can be after an admin edit.
+DEFAULT_TTL_SECONDS = float(os.getenv('CACHE_TTL_SECONDS', '60'))
+DEFAULT_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', '256'))
+
+
+class CacheService:
+    """TTL + LRU cache keyed by (collection, variant)"""
+
+    def __init__(self, ttl_seconds: float = DEFAULT_TTL_SECONDS, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            ttl_seconds: Lifetime of an entry in seconds
+            max_entries: Maximum number of entries before least recently used ones are evicted
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        # Per-key load locks with the number of requests using them; dropped when unused,
+        # so keys that are never cached (e.g. lookups of missing posts) leave nothing behind
+        self._locks: Dict[Tuple[str, Hashable], List] = {}
+        # Bumped on every invalidation so a load that raced with a write is not stored
+        self._generations: Dict[str, int] = {}
+        # Derived entries (e.g. the portfolio snapshot) dropped along with their sources
+        self._dependents: Dict[str, Set[str]] = {}
+        # Callbacks run after their collections are invalidated (e.g. background re-renders)
+        self._listeners: Dict[str, List[Callable[[Set[str]], None]]] = {}
+        # Content version, bumped on every invalidation
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, collection: str, variant: Hashable = None) -> Optional[Any]:
+        """
+        Return a cached value, or None if missing or expired
+
+        Args:
+            collection: Collection name the value was read from
+            variant: Optional sub-key (e.g. query parameters)
+        """
+        key = (collection, variant)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, collection: str, value: Any, variant: Hashable = None) -> None:
+        """Store a value, evicting the least recently used entries if over capacity"""
+        key = (collection, variant)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        collection: str,
+        loader: Callable[[], Awaitable[Any]],
+        variant: Hashable = None
+    ) -> Any:
+        """
+        Return the cached value or load it once, even under concurrent misses
+
+        Cached values are shared between requests and must be treated as read-only.
+
+        Args:
+            collection: Collection name the value is read from
+            loader: Coroutine function producing the value on a miss
+            variant: Optional sub-key (e.g. query parameters)
+
+        Returns:
+            The cached or freshly loaded value
+        """
+        value = self.get(collection, variant)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        key = (collection, variant)
+        slot = self._locks.get(key)
+        if slot is None:
+            slot = self._locks[key] = [asyncio.Lock(), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                # Another request may have filled the entry while we waited
+                value = self.get(collection, variant)
+                if value is not None:
+                    self.hits += 1
+                    return value
+
+                self.misses += 1
+                generation = self._generations.get(collection, 0)
+                value = await loader()
+                if value is not None and self._generations.get(collection, 0) == generation:
+                    self.set(collection, value, variant)
+                return value
+        finally:
+            slot[1] -= 1
+            if slot[1] == 0:
+                del self._locks[key]
+
+    def generation(self, collection: str) -> int:
+        """Invalidation counter of a collection; it changes whenever the collection's entries are dropped"""
+        return self._generations.get(collection, 0)
+
+    def depends_on(self, derived: str, *collections: str) -> None:
+        """
+        Declare that a derived entry is built from other collections
+
+        Args:
+            derived: Cache name of the derived entry
+            collections: Collections whose invalidation also invalidates the derived entry
+        """
+        for collection in collections:
+            self._dependents.setdefault(collection, set()).add(derived)
+
+    def subscribe(self, listener: Callable[[Set[str]], None], *collections: str) -> None:
+        """
+        Call a function after any of the given collections is invalidated
+
+        Args:
+            listener: Called synchronously with the set of invalidated collections;
+                it must not block (schedule async work instead)
+            collections: Collections to watch
+        """
+        for collection in collections:
+            self._listeners.setdefault(collection, []).append(listener)
+
+    def invalidate(self, *collections: str) -> None:
+        """Drop every cached entry (all variants) for the given collections and their dependents"""
+        pending = list(collections)
+        seen = set()
+        while pending:
+            collection = pending.pop()
+            if collection in seen:
+                continue
+            seen.add(collection)
+            self._generations[collection] = self._generations.get(collection, 0) + 1
+            for key in [k for k in self._entries if k[0] == collection]:
+                del self._entries[key]
+            pending.extend(self._dependents.get(collection, ()))
+        self.version += 1
+        logger.debug(f"Cache invalidated for {', '.join(sorted(seen))}")
+
+        notified = []
+        for collection in seen:
+            for listener in self._listeners.get(collection, ()):
+                if listener not in notified:
+                    notified.append(listener)
+        for listener in notified:
+            try:
+                listener(seen)
+            except Exception as e:
+                logger.error(f"Cache invalidation listener failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every cached entry"""
+        self.invalidate(*{k[0] for k in self._entries})
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the admin dashboard"""
+        lookups = self.hits + self.misses
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global cache service instance
+_cache_service = None
+
+def get_cache_service() -> CacheService:
+    """Get or create the global cache service instance"""
+    global _cache_service
+    if _cache_service is None:
+        _cache_service = CacheService()
+    return _cache_service
@@ -0,0 +1,143 @@
+"""
+Chat Cache Service - Response cache for the AI chat endpoints
+Serves repeated questions from memory: exact matches by normalized-question hash, and
+rewordings that use the same content words (ignoring case, punctuation, word order and
+filler words such as "please" or "the"). Any other difference, even a single word
+("most" vs "least", "2020" vs "2021"), is a miss; similarity scoring is deliberately
+not used because near-identical questions can need opposite answers.
+"""
+
+import os
+import re
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = int(os.getenv('CHAT_CACHE_MAX_ENTRIES', '500'))
+
+_NON_WORD = re.compile(r"[^a-z0-9\s]+")
+_SPACES = re.compile(r"\s+")
+
+# Words that never change what is being asked (after normalization). Question words,
+# auxiliaries, negations and pronouns are content: "when" vs "where" or "did" vs "does"
+# can change the answer.
+FILLER_WORDS = frozenset({
+    "a", "an", "the", "please", "pls", "kindly", "hi", "hey", "hello",
+    "can", "could", "would", "you", "tell", "me"
+})
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace"""
+    text = _NON_WORD.sub(" ", text.lower().replace("'", ""))
+    return _SPACES.sub(" ", text).strip()
+
+
+def content_words(normalized: str) -> str:
+    """Sorted, de-duplicated words of a normalized question without filler words"""
+    return " ".join(sorted(set(normalized.split(" ")) - FILLER_WORDS))
+
+
+class ChatCacheService:
+    """LRU cache of AI answers scoped by the version of the AI instructions"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Maximum number of cached answers before LRU eviction
+        """
+        self.max_entries = max_entries
+        # (scope, question hash) -> (answer, reworded key)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, Tuple[str, str]]]" = OrderedDict()
+        # (scope, content words hash) -> key of the latest entry with those content words
+        self._reworded: Dict[Tuple[str, str], Tuple[str, str]] = {}
+        self.exact_hits = 0
+        self.reworded_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def scope_for(instructions: str) -> str:
+        """Derive a cache scope from the AI instructions, so editing them invalidates old answers"""
+        return hashlib.sha256(instructions.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get(self, question: str, scope: str) -> Optional[str]:
+        """
+        Look up a cached answer
+
+        Args:
+            question: The user's question
+            scope: Cache scope from scope_for()
+
+        Returns:
+            The cached answer, or None on a miss
+        """
+        normalized = normalize_question(question)
+        if not normalized:
+            return None
+
+        key = (scope, self._hash(normalized))
+        if key in self._entries:
+            self.exact_hits += 1
+        else:
+            key = self._reworded.get((scope, self._hash(content_words(normalized))))
+            if key is None:
+                self.misses += 1
+                return None
+            self.reworded_hits += 1
+
+        self._entries.move_to_end(key)
+        return self._entries[key][0]
+
+    def put(self, question: str, scope: str, answer: str) -> None:
+        """Cache an answer, evicting the least recently used entries if over capacity"""
+        normalized = normalize_question(question)
+        if not normalized or not answer:
+            return
+
+        key = (scope, self._hash(normalized))
+        reworded_key = (scope, self._hash(content_words(normalized)))
+        self._entries[key] = (answer, reworded_key)
+        self._entries.move_to_end(key)
+        self._reworded[reworded_key] = key
+        while len(self._entries) > self.max_entries:
+            evicted_key, (_, evicted_reworded) = self._entries.popitem(last=False)
+            if self._reworded.get(evicted_reworded) == evicted_key:
+                del self._reworded[evicted_reworded]
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every cached answer"""
+        self._entries.clear()
+        self._reworded.clear()
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters for the admin dashboard"""
+        lookups = self.exact_hits + self.reworded_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "exact_hits": self.exact_hits,
+            "reworded_hits": self.reworded_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.exact_hits + self.reworded_hits) / lookups, 4) if lookups else 0.0
+        }
+
+
+# Global chat cache service instance
+_chat_cache_service = None
+
+def get_chat_cache_service() -> ChatCacheService:
+    """Get or create the global chat cache service instance"""
+    global _chat_cache_service
+    if _chat_cache_service is None:
+        _chat_cache_service = ChatCacheService()
+    return _chat_cache_service
@@ -0,0 +1,185 @@
+"""
+Compression - Content-Encoding negotiation for API responses
+EncodedBody holds a serialized response and compresses it at most once per encoding, so
+bodies kept in the read-through cache are compressed once per content version.
+CompressionMiddleware compresses the remaining (uncached) responses per request.
+Runtime compression uses fast levels and runs in the threadpool, off the event loop;
+the slow maximum levels are reserved for offline use.
+"""
+
+import os
+import gzip
+import json
+import logging
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Bodies smaller than this are sent uncompressed; the framing overhead is not worth it
+MINIMUM_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+
+# Quality by use; cached bodies expire with the cache TTL, so they are not worth brotli 11
+BROTLI_QUALITY = {"dynamic": 4, "cached": 5, "static": 11}
+GZIP_LEVEL = {"dynamic": 6, "cached": 9, "static": 9}
+
+COMPRESSIBLE_TYPES = (
+    "application/json", "text/html", "text/plain", "text/css", "text/xml",
+    "application/xml", "application/rss+xml", "application/atom+xml", "application/javascript"
+)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the best supported encoding from an Accept-Encoding header
+
+    Returns:
+        "br", "gzip" or None for identity
+    """
+    if not accept_encoding:
+        return None
+
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip().lower()] = weight
+
+    wildcard = weights.get("*", 0.0)
+    candidates = (["br"] if BROTLI_AVAILABLE else []) + ["gzip"]
+    best, best_weight = None, 0.0
+    for coding in candidates:
+        weight = weights.get(coding, wildcard)
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+
+def compress(body: bytes, encoding: str, level: str = "dynamic") -> bytes:
+    """
+    Compress a body
+
+    Args:
+        body: Uncompressed bytes
+        encoding: "br" or "gzip"
+        level: "dynamic" for per-request compression (fastest), "cached" for bodies
+            compressed once and reused while cached, "static" for offline builds only
+            (smallest output, but brotli 11 takes seconds on large bodies)
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY[level])
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(body, compresslevel=GZIP_LEVEL[level], mtime=0)
+
+
+class EncodedBody:
+    """A serialized response body plus its compressed variants, built on first request"""
+
+    def __init__(self, body: bytes, media_type: str = "application/json", headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            body: Uncompressed response bytes
+            media_type: Content type of the body
+            headers: Extra headers sent with every variant (e.g. ETag)
+        """
+        self.body = body
+        self.media_type = media_type
+        self.headers = headers or {}
+        self._encoded: Dict[str, bytes] = {}
+
+    @classmethod
+    def from_json(cls, value: Any, headers: Optional[Dict[str, str]] = None) -> "EncodedBody":
+        """Serialize a value the way the JSON endpoints do"""
+        return cls(json.dumps(value, default=str, separators=(",", ":")).encode("utf-8"), headers=headers)
+
+    async def encoded(self, encoding: Optional[str]) -> bytes:
+        """Return the body in an encoding, compressing it (in the threadpool) the first time only"""
+        if encoding is None or len(self.body) < MINIMUM_SIZE:
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            data = await run_in_threadpool(compress, self.body, encoding, "cached")
+            self._encoded[encoding] = data
+        return data
+
+    async def response(self, accept_encoding: Optional[str], status_code: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+        """Build a response in the best encoding the client accepts"""
+        encoding = negotiate_encoding(accept_encoding)
+        content = await self.encoded(encoding)
+        response_headers = {**self.headers, **(headers or {}), "Vary": "Accept-Encoding"}
+        if content is not self.body:
+            response_headers["Content-Encoding"] = encoding
+        return Response(content=content, status_code=status_code, media_type=self.media_type, headers=response_headers)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing complete (non-streaming) responses
+
+    Streaming responses such as SSE chat answers and responses that already carry a
+    Content-Encoding (cached EncodedBody responses) pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = MINIMUM_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+
+        async def send_compressed(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                # Hold the headers until we know whether the body is complete
+                start_message = message
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (
+                message.get("more_body", False)
+                or "content-encoding" in headers
+                or len(body) < self.minimum_size
+                or not content_type.startswith(COMPRESSIBLE_TYPES)
+            ):
+                await send(start)
+                await send(message)
+                return
+
+            body = await run_in_threadpool(compress, body, encoding)
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body, "more_body": False})
+
+        await self.app(scope, receive, send_compressed)
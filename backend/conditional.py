@@ -0,0 +1,38 @@
+"""
+Conditional Requests - ETag comparison for If-None-Match and If-Range
+Shared by the endpoints that serve validators (portfolio snapshot, resume downloads)
+"""
+
+from typing import Optional
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+
+    Uses the weak comparison If-None-Match calls for: W/ prefixes are ignored on both
+    sides, the header may list several tags, and "*" matches any current representation.
+    """
+    if not if_none_match:
+        return False
+    opaque = _opaque(etag)
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or _opaque(tag) == opaque:
+            return True
+    return False
+
+
+def if_range_matches(if_range: Optional[str], etag: str) -> bool:
+    """
+    Check an If-Range header against an ETag (strong comparison; a weak ETag never matches)
+
+    Returns True when there is no If-Range header, i.e. the Range header applies.
+    """
+    if if_range is None:
+        return True
+    return not etag.startswith("W/") and if_range.strip() == etag
@@ -1,4 +1,4 @@
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo.errors import ServerSelectionTimeoutError, ConfigurationError
 import os
 from datetime import datetime
@@ -15,33 +15,32 @@ DATABASE_NAME = os.environ.get('DATABASE_NAME', 'portfolio_db')
 client = None
 db = None
 
+# Set once the startup ping succeeds (see connect_to_mongo)
+_connected = False
+
 try:
+    # Motor connects lazily, so creating the client never blocks the event loop.
     # Use longer timeout for initial connection but shorter for operations
-    client = MongoClient(
-        MONGO_URL, 
+    client = AsyncIOMotorClient(
+        MONGO_URL,
         serverSelectionTimeoutMS=10000,  # 10 seconds for initial connection
         socketTimeoutMS=5000,            # 5 seconds for socket operations
         connectTimeoutMS=10000,          # 10 seconds for connection timeout
         maxPoolSize=10,                  # Max connection pool size
         retryWrites=True                 # Enable retryable writes
     )
-    
-    # Test the connection
-    client.admin.command('ismaster')
     db = client[DATABASE_NAME]
-    logger.info("Successfully connected to MongoDB")
-    
-except ServerSelectionTimeoutError as e:
-    logger.error(f"MongoDB connection timeout: {e}")
-    db = None
+
 except ConfigurationError as e:
     logger.error(f"MongoDB configuration error: {e}")
+    client = None
     db = None
 except Exception as e:
-    logger.error(f"Unexpected MongoDB connection error: {e}")
+    logger.error(f"Unexpected MongoDB client error: {e}")
+    client = None
     db = None
 
-# Collections - only initialize if DB connection is successful
+# Collections - only initialize if the client could be created
 if db is not None:
     profile_collection = db['profile']
     experience_collection = db['experience']
@@ -52,7 +51,10 @@ if db is not None:
     whitepapers_collection = db['whitepapers']
     appointments_collection = db['appointments']
     analytics_collection = db['analytics']
+    analytics_buckets_collection = db['analytics_buckets']
+    analytics_hll_collection = db['analytics_hll']
     blogs_collection = db['blogs']
+    jobs_collection = db['jobs']
 else:
     # Create dummy collections that will raise appropriate errors
     logger.warning("MongoDB not available - collections will not work")
@@ -65,17 +67,20 @@ else:
     whitepapers_collection = None
     appointments_collection = None
     analytics_collection = None
+    analytics_buckets_collection = None
+    analytics_hll_collection = None
     blogs_collection = None
+    jobs_collection = None
 
-def init_analytics():
+async def init_analytics():
     """Initialize analytics collection if it doesn't exist"""
     try:
         if db is None or analytics_collection is None:
             logger.warning("MongoDB not available - analytics initialization skipped")
             return
-            
-        if analytics_collection.count_documents({}) == 0:
-            analytics_collection.insert_one({
+
+        if await analytics_collection.count_documents({}) == 0:
+            await analytics_collection.insert_one({
                 'total_visits': 0,
                 'unique_visitors': 0,
                 'ai_chat_sessions': 0,
@@ -89,10 +94,37 @@ def init_analytics():
 
 def is_mongodb_available():
     """Check if MongoDB is available"""
-    return db is not None and client is not None
+    return _connected and db is not None and client is not None
 
-# Initialize analytics only if MongoDB is available
-if is_mongodb_available():
-    init_analytics()
-else:
-    logger.warning("Skipping analytics initialization - MongoDB not available")
\ No newline at end of file
+async def connect_to_mongo():
+    """Verify the MongoDB connection and run one-time initialization (call on app startup)"""
+    global _connected
+
+    if client is None:
+        logger.warning("Skipping MongoDB connection check - client not configured")
+        return
+
+    try:
+        # Test the connection
+        await client.admin.command('ping')
+        _connected = True
+        logger.info("Successfully connected to MongoDB")
+    except ServerSelectionTimeoutError as e:
+        logger.error(f"MongoDB connection timeout: {e}")
+        _connected = False
+    except Exception as e:
+        logger.error(f"Unexpected MongoDB connection error: {e}")
+        _connected = False
+
+    # Initialize analytics only if MongoDB is available
+    if is_mongodb_available():
+        await init_analytics()
+    else:
+        logger.warning("Skipping analytics initialization - MongoDB not available")
+
+def close_mongo_connection():
+    """Close the MongoDB client (call on app shutdown)"""
+    global _connected
+    if client is not None:
+        client.close()
+    _connected = False
@@ -0,0 +1,240 @@
+"""
+Feed Service - Prebuilt RSS, Atom and sitemap documents for published blog posts
+Each post's XML fragments are rendered once per post version; the documents are
+reassembled from fragments after a write and served as precompressed bytes. MongoDB
+is only read at startup and by a periodic background refresh, never by a feed request.
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Any, Dict, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+from compression import EncodedBody
+from database import blogs_collection, is_mongodb_available
+
+logger = logging.getLogger(__name__)
+
+SITE_URL = os.getenv('SITE_URL', 'http://localhost:3000').rstrip('/')
+FEED_TITLE = os.getenv('FEED_TITLE', "Ibrahim El Khalil's Blog")
+FEED_DESCRIPTION = os.getenv('FEED_DESCRIPTION', 'Articles on technology, engineering and entrepreneurship')
+# Newest posts included in RSS and Atom (the sitemap lists every post)
+FEED_MAX_ITEMS = int(os.getenv('FEED_MAX_ITEMS', '20'))
+# Background re-read interval; picks up posts written through other uvicorn workers
+REFRESH_SECONDS = float(os.getenv('FEED_REFRESH_SECONDS', '300'))
+
+FEED_PROJECTION = {
+    "_id": 0, "id": 1, "slug": 1, "title": 1, "excerpt": 1, "author": 1, "tags": 1,
+    "status": 1, "published_date": 1, "created_at": 1, "updated_at": 1
+}
+
+# Public pages listed in the sitemap besides the posts
+STATIC_PAGES = ["/", "/portfolio", "/blog"]
+
+MEDIA_TYPES = {
+    "rss": "application/rss+xml",
+    "atom": "application/atom+xml",
+    "sitemap": "application/xml"
+}
+
+
+def parse_date(value: Optional[str]) -> datetime:
+    """Parse a stored ISO date (or date-only string) as UTC; unknown dates sort first"""
+    if value:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+    return datetime.min.replace(tzinfo=timezone.utc)
+
+
+def post_url(slug: str) -> str:
+    return f"{SITE_URL}/blog/{slug}"
+
+
+class FeedService:
+    """In-memory feed documents kept current by the blog write handlers"""
+
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS):
+        """
+        Args:
+            refresh_seconds: Seconds between background re-reads of the published posts
+        """
+        self.refresh_seconds = refresh_seconds
+        # post id -> post fields used by the feeds
+        self._posts: Dict[str, Dict[str, Any]] = {}
+        # post id -> (post fields, {"rss", "atom", "sitemap"} fragments)
+        self._fragments: Dict[str, tuple] = {}
+        self._documents: Dict[str, EncodedBody] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.builds = 0
+        self.fragment_renders = 0
+
+    def _post_fields(self, blog: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: blog.get(key) for key in FEED_PROJECTION if key != "_id"}
+
+    def upsert_blog(self, blog: Optional[Dict[str, Any]]) -> None:
+        """Apply a blog write: published posts are (re)added, anything else is removed"""
+        if not blog or not blog.get("id"):
+            return
+        if blog.get("status") != "published" or not blog.get("slug"):
+            self.remove(blog["id"])
+            return
+        fields = self._post_fields(blog)
+        if self._posts.get(blog["id"]) != fields:
+            self._posts[blog["id"]] = fields
+            self._documents = {}
+
+    def remove(self, blog_id: str) -> None:
+        """Drop a post from the feeds (no-op if absent)"""
+        if self._posts.pop(blog_id, None) is not None:
+            self._fragments.pop(blog_id, None)
+            self._documents = {}
+
+    async def refresh(self) -> None:
+        """Re-read the published posts (indexed on status, created_at) and rebuild if anything changed"""
+        if blogs_collection is None or not is_mongodb_available():
+            return
+        blogs = await blogs_collection.find({"status": "published"}, FEED_PROJECTION).to_list(length=None)
+        posts = {blog["id"]: self._post_fields(blog) for blog in blogs if blog.get("id") and blog.get("slug")}
+        if posts != self._posts:
+            self._posts = posts
+            self._fragments = {key: value for key, value in self._fragments.items() if key in posts}
+            self._documents = {}
+
+    def _post_fragments(self, post: Dict[str, Any]) -> Dict[str, str]:
+        cached = self._fragments.get(post["id"])
+        if cached is not None and cached[0] == post:
+            return cached[1]
+
+        url = escape(post_url(post["slug"]))
+        published = parse_date(post.get("published_date") or post.get("created_at"))
+        updated = max(published, parse_date(post.get("updated_at")))
+        title = escape(post.get("title") or "")
+        summary = escape(post.get("excerpt") or "")
+        categories = post.get("tags") or []
+        fragments = {
+            "rss": (
+                f"<item><title>{title}</title><link>{url}</link>"
+                f"<guid isPermaLink=\"false\">{escape(post['id'])}</guid>"
+                f"<pubDate>{format_datetime(published)}</pubDate>"
+                f"<description>{summary}</description>"
+                + "".join(f"<category>{escape(tag)}</category>" for tag in categories)
+                + "</item>"
+            ),
+            "atom": (
+                f"<entry><title>{title}</title><link href={quoteattr(post_url(post['slug']))}/>"
+                f"<id>urn:uuid:{escape(post['id'])}</id>"
+                f"<published>{published.isoformat()}</published><updated>{updated.isoformat()}</updated>"
+                f"<author><name>{escape(post.get('author') or FEED_TITLE)}</name></author>"
+                f"<summary>{summary}</summary>"
+                + "".join(f"<category term={quoteattr(tag)}/>" for tag in categories)
+                + "</entry>"
+            ),
+            "sitemap": f"<url><loc>{url}</loc><lastmod>{updated.date().isoformat()}</lastmod></url>"
+        }
+        self._fragments[post["id"]] = (post, fragments)
+        self.fragment_renders += 1
+        return fragments
+
+    def _build(self) -> None:
+        """Assemble the three documents from per-post fragments"""
+        posts = sorted(
+            self._posts.values(),
+            key=lambda post: parse_date(post.get("published_date") or post.get("created_at")),
+            reverse=True
+        )
+        fragments = [self._post_fragments(post) for post in posts]
+        newest = max(
+            (parse_date(post.get("updated_at") or post.get("created_at")) for post in posts),
+            default=datetime.now(timezone.utc)
+        )
+
+        rss = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom"><channel>'
+            f"<title>{escape(FEED_TITLE)}</title><link>{escape(SITE_URL)}/blog</link>"
+            f"<description>{escape(FEED_DESCRIPTION)}</description>"
+            f"<atom:link href={quoteattr(SITE_URL + '/feed.xml')} rel=\"self\" type=\"application/rss+xml\"/>"
+            f"<lastBuildDate>{format_datetime(newest)}</lastBuildDate>"
+            + "".join(fragment["rss"] for fragment in fragments[:FEED_MAX_ITEMS])
+            + "</channel></rss>"
+        )
+        atom = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<feed xmlns="http://www.w3.org/2005/Atom">'
+            f"<title>{escape(FEED_TITLE)}</title><subtitle>{escape(FEED_DESCRIPTION)}</subtitle>"
+            f"<link href={quoteattr(SITE_URL + '/blog')}/>"
+            f"<link href={quoteattr(SITE_URL + '/atom.xml')} rel=\"self\"/>"
+            f"<id>{escape(SITE_URL)}/blog</id><updated>{newest.isoformat()}</updated>"
+            + "".join(fragment["atom"] for fragment in fragments[:FEED_MAX_ITEMS])
+            + "</feed>"
+        )
+        sitemap = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            + "".join(f"<url><loc>{escape(SITE_URL + path)}</loc></url>" for path in STATIC_PAGES)
+            + "".join(fragment["sitemap"] for fragment in fragments)
+            + "</urlset>"
+        )
+        self._documents = {
+            name: EncodedBody(body.encode("utf-8"), media_type=MEDIA_TYPES[name])
+            for name, body in (("rss", rss), ("atom", atom), ("sitemap", sitemap))
+        }
+        self.builds += 1
+
+    def document(self, name: str) -> EncodedBody:
+        """
+        Return a prebuilt document ("rss", "atom" or "sitemap"), reassembling it from
+        fragments if a write changed the published set since the last build
+        """
+        if not self._documents:
+            self._build()
+        return self._documents[name]
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Feed refresh failed: {e}")
+            await asyncio.sleep(self.refresh_seconds)
+
+    def start(self) -> None:
+        """Load the published posts and start the background refresh (call on app startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background refresh (call on app shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return feed statistics for the admin dashboard"""
+        return {
+            "posts": len(self._posts),
+            "builds": self.builds,
+            "fragment_renders": self.fragment_renders,
+            "refresh_seconds": self.refresh_seconds
+        }
+
+
+# Global feed service instance
+_feed_service = None
+
+def get_feed_service() -> FeedService:
+    """Get or create the global feed service instance"""
+    global _feed_service
+    if _feed_service is None:
+        _feed_service = FeedService()
+    return _feed_service
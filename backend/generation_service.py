@@ -0,0 +1,315 @@
+"""
+Generation Service - Background AI blog generation on the persistent job queue
+A request only enqueues a job; a bounded set of workers streams the post from Gemini,
+records progress on the job, retries upstream failures with exponential backoff and
+stores the generated post as the job result for polling clients.
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+from job_queue import JobQueue, get_job_queue
+from llm_service import LLMService, get_llm_service
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "generate_blog"
+# Generations running at once on each worker
+MAX_CONCURRENCY = int(os.getenv('BLOG_GENERATION_CONCURRENCY', '2'))
+# Poll interval for jobs submitted through other uvicorn workers
+POLL_SECONDS = float(os.getenv('BLOG_GENERATION_POLL_SECONDS', '5'))
+MAX_ATTEMPTS = int(os.getenv('BLOG_GENERATION_MAX_ATTEMPTS', '4'))
+# Retry delays double from the base up to the cap
+RETRY_BASE_SECONDS = 10
+RETRY_MAX_SECONDS = 300
+# Minimum seconds between progress writes (each also renews the lease)
+PROGRESS_INTERVAL = 2.0
+
+WORD_COUNTS = {"short": 500, "medium": 1000, "long": 1500}
+
+
+def blog_request(data: Dict[str, Any]) -> Dict[str, str]:
+    """Normalize generation parameters from a request body"""
+    return {
+        "topic": data.get("topic", ""),
+        "category": data.get("category", ""),
+        "tone": data.get("tone", "professional"),
+        "length": data.get("length", "medium")
+    }
+
+
+def build_blog_prompt(params: Dict[str, str]) -> str:
+    word_count = WORD_COUNTS.get(params["length"], 1000)
+    return f"""Write a professional blog post about: {params["topic"]}
+
+Category: {params["category"]}
+Tone: {params["tone"]}
+Target length: approximately {word_count} words
+
+Please structure the blog post with:
+1. An engaging title
+2. A compelling excerpt (2-3 sentences)
+3. Well-organized main content with proper headings
+4. SEO-friendly keywords
+5. A conclusion
+
+Format the response as JSON with the following structure:
+{{
+    "title": "Blog Title",
+    "excerpt": "Brief description...",
+    "content": "Full blog content with markdown formatting...",
+    "tags": ["tag1", "tag2", "tag3"],
+    "seo_title": "SEO optimized title",
+    "seo_description": "SEO meta description"
+}}"""
+
+
+def parse_blog_response(text: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """Extract the JSON post from Gemini's answer, falling back to the raw text"""
+    category = params["category"]
+    try:
+        # Extract JSON from response (handle markdown code blocks)
+        if "```json" in text:
+            text = text.split("```json")[1].split("```")[0]
+        elif "```" in text:
+            text = text.split("```")[1].split("```")[0]
+
+        blog_data = json.loads(text.strip())
+        blog_data["ai_generated"] = True
+        blog_data["demo"] = False
+        return blog_data
+    except (ValueError, IndexError):
+        return {
+            "title": params["topic"],
+            "excerpt": "",
+            "content": text,
+            "tags": [category] if category else [],
+            "ai_generated": True,
+            "demo": False
+        }
+
+
+def demo_blog(params: Dict[str, str]) -> Dict[str, Any]:
+    """Placeholder post returned when no Gemini API key is configured"""
+    topic, category = params["topic"], params["category"]
+    demo_content = f"""# {topic}
+
+## Introduction
+
+This is a sample blog post about {topic}. This content is generated as a placeholder since the Gemini AI API key is not configured.
+
+## Main Content
+
+To enable AI-powered blog generation, you need to:
+
+1. Get a Gemini API key from Google AI Studio
+2. Add it to your environment variables
+3. Restart the backend service
+
+## Key Points
+
+- This feature requires a valid Gemini API key
+- The AI can generate professional content in various tones
+- Blog posts can be customized by length and category
+- Generated content includes SEO optimization
+
+## Conclusion
+
+Once properly configured, this feature will generate high-quality blog content tailored to your specifications using Google's Gemini AI model.
+
+*Note: This is demo content. Configure your Gemini API key to enable AI generation.*"""
+
+    return {
+        "title": f"Sample: {topic}",
+        "excerpt": f"This is a sample blog post about {topic}. Configure Gemini API for AI generation.",
+        "content": demo_content,
+        "tags": [category, "sample", "demo"] if category else ["sample", "demo"],
+        "seo_title": f"{topic} - Sample Blog Post",
+        "seo_description": f"Learn about {topic} in this sample blog post. Configure AI for automated content generation.",
+        "ai_generated": False,
+        "demo": True
+    }
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the given number of attempts made"""
+    delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class GenerationService:
+    """Dispatches queued blog generation jobs to a bounded number of local workers"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        llm: LLMService,
+        max_concurrency: int = MAX_CONCURRENCY,
+        poll_seconds: float = POLL_SECONDS
+    ):
+        """
+        Args:
+            queue: Job queue holding the generation jobs
+            llm: Shared Gemini client
+            max_concurrency: Generations running at once on this worker
+            poll_seconds: Seconds between checks for jobs submitted elsewhere
+        """
+        self.queue = queue
+        self.llm = llm
+        self.max_concurrency = max_concurrency
+        self.poll_seconds = poll_seconds
+        self._running: Set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.completed = 0
+        self.retries = 0
+        self.failed = 0
+
+    async def submit(self, data: Dict[str, Any]) -> str:
+        """
+        Queue a generation and return its job id; never waits for Gemini
+
+        Raises:
+            ValueError: If no topic was given
+        """
+        params = blog_request(data)
+        if not params["topic"]:
+            raise ValueError("Topic is required")
+        job_id = await self.queue.enqueue(JOB_TYPE, params, max_attempts=MAX_ATTEMPTS)
+        self._wakeup.set()
+        return job_id
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Public view of a generation job, or None if unknown or expired"""
+        job = await self.queue.get(job_id)
+        if job is None or job.get("type") != JOB_TYPE:
+            return None
+        return {
+            "job_id": job["id"],
+            "status": job["status"],
+            "progress": job.get("progress"),
+            "attempts": job.get("attempts", 0),
+            "max_attempts": job.get("max_attempts"),
+            "result": job.get("result"),
+            "error": job.get("error"),
+            "created_at": job.get("created_at"),
+            "updated_at": job.get("updated_at")
+        }
+
+    async def generate(self, params: Dict[str, str], on_progress=None) -> Dict[str, Any]:
+        """
+        Generate a post, streaming it so progress can be reported as words arrive
+
+        Args:
+            params: Output of blog_request()
+            on_progress: Optional async callback receiving {"words", "target_words"}
+        """
+        if not self.llm.is_configured():
+            return demo_blog(params)
+
+        target = WORD_COUNTS.get(params["length"], 1000)
+        parts = []
+        words = 0
+        last_report = time.monotonic()
+        async for text in self.llm.stream("blog", build_blog_prompt(params)):
+            parts.append(text)
+            words += len(text.split())
+            if on_progress is not None and time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                last_report = time.monotonic()
+                await on_progress({"words": words, "target_words": target})
+        return parse_blog_response("".join(parts), params)
+
+    async def _execute(self, job: Dict[str, Any]) -> None:
+        async def report(progress):
+            if not await self.queue.renew(job, progress):
+                # Cancelled, or the lease was taken over by another worker
+                raise asyncio.CancelledError()
+
+        try:
+            result = await self.generate(job["payload"], on_progress=report)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.warning(f"Blog generation {job['id']} attempt {job['attempts']} failed: {e}")
+            if job["attempts"] < job.get("max_attempts", MAX_ATTEMPTS):
+                self.retries += 1
+            else:
+                self.failed += 1
+            await self.queue.fail(job, str(e), retry_in=retry_delay(job["attempts"]))
+            return
+
+        if await self.queue.complete(job, result):
+            self.completed += 1
+
+    async def _dispatch(self) -> None:
+        """Claim due jobs while a worker slot is free"""
+        while len(self._running) < self.max_concurrency:
+            job = await self.queue.claim(JOB_TYPE)
+            if job is None:
+                return
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        # A slot is free; look for the next job (including retries that are now due)
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            if self.queue.available:
+                try:
+                    await self._dispatch()
+                except Exception as e:
+                    logger.error(f"Blog generation dispatch failed: {e}")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the dispatcher (call on app startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the dispatcher and abandon running generations; their leases expire and
+        another worker retries them (call on app shutdown)"""
+        tasks = list(self._running) + ([self._task] if self._task is not None else [])
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._running.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return worker statistics for the admin dashboard"""
+        return {
+            "running": len(self._running),
+            "max_concurrency": self.max_concurrency,
+            "completed": self.completed,
+            "retries": self.retries,
+            "failed": self.failed
+        }
+
+
+# Global generation service instance
+_generation_service = None
+
+def get_generation_service() -> GenerationService:
+    """Get or create the global generation service instance"""
+    global _generation_service
+    if _generation_service is None:
+        _generation_service = GenerationService(get_job_queue(), get_llm_service())
+    return _generation_service
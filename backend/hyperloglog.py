@@ -0,0 +1,77 @@
+"""
+HyperLogLog - Fixed-memory distinct counting for unique visitors
+Sketches are plain byte strings so they can be stored in MongoDB and merged across days and workers
+"""
+
+import math
+import hashlib
+from typing import Optional
+
+# 2^12 registers: 4 KB per sketch, ~1.6% standard error
+DEFAULT_PRECISION = 12
+
+
+def hash_visitor(visitor_key: str) -> int:
+    """Hash a visitor identifier to a 64-bit integer (the raw identifier is never stored)"""
+    return int.from_bytes(hashlib.blake2b(visitor_key.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class HyperLogLog:
+    """HyperLogLog sketch with one byte per register"""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: Optional[bytes] = None):
+        """
+        Args:
+            precision: Number of index bits; the sketch has 2^precision registers
+            registers: Serialized registers from to_bytes(), to restore a sketch
+        """
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is not None:
+            if len(registers) != self.size:
+                raise ValueError(f"Expected {self.size} registers, got {len(registers)}")
+            self.registers = bytearray(registers)
+        else:
+            self.registers = bytearray(self.size)
+
+    def add_hash(self, value: int) -> bool:
+        """
+        Add a 64-bit hash to the sketch
+
+        Returns:
+            True if a register changed
+        """
+        index = value >> (64 - self.precision)
+        remainder = value & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def add(self, visitor_key: str) -> bool:
+        """Add a visitor identifier to the sketch"""
+        return self.add_hash(hash_visitor(visitor_key))
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Merge another sketch into this one (register-wise max) and return self"""
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches with different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Estimate the number of distinct values added"""
+        m = self.size
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+
+        # Small-range correction (linear counting)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self) -> bytes:
+        """Serialize the registers for storage"""
+        return bytes(self.registers)
@@ -0,0 +1,127 @@
+"""
+Index Registry - Declarative MongoDB indexes for every collection the API queries
+Indexes are created idempotently at startup; report_indexes() compares the declared
+indexes with the ones that exist and flags missing, undeclared and unused indexes
+"""
+
+import logging
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+from database import db, is_mongodb_available
+
+logger = logging.getLogger(__name__)
+
+# Content collections whose update/delete handlers look documents up by id
+ID_LOOKUP_COLLECTIONS = [
+    "experience", "education", "skills", "ventures", "whitepapers", "appointments"
+]
+
+# collection -> list of index declarations: "keys" plus create_index options
+INDEXES: Dict[str, List[Dict[str, Any]]] = {
+    **{name: [{"keys": [("id", ASCENDING)]}] for name in ID_LOOKUP_COLLECTIONS},
+    "blogs": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        # Posts without a slug (legacy data) do not take part in the uniqueness check
+        {"keys": [("slug", ASCENDING)], "unique": True,
+         "partialFilterExpression": {"slug": {"$type": "string"}}},
+        # Listing filters, newest first with id as the keyset tie-breaker
+        {"keys": [("status", ASCENDING), ("category", ASCENDING),
+                  ("created_at", DESCENDING), ("id", DESCENDING)]},
+        {"keys": [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)]},
+        {"keys": [("created_at", DESCENDING), ("id", DESCENDING)]},
+    ],
+    "section_visibility": [
+        {"keys": [("section_name", ASCENDING)], "unique": True},
+    ],
+    "admin_settings": [
+        {"keys": [("setting", ASCENDING)], "unique": True},
+    ],
+    "analytics_buckets": [
+        {"keys": [("granularity", ASCENDING), ("bucket", ASCENDING)], "unique": True},
+        # Minute buckets carry expires_at and are removed by MongoDB
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+    "analytics_hll": [
+        {"keys": [("day", ASCENDING), ("worker", ASCENDING)], "unique": True},
+    ],
+    "jobs": [
+        {"keys": [("id", ASCENDING)], "unique": True},
+        # Claim query: due pending jobs of a type, oldest first
+        {"keys": [("type", ASCENDING), ("status", ASCENDING), ("run_at", ASCENDING)]},
+        # Finished jobs carry expires_at and are removed by MongoDB
+        {"keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+}
+
+
+def index_name(keys) -> str:
+    """Default MongoDB name for an index key specification (e.g. "status_1_created_at_-1")"""
+    return "_".join(f"{field}_{direction}" for field, direction in keys)
+
+
+async def ensure_indexes() -> Dict[str, List[str]]:
+    """
+    Create every declared index (a no-op for indexes that already exist)
+
+    A failing index (e.g. duplicate slugs blocking the unique index) is logged and
+    skipped so the API still starts.
+
+    Returns:
+        Mapping of collection -> names of indexes that could not be created
+    """
+    failures: Dict[str, List[str]] = {}
+    if not is_mongodb_available():
+        logger.warning("Skipping index creation - MongoDB not available")
+        return failures
+
+    for collection_name, declarations in INDEXES.items():
+        collection = db[collection_name]
+        for declaration in declarations:
+            options = {key: value for key, value in declaration.items() if key != "keys"}
+            name = index_name(declaration["keys"])
+            try:
+                await collection.create_index(declaration["keys"], name=name, **options)
+            except OperationFailure as e:
+                failures.setdefault(collection_name, []).append(name)
+                logger.error(f"Could not create index {collection_name}.{name}: {e}")
+
+    if not failures:
+        logger.info("MongoDB indexes ensured")
+    return failures
+
+
+async def report_indexes() -> Dict[str, Dict[str, Any]]:
+    """
+    Compare declared and existing indexes
+
+    Returns:
+        Per collection: declared index names, missing ones (declared but absent),
+        undeclared ones (present but not in the registry) and unused ones
+        (no operations since the server started, from $indexStats)
+    """
+    report: Dict[str, Dict[str, Any]] = {}
+    for collection_name in sorted(INDEXES):
+        collection = db[collection_name]
+        declared = [index_name(declaration["keys"]) for declaration in INDEXES[collection_name]]
+        existing = [index["name"] async for index in collection.list_indexes()]
+
+        unused = []
+        try:
+            async for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats.get("accesses", {}).get("ops", 0) == 0:
+                    unused.append(stats["name"])
+        except OperationFailure as e:
+            # $indexStats needs the indexStats privilege, which shared hosting may not grant
+            logger.debug(f"$indexStats unavailable for {collection_name}: {e}")
+            unused = None
+
+        report[collection_name] = {
+            "declared": declared,
+            "missing": [name for name in declared if name not in existing],
+            "undeclared": [name for name in existing if name != "_id_" and name not in declared],
+            "unused": sorted(unused) if unused is not None else None
+        }
+    return report
@@ -0,0 +1,240 @@
+"""
+Job Queue - Persistent MongoDB job queue shared by the API's background workers
+Jobs are claimed with an atomic find-and-update that takes a time-limited lease, so
+several uvicorn workers can poll the same queue: each due job runs on one worker, and
+a job whose worker died is picked up again once its lease expires.
+"""
+
+import os
+import uuid
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from database import jobs_collection, is_mongodb_available
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed job stays reserved for its worker without a renewal
+LEASE_SECONDS = float(os.getenv('JOB_LEASE_SECONDS', '120'))
+# Finished and failed jobs are kept this long for status polling, then expired by MongoDB
+RETENTION_DAYS = int(os.getenv('JOB_RETENTION_DAYS', '7'))
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Identifies this worker process as a lease owner
+WORKER_ID = uuid.uuid4().hex
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class JobQueue:
+    """Lease-based job queue over a MongoDB collection (one document per job)"""
+
+    def __init__(self, collection=None, lease_seconds: float = LEASE_SECONDS, owner: str = WORKER_ID):
+        """
+        Args:
+            collection: Jobs collection
+            lease_seconds: Lease length taken by claim() and renew()
+            owner: Lease owner recorded on claimed jobs
+        """
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.owner = owner
+
+    @property
+    def available(self) -> bool:
+        return self.collection is not None and is_mongodb_available()
+
+    async def enqueue(
+        self,
+        job_type: str,
+        payload: Dict[str, Any],
+        run_at: Optional[datetime] = None,
+        job_id: Optional[str] = None,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    ) -> str:
+        """
+        Add a job, or reset an existing one with the same id to pending
+
+        Args:
+            job_type: Job kind; workers claim jobs by type
+            payload: Job arguments
+            run_at: Earliest run time (naive UTC); defaults to now
+            job_id: Stable id for jobs that may be re-submitted (e.g. one schedule per post)
+            max_attempts: Claims after which the job is marked failed
+
+        Returns:
+            The job id
+        """
+        now = datetime.utcnow()
+        job_id = job_id or str(uuid.uuid4())
+        await self.collection.update_one(
+            {"id": job_id},
+            {
+                "$set": {
+                    "type": job_type,
+                    "payload": payload,
+                    "status": PENDING,
+                    "run_at": run_at or now,
+                    "attempts": 0,
+                    "max_attempts": max_attempts,
+                    "progress": None,
+                    "updated_at": now
+                },
+                "$unset": {"lease_owner": "", "lease_expires": "", "result": "", "error": "", "expires_at": ""},
+                "$setOnInsert": {"created_at": now}
+            },
+            upsert=True
+        )
+        return job_id
+
+    async def cancel(self, job_id: str) -> bool:
+        """Remove a job; a worker currently running it can no longer complete it"""
+        result = await self.collection.delete_one({"id": job_id})
+        return result.deleted_count > 0
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job by id (None once it was cancelled or expired)"""
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def claim(self, job_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Take the lease on the oldest due job of a type
+
+        A job is due when it is pending and its run_at has passed, or when it is running
+        under an expired lease (its worker died or stalled).
+
+        Returns:
+            The claimed job, or None if nothing is due
+        """
+        while True:
+            now = datetime.utcnow()
+            job = await self.collection.find_one_and_update(
+                {
+                    "type": job_type,
+                    "$or": [
+                        {"status": PENDING, "run_at": {"$lte": now}},
+                        {"status": RUNNING, "lease_expires": {"$lt": now}}
+                    ]
+                },
+                {
+                    "$set": {
+                        "status": RUNNING,
+                        "lease_owner": self.owner,
+                        "lease_expires": now + timedelta(seconds=self.lease_seconds),
+                        "updated_at": now
+                    },
+                    "$inc": {"attempts": 1}
+                },
+                sort=[("run_at", 1)],
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                return None
+            if job["attempts"] <= job.get("max_attempts", DEFAULT_MAX_ATTEMPTS):
+                return job
+            # Reclaimed after its worker kept dying; stop retrying it
+            logger.warning(f"Job {job['id']} ({job_type}) exceeded its attempts")
+            await self.fail(job, "Lease expired too many times")
+
+    async def claim_batch(self, job_type: str, limit: int) -> List[Dict[str, Any]]:
+        """Claim up to `limit` due jobs of a type"""
+        jobs = []
+        while len(jobs) < limit:
+            job = await self.claim(job_type)
+            if job is None:
+                break
+            jobs.append(job)
+        return jobs
+
+    def _owned(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        # Fencing filter: a worker whose lease was taken over cannot overwrite the job
+        return {"id": job["id"], "status": RUNNING, "lease_owner": self.owner}
+
+    async def renew(self, job: Dict[str, Any], progress: Any = None) -> bool:
+        """
+        Extend the lease on a running job, optionally recording progress
+
+        Returns:
+            False if the job was cancelled or its lease lost
+        """
+        now = datetime.utcnow()
+        update = {"lease_expires": now + timedelta(seconds=self.lease_seconds), "updated_at": now}
+        if progress is not None:
+            update["progress"] = progress
+        result = await self.collection.update_one(self._owned(job), {"$set": update})
+        return result.matched_count > 0
+
+    async def complete(self, job: Dict[str, Any], result: Any = None) -> bool:
+        """Mark a claimed job done; returns False if its lease was lost"""
+        now = datetime.utcnow()
+        outcome = await self.collection.update_one(
+            self._owned(job),
+            {
+                "$set": {
+                    "status": DONE,
+                    "result": result,
+                    "updated_at": now,
+                    "finished_at": now,
+                    "expires_at": now + timedelta(days=RETENTION_DAYS)
+                },
+                "$unset": {"lease_owner": "", "lease_expires": ""}
+            }
+        )
+        return outcome.matched_count > 0
+
+    async def fail(self, job: Dict[str, Any], error: str, retry_in: Optional[float] = None) -> bool:
+        """
+        Record a failed attempt
+
+        Args:
+            job: The claimed job
+            error: Error message kept on the job
+            retry_in: Seconds until the next attempt; the job fails for good when None
+                or when it has used all its attempts
+
+        Returns:
+            False if its lease was lost
+        """
+        now = datetime.utcnow()
+        update: Dict[str, Any] = {"error": error, "updated_at": now}
+        if retry_in is not None and job["attempts"] < job.get("max_attempts", DEFAULT_MAX_ATTEMPTS):
+            update.update(status=PENDING, run_at=now + timedelta(seconds=retry_in))
+        else:
+            update.update(status=FAILED, finished_at=now, expires_at=now + timedelta(days=RETENTION_DAYS))
+        outcome = await self.collection.update_one(
+            self._owned(job),
+            {"$set": update, "$unset": {"lease_owner": "", "lease_expires": ""}}
+        )
+        return outcome.matched_count > 0
+
+    async def next_run_at(self, job_type: str) -> Optional[datetime]:
+        """Run time of the earliest pending job of a type"""
+        job = await self.collection.find_one(
+            {"type": job_type, "status": PENDING}, {"_id": 0, "run_at": 1}, sort=[("run_at", 1)]
+        )
+        return job["run_at"] if job else None
+
+    async def counts(self, job_type: str) -> Dict[str, int]:
+        """Number of jobs of a type per status"""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        async for row in self.collection.aggregate([
+            {"$match": {"type": job_type}},
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+        ]):
+            counts[row["_id"]] = row["count"]
+        return counts
+
+
+# Global job queue instance
+_job_queue = None
+
+def get_job_queue() -> JobQueue:
+    """Get or create the global job queue instance"""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = JobQueue(jobs_collection)
+    return _job_queue
@@ -0,0 +1,217 @@
+"""
+LLM Service - Process-wide Gemini client
+Configures google-generativeai once, reuses model instances (and their connections),
+bounds concurrent upstream calls and applies per-purpose timeouts
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CHAT_MODEL = 'gemini-2.0-flash-exp'
+BLOG_MODEL = 'gemini-2.0-flash-exp'
+RESUME_MODEL = 'gemini-pro'
+
+# Maximum number of in-flight Gemini calls per worker
+MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+# Calls are made for a purpose; models may be shared between purposes (chat and blog
+# use the same one), so timeouts are keyed by purpose rather than by model name
+PURPOSE_MODELS = {
+    "chat": CHAT_MODEL,
+    "blog": BLOG_MODEL,
+    "resume": RESUME_MODEL,
+}
+DEFAULT_TIMEOUT_SECONDS = float(os.getenv('LLM_TIMEOUT_SECONDS', '60'))
+# Whole-call deadlines; long-form generation gets more time than chat
+PURPOSE_TIMEOUTS = {
+    "chat": float(os.getenv('LLM_CHAT_TIMEOUT_SECONDS', '30')),
+    "blog": float(os.getenv('LLM_BLOG_TIMEOUT_SECONDS', '300')),
+    "resume": float(os.getenv('LLM_RESUME_TIMEOUT_SECONDS', '90')),
+}
+# Longest gap between streamed chunks before a stream counts as stalled
+STREAM_STALL_SECONDS = float(os.getenv('LLM_STREAM_STALL_SECONDS', '30'))
+
+PLACEHOLDER_KEYS = {"", "your-gemini-api-key-here"}
+
+
+def current_api_key() -> Optional[str]:
+    """Return the configured Gemini API key, or None if unset or a placeholder"""
+    api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY") or ""
+    return None if api_key in PLACEHOLDER_KEYS else api_key
+
+
+class LLMService:
+    """Shared, lazily configured Gemini client"""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY):
+        """
+        Args:
+            max_concurrency: Maximum number of concurrent upstream calls
+        """
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._genai = None
+        self._api_key: Optional[str] = None
+        self._models: Dict[str, Any] = {}
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+
+    def is_configured(self) -> bool:
+        """Check if a Gemini API key is available"""
+        return current_api_key() is not None
+
+    def _configure(self) -> None:
+        """Import and configure the SDK on first use or after the key changed"""
+        api_key = current_api_key()
+        if api_key is None:
+            raise RuntimeError("Gemini API key not configured")
+        if self._genai is not None and api_key == self._api_key:
+            return
+
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._api_key = api_key
+        self._models = {}
+        logger.info("Gemini client configured")
+
+    def get_model(self, name: str):
+        """
+        Get a shared GenerativeModel, or None when no API key is configured (demo mode)
+
+        Args:
+            name: Gemini model name
+        """
+        if not self.is_configured():
+            return None
+        self._configure()
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = self._genai.GenerativeModel(name)
+        return model
+
+    def timeout_for(self, purpose: str) -> float:
+        """Return the whole-call timeout for a purpose (chat, blog or resume)"""
+        return PURPOSE_TIMEOUTS.get(purpose, DEFAULT_TIMEOUT_SECONDS)
+
+    def _model_for(self, purpose: str):
+        model = self.get_model(PURPOSE_MODELS[purpose])
+        if model is None:
+            raise RuntimeError("Gemini API key not configured")
+        return model
+
+    async def generate(self, purpose: str, prompt: str):
+        """
+        Generate a full response, waiting for a free slot and enforcing the purpose's timeout
+
+        Args:
+            purpose: "chat", "blog" or "resume"; selects the model and the timeout
+            prompt: Prompt text
+
+        Returns:
+            The SDK response object
+        """
+        model = self._model_for(purpose)
+        name = PURPOSE_MODELS[purpose]
+        timeout = self.timeout_for(purpose)
+
+        async def call():
+            async with self._semaphore:
+                self.calls += 1
+                return await model.generate_content_async(prompt, request_options={"timeout": timeout})
+
+        try:
+            return await asyncio.wait_for(call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeoutError(f"Gemini model {name} did not answer the {purpose} request within {timeout:.0f}s")
+        except Exception:
+            self.errors += 1
+            raise
+
+    async def stream(self, purpose: str, prompt: str) -> AsyncIterator[str]:
+        """
+        Stream response text chunks, holding a concurrency slot until the stream ends
+
+        The purpose's timeout is the deadline for the whole stream; separately, a gap of
+        more than STREAM_STALL_SECONDS between chunks aborts it.
+
+        Args:
+            purpose: "chat", "blog" or "resume"; selects the model and the timeout
+            prompt: Prompt text
+
+        Yields:
+            Text chunks as Gemini produces them
+        """
+        model = self._model_for(purpose)
+        name = PURPOSE_MODELS[purpose]
+        timeout = self.timeout_for(purpose)
+        stall = min(timeout, STREAM_STALL_SECONDS)
+        async with self._semaphore:
+            self.calls += 1
+            try:
+                response = await asyncio.wait_for(
+                    model.generate_content_async(prompt, stream=True, request_options={"timeout": timeout}),
+                    timeout=stall
+                )
+                chunks = response.__aiter__()
+                deadline = time.monotonic() + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise asyncio.TimeoutError()
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), timeout=min(stall, remaining))
+                    except StopAsyncIteration:
+                        break
+                    if chunk.text:
+                        yield chunk.text
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                raise TimeoutError(f"Gemini model {name} stalled for {stall:.0f}s or exceeded the {purpose} deadline of {timeout:.0f}s")
+            except Exception:
+                self.errors += 1
+                raise
+
+    async def warmup(self, *purposes: str) -> None:
+        """Import the SDK and build the models for the given purposes in the background, off the request path"""
+        if not self.is_configured():
+            return
+        try:
+            for purpose in purposes:
+                # The SDK import is slow; do it in a thread so startup is not blocked
+                await asyncio.to_thread(self.get_model, PURPOSE_MODELS[purpose])
+        except Exception as e:
+            logger.warning(f"Gemini warmup failed: {e}")
+
+    def reload(self) -> None:
+        """Drop configured models so the next call picks up a changed API key"""
+        self._api_key = None
+        self._models = {}
+
+    def stats(self) -> Dict:
+        """Return client statistics for the admin dashboard"""
+        return {
+            "configured": self.is_configured(),
+            "models": sorted(self._models),
+            "max_concurrency": self.max_concurrency,
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "errors": self.errors
+        }
+
+
+# Global LLM service instance
+_llm_service = None
+
+def get_llm_service() -> LLMService:
+    """Get or create the global LLM service instance"""
+    global _llm_service
+    if _llm_service is None:
+        _llm_service = LLMService()
+    return _llm_service
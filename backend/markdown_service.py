@@ -0,0 +1,128 @@
+"""
+Markdown Service - Server-side rendering of blog post content
+Renders markdown (with embedded HTML from the admin editor) to sanitized HTML once per
+content version, together with a table of contents, word count and reading time
+"""
+
+import os
+import html
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import markdown
+import nh3
+
+logger = logging.getLogger(__name__)
+
+# Bump when the rendering pipeline changes so stored renders are recomputed
+RENDERER_VERSION = 1
+DEFAULT_MAX_ENTRIES = int(os.getenv('MARKDOWN_CACHE_MAX_ENTRIES', '128'))
+WORDS_PER_MINUTE = 200
+
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "toc", "sane_lists"]
+
+# Class names are kept for the editor's styling, ids for table-of-contents anchors
+ALLOWED_ATTRIBUTES = {
+    tag: set(attributes) for tag, attributes in nh3.ALLOWED_ATTRIBUTES.items()
+}
+ALLOWED_ATTRIBUTES.setdefault("*", set()).update({"class", "id", "title"})
+ALLOWED_ATTRIBUTES.setdefault("a", set()).add("target")
+
+
+def content_hash(content: str) -> str:
+    """Hash blog content together with the renderer version"""
+    return hashlib.sha256(f"{RENDERER_VERSION}\n{content}".encode("utf-8")).hexdigest()
+
+
+def flatten_toc(tokens: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn Python-Markdown's nested toc_tokens into a flat list of headings"""
+    entries = []
+    for token in tokens:
+        entries.append({"level": token["level"], "id": token["id"], "title": html.unescape(token["name"])})
+        entries.extend(flatten_toc(token.get("children", [])))
+    return entries
+
+
+def render_markdown(content: str) -> Dict[str, Any]:
+    """
+    Render blog content in one pass
+
+    Returns:
+        {"content_html", "toc", "word_count", "reading_time", "content_hash"}
+    """
+    # Markdown instances keep state between conversions, so use a fresh one per call
+    md = markdown.Markdown(extensions=MARKDOWN_EXTENSIONS)
+    rendered = md.convert(content or "")
+    safe_html = nh3.clean(rendered, attributes=ALLOWED_ATTRIBUTES)
+
+    # Count words in the visible text, not in markup
+    word_count = len(html.unescape(nh3.clean(safe_html, tags=set())).split())
+    return {
+        "content_html": safe_html,
+        "toc": flatten_toc(md.toc_tokens),
+        "word_count": word_count,
+        "reading_time": max(1, round(word_count / WORDS_PER_MINUTE)),
+        "content_hash": content_hash(content or "")
+    }
+
+
+class MarkdownService:
+    """LRU of rendered content keyed by content hash"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_entries: Maximum number of renders kept in memory
+        """
+        self.max_entries = max_entries
+        self._renders: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.renders = 0
+
+    async def render(self, content: str) -> Dict[str, Any]:
+        """Return the rendered fields for some content, rendering only unseen content"""
+        key = content_hash(content or "")
+        rendered = self._renders.get(key)
+        if rendered is not None:
+            self._renders.move_to_end(key)
+            self.hits += 1
+            return rendered
+
+        # Long posts take a few milliseconds to render; keep that off the event loop
+        rendered = await asyncio.to_thread(render_markdown, content)
+        self.renders += 1
+        self._renders[key] = rendered
+        while len(self._renders) > self.max_entries:
+            self._renders.popitem(last=False)
+        return rendered
+
+    @staticmethod
+    def is_current(doc: Dict[str, Any]) -> bool:
+        """Check whether a stored post already carries the render of its current content"""
+        if doc.get("content_html") is None:
+            return False
+        return doc.get("content_hash") == content_hash(doc.get("content") or "")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return render statistics for the admin dashboard"""
+        return {
+            "entries": len(self._renders),
+            "max_entries": self.max_entries,
+            "renders": self.renders,
+            "hits": self.hits,
+            "renderer_version": RENDERER_VERSION
+        }
+
+
+# Global markdown service instance
+_markdown_service = None
+
+def get_markdown_service() -> MarkdownService:
+    """Get or create the global markdown service instance"""
+    global _markdown_service
+    if _markdown_service is None:
+        _markdown_service = MarkdownService()
+    return _markdown_service
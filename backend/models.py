@@ -100,10 +100,11 @@ class BlogPost(BaseModel):
     category: str
     featured_image: Optional[str] = None
     images: Optional[List[str]] = []
-    status: str = 'draft'  # draft, published, archived
+    status: str = 'draft'  # draft, scheduled, published, archived
     views: int = 0
     reading_time: Optional[int] = None  # in minutes
     published_date: Optional[str] = None
+    scheduled_date: Optional[str] = None  # ISO publication time for scheduled posts
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
     seo_title: Optional[str] = None
@@ -0,0 +1,324 @@
+"""
+PDF Converter - Streaming client for the external HTML-to-PDF service (PDF_CONVERTER_URL)
+HTML is uploaded while it is still being generated and the PDF is relayed to the caller
+as the converter produces it, so neither document is held in memory as a whole. Reads
+and writes are driven by the consumer, which gives backpressure in both directions.
+Calls share one keep-alive connection pool; while the converter is failing or its
+health probe is down, a circuit breaker falls back to HTML without waiting on it.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
+
+import httpx
+from starlette.concurrency import iterate_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_SECONDS = float(os.getenv('PDF_CONVERTER_TIMEOUT_SECONDS', '60'))
+CONNECT_TIMEOUT_SECONDS = float(os.getenv('PDF_CONVERTER_CONNECT_TIMEOUT_SECONDS', '3'))
+MAX_CONNECTIONS = int(os.getenv('PDF_CONVERTER_MAX_CONNECTIONS', '8'))
+KEEPALIVE_SECONDS = 60
+# Consecutive failures that open the circuit, and how long it stays open
+FAILURE_THRESHOLD = int(os.getenv('PDF_CONVERTER_FAILURE_THRESHOLD', '3'))
+RESET_SECONDS = float(os.getenv('PDF_CONVERTER_RESET_SECONDS', '30'))
+# Health probing; 0 disables it
+HEALTH_PATH = os.getenv('PDF_CONVERTER_HEALTH_PATH', '/health')
+HEALTH_INTERVAL_SECONDS = float(os.getenv('PDF_CONVERTER_HEALTH_INTERVAL_SECONDS', '15'))
+PROBE_TIMEOUT_SECONDS = 3
+CHUNK_SIZE = 64 * 1024
+
+
+def converter_url() -> str:
+    """Base URL of the converter service, or "" when none is configured"""
+    return os.getenv('PDF_CONVERTER_URL', '').rstrip('/')
+
+
+async def json_html_body(chunks: Iterator[str]) -> AsyncIterator[bytes]:
+    """
+    Encode HTML chunks as the converter's {"html": ...} request body, incrementally
+
+    The generator is advanced in the threadpool so rendering never blocks the event loop.
+    JSON string escaping is per character, so escaping each chunk on its own is exact.
+    """
+    yield b'{"html": "'
+    async for chunk in iterate_in_threadpool(chunks):
+        if chunk:
+            yield json.dumps(chunk)[1:-1].encode('utf-8')
+    yield b'"}'
+
+
+def join_chunks(chunks: Iterator[str]) -> Iterator[str]:
+    """Re-insert the newlines the joined document has between chunks"""
+    for index, chunk in enumerate(chunks):
+        yield chunk if index == 0 else '\n' + chunk
+
+
+def html_body(chunks: Iterator[str]) -> Iterator[bytes]:
+    """Encode HTML chunks for a streaming response"""
+    for chunk in join_chunks(chunks):
+        yield chunk.encode('utf-8')
+
+
+class CircuitBreaker:
+    """
+    Trips open after consecutive failures so callers fail fast; after a cool-down one
+    trial call is let through (half-open) and its outcome closes or re-opens the circuit
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        """
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Seconds the circuit stays open before a trial call
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self.trips = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go out now"""
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        if self.state != self.CLOSED:
+            logger.info("PDF converter circuit closed")
+        self.state = self.CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.trip()
+
+    def release(self) -> None:
+        """Free the trial slot of a call that ended without an outcome (e.g. it was cancelled)"""
+        self._trial_in_flight = False
+
+    def trip(self) -> None:
+        """Open the circuit now (e.g. after a failed health probe)"""
+        if self.state != self.OPEN:
+            self.trips += 1
+            logger.warning(f"PDF converter circuit opened for {self.reset_seconds:.0f}s")
+        self.state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class PdfStream:
+    """A successful converter response whose body has not been read yet"""
+
+    def __init__(self, response: httpx.Response, breaker: CircuitBreaker):
+        self.response = response
+        self._breaker = breaker
+        self.media_type = response.headers.get('Content-Type', 'application/pdf')
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        """Relay the PDF chunk by chunk; returns the connection to the pool when done or abandoned"""
+        try:
+            async for chunk in self.response.aiter_bytes(CHUNK_SIZE):
+                yield chunk
+        except httpx.HTTPError as e:
+            # Headers are already sent; the client sees a truncated download
+            self._breaker.record_failure()
+            logger.error(f"PDF converter stream failed: {e}")
+        finally:
+            await self.response.aclose()
+
+    async def read(self) -> bytes:
+        """Read the whole PDF (for callers that cache it)"""
+        try:
+            return await self.response.aread()
+        except httpx.HTTPError:
+            self._breaker.record_failure()
+            raise
+        finally:
+            await self.response.aclose()
+
+
+class PdfConverterService:
+    """Shared keep-alive client for the converter, guarded by a circuit breaker and a health probe"""
+
+    def __init__(
+        self,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        reset_seconds: float = RESET_SECONDS,
+        health_interval: float = HEALTH_INTERVAL_SECONDS,
+        max_connections: int = MAX_CONNECTIONS
+    ):
+        """
+        Args:
+            failure_threshold: Consecutive failures before falling back to HTML without trying
+            reset_seconds: Seconds to fail fast before letting a trial conversion through
+            health_interval: Seconds between health probes of the converter
+            max_connections: Connections kept open to the converter
+        """
+        self.breaker = CircuitBreaker(failure_threshold, reset_seconds)
+        self.health_interval = health_interval
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self.conversions = 0
+        self.failures = 0
+        self.short_circuited = 0
+        self.healthy: Optional[bool] = None
+
+    def _http(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(TIMEOUT_SECONDS, connect=CONNECT_TIMEOUT_SECONDS),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=KEEPALIVE_SECONDS
+                )
+            )
+        return self._client
+
+    async def convert(self, chunks: Iterator[str]) -> Optional[PdfStream]:
+        """
+        Send HTML to the converter service as it is generated
+
+        Args:
+            chunks: HTML chunks, joined with newlines (e.g. iter_resume_html())
+
+        Returns:
+            The PDF stream once the converter answered 200, or None if no converter is
+            configured, the circuit is open or the call failed (callers fall back to HTML)
+        """
+        base_url = converter_url()
+        if not base_url:
+            return None
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            return None
+        try:
+            return await self._send(base_url, chunks)
+        finally:
+            # Outcomes are recorded in _send; this only matters when it was cancelled
+            # mid-call, which would otherwise leave a half-open trial in flight forever
+            self.breaker.release()
+
+    async def _send(self, base_url: str, chunks: Iterator[str]) -> Optional[PdfStream]:
+        try:
+            client = self._http()
+            request = client.build_request(
+                "POST",
+                base_url + '/pdf',
+                content=json_html_body(join_chunks(chunks)),
+                headers={"Content-Type": "application/json"}
+            )
+            response = await client.send(request, stream=True)
+        except Exception as e:
+            self.failures += 1
+            self.breaker.record_failure()
+            logger.error(f"PDF converter call failed: {e}")
+            return None
+
+        if response.status_code != 200:
+            await response.aclose()
+            self.failures += 1
+            logger.error(f"PDF converter returned HTTP {response.status_code}")
+            if response.status_code >= 500:
+                self.breaker.record_failure()
+            else:
+                # The converter is up but rejected this document
+                self.breaker.record_success()
+            return None
+
+        self.conversions += 1
+        self.breaker.record_success()
+        return PdfStream(response, self.breaker)
+
+    async def probe(self) -> bool:
+        """
+        Check the converter's health endpoint and update the circuit
+
+        Any answer below 500 counts as healthy, so converters without a health route
+        (404) are still treated as reachable.
+        """
+        base_url = converter_url()
+        if not base_url:
+            self.healthy = None
+            return False
+        try:
+            response = await self._http().get(base_url + HEALTH_PATH, timeout=PROBE_TIMEOUT_SECONDS)
+            self.healthy = response.status_code < 500
+        except Exception as e:
+            logger.debug(f"PDF converter health probe failed: {e}")
+            self.healthy = False
+
+        if self.healthy:
+            if self.breaker.state != CircuitBreaker.CLOSED:
+                self.breaker.record_success()
+        else:
+            self.breaker.trip()
+        return self.healthy
+
+    async def _run(self) -> None:
+        while True:
+            await self.probe()
+            await asyncio.sleep(self.health_interval)
+
+    def start(self) -> None:
+        """Start health probing (call on app startup)"""
+        if self._task is None and self.health_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop probing and close pooled connections (call on app shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return converter statistics for the admin dashboard"""
+        return {
+            "configured": bool(converter_url()),
+            "healthy": self.healthy,
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "trips": self.breaker.trips,
+            "conversions": self.conversions,
+            "failures": self.failures,
+            "short_circuited": self.short_circuited
+        }
+
+
+# Global PDF converter service instance
+_pdf_converter_service = None
+
+def get_pdf_converter_service() -> PdfConverterService:
+    """Get or create the global PDF converter service instance"""
+    global _pdf_converter_service
+    if _pdf_converter_service is None:
+        _pdf_converter_service = PdfConverterService()
+    return _pdf_converter_service
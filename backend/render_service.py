@@ -0,0 +1,169 @@
+"""
+Render Service - Bounded process pool for CPU-bound document rendering
+ReportLab layout is pure Python and holds the GIL, so rendering in the threadpool slows
+every other request. Render jobs run in worker processes instead, with a cap on queued
+jobs (excess requests are rejected rather than piling up) and a per-job timeout.
+"""
+
+import os
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Worker processes; 0 renders in the threadpool instead (e.g. where processes cannot be started)
+MAX_WORKERS = int(os.getenv('RENDER_WORKERS', str(min(4, os.cpu_count() or 1))))
+# Jobs running or waiting before new ones are rejected
+MAX_QUEUE_DEPTH = int(os.getenv('RENDER_MAX_QUEUE', '16'))
+TIMEOUT_SECONDS = float(os.getenv('RENDER_TIMEOUT_SECONDS', '30'))
+
+
+class RenderQueueFull(Exception):
+    """Raised when too many render jobs are already queued"""
+
+
+class RenderService:
+    """Runs picklable top-level functions in a lazily started process pool"""
+
+    def __init__(
+        self,
+        max_workers: int = MAX_WORKERS,
+        max_queue_depth: int = MAX_QUEUE_DEPTH,
+        timeout: float = TIMEOUT_SECONDS
+    ):
+        """
+        Args:
+            max_workers: Worker processes (0 to render in threads)
+            max_queue_depth: Maximum jobs running or waiting at once
+            timeout: Seconds a caller waits for a job before giving up
+        """
+        self.max_workers = max_workers
+        self.max_queue_depth = max_queue_depth
+        self.timeout = timeout
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self.jobs = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        if self._pool is None:
+            # Spawned workers import only the rendering module, not the app (and its
+            # database client and threads, which forking would copy)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Run a rendering function in a worker process
+
+        Args:
+            fn: Module-level function (it is pickled by reference)
+            args: Picklable arguments
+
+        Raises:
+            RenderQueueFull: If max_queue_depth jobs are already in flight
+            TimeoutError: If the job does not finish within the timeout
+        """
+        if self._in_flight >= self.max_queue_depth:
+            self.rejected += 1
+            raise RenderQueueFull(f"{self._in_flight} render jobs already queued")
+
+        self.jobs += 1
+        try:
+            job = self._submit(fn, args)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); start a fresh pool and retry once
+            self._restart()
+            job = self._submit(fn, args)
+        try:
+            # The worker cannot be interrupted; on timeout it finishes in the background
+            return await asyncio.wait_for(job, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise TimeoutError(f"Rendering did not finish within {self.timeout:.0f}s")
+        except BrokenProcessPool:
+            self._restart()
+            raise
+
+    def _submit(self, fn: Callable[..., Any], args: Tuple[Any, ...]) -> "asyncio.Future[Any]":
+        """
+        Start a job and count it as in flight until the job itself ends, which on a
+        timeout is later than when its caller stops waiting
+        """
+        loop = asyncio.get_running_loop()
+        pool = self._executor()
+        if pool is None:
+            job = loop.run_in_executor(None, fn, *args)
+            self._in_flight += 1
+            job.add_done_callback(self._finished)
+            # Shielded so giving up on the job does not mark the still running thread as done
+            return asyncio.shield(job)
+
+        job = pool.submit(fn, *args)
+        self._in_flight += 1
+
+        def finished(_: Future) -> None:
+            # Runs in the pool's management thread (or here, if the job is cancelled)
+            try:
+                loop.call_soon_threadsafe(self._finished)
+            except RuntimeError:
+                pass  # The event loop is already closed
+
+        job.add_done_callback(finished)
+        return asyncio.wrap_future(job)
+
+    def _finished(self, _: Any = None) -> None:
+        self._in_flight -= 1
+
+    def _restart(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+            self.pool_restarts += 1
+            logger.warning("Render process pool restarted")
+
+    def warmup(self) -> None:
+        """Start the worker processes ahead of the first download (call on app startup)"""
+        pool = self._executor()
+        if pool is not None:
+            for _ in range(self.max_workers):
+                pool.submit(int)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes (call on app shutdown)"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool statistics for the admin dashboard"""
+        return {
+            "workers": self.max_workers,
+            "in_flight": self._in_flight,
+            "max_queue_depth": self.max_queue_depth,
+            "jobs": self.jobs,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "pool_restarts": self.pool_restarts
+        }
+
+
+# Global render service instance
+_render_service = None
+
+def get_render_service() -> RenderService:
+    """Get or create the global render service instance"""
+    global _render_service
+    if _render_service is None:
+        _render_service = RenderService()
+    return _render_service
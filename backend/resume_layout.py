@@ -0,0 +1,377 @@
+"""
+Resume Layout - Template-driven layout engine for the PDF resume
+Text is measured with cached per-font glyph width tables and wrapped to the real line
+width; content flows through a template (fonts, sizes, spacing, colors) and page breaks
+are computed in a single pass with keep-with-next chains, so a section heading or an
+entry header never ends up alone at the bottom of a page. The result is a list of
+pages of drawing operations, rendered onto a ReportLab canvas by draw_pages().
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+except Exception:
+    # The PDF path is disabled without ReportLab (see resume_renderer.HAS_REPORTLAB)
+    A4 = (595.2756, 841.8898)
+    stringWidth = None
+
+Color = Tuple[float, float, float]
+
+# font name -> character -> advance width at 1pt
+_WIDTH_TABLES: Dict[str, Dict[str, float]] = {}
+
+
+def text_width(text: str, font: str, size: float) -> float:
+    """Width of a string in points, from the font's cached glyph widths"""
+    table = _WIDTH_TABLES.setdefault(font, {})
+    total = 0.0
+    for char in text:
+        width = table.get(char)
+        if width is None:
+            width = table[char] = stringWidth(char, font, 1000) / 1000
+        total += width
+    return total * size
+
+
+@lru_cache(maxsize=4096)
+def wrap_text(text: str, font: str, size: float, max_width: float, hanging: float = 0.0) -> Tuple[str, ...]:
+    """
+    Greedily wrap text to a width in points
+
+    Args:
+        text: Paragraph text (whitespace is collapsed)
+        font: Font name
+        size: Font size
+        max_width: Available line width
+        hanging: Indent of continuation lines (e.g. to align under a bullet's text)
+
+    Returns:
+        The lines; words wider than a line are broken between characters
+    """
+    space = text_width(" ", font, size)
+    lines: List[str] = []
+    current: List[str] = []
+    current_width = 0.0
+    for word in text.split():
+        limit = max_width - (hanging if lines else 0.0)
+        word_width = text_width(word, font, size)
+        needed = word_width + (space if current else 0.0)
+        if current and current_width + needed > limit:
+            lines.append(" ".join(current))
+            current, current_width = [], 0.0
+            limit = max_width - hanging
+            needed = word_width
+        if not current and word_width > limit:
+            # Break an over-long word (e.g. a URL) across lines
+            piece = ""
+            for char in word:
+                if piece and text_width(piece + char, font, size) > limit:
+                    lines.append(piece)
+                    piece = ""
+                    limit = max_width - hanging
+                piece += char
+            current, current_width = [piece], text_width(piece, font, size)
+            continue
+        current.append(word)
+        current_width += needed
+    if current:
+        lines.append(" ".join(current))
+    return tuple(lines)
+
+
+class Template:
+    """Visual parameters of a resume layout"""
+
+    def __init__(
+        self,
+        name: str,
+        styles: Dict[str, Tuple[str, float, float, Color]],
+        page_size: Tuple[float, float] = A4,
+        margins: Tuple[float, float, float, float] = (50, 40, 60, 40),
+        accent: Optional[Color] = (0.72, 0.11, 0.11),
+        header_rule: bool = True,
+        heading_rule: bool = True,
+        heading_uppercase: bool = False,
+        entry_title: str = "{role} @ {company}",
+        body_indent: float = 4,
+        entry_gap: float = 6,
+        sections: Tuple[str, ...] = ("summary", "experience", "education")
+    ):
+        """
+        Args:
+            name: Template name used in requests and cache keys
+            styles: style name -> (font, size, leading, color); styles used are name,
+                title, heading, body, description, entry_title, entry_subtitle, meta, meta_italic, detail
+            page_size: (width, height) in points
+            margins: (top, right, bottom, left) in points
+            accent: Color of the header rule and heading underline (None for none)
+            header_rule: Draw a rule above the name
+            heading_rule: Underline section headings
+            heading_uppercase: Upper-case section headings
+            entry_title: Format of an experience title line
+            body_indent: Indent of description text under an entry
+            entry_gap: Space after each entry and paragraph
+            sections: Sections in order
+        """
+        self.name = name
+        self.styles = styles
+        self.page_size = page_size
+        self.margins = margins
+        self.accent = accent
+        self.header_rule = header_rule and accent is not None
+        self.heading_rule = heading_rule and accent is not None
+        self.heading_uppercase = heading_uppercase
+        self.entry_title = entry_title
+        self.body_indent = body_indent
+        self.entry_gap = entry_gap
+        self.sections = sections
+
+
+ACCENT = (0.72, 0.11, 0.11)
+BLACK = (0, 0, 0)
+MUTED = (0.3, 0.3, 0.3)
+
+TEMPLATES: Dict[str, Template] = {}
+
+
+def register_template(template: Template) -> None:
+    """Make a template available by name"""
+    TEMPLATES[template.name] = template
+
+
+def get_template(name: Optional[str]) -> Template:
+    """Look up a template, defaulting to classic; raises KeyError for unknown names"""
+    return TEMPLATES[name or "classic"]
+
+
+register_template(Template("classic", {
+    "name": ("Helvetica-Bold", 22, 26, ACCENT),
+    "title": ("Helvetica-Oblique", 13, 20, (0.2, 0.2, 0.2)),
+    "heading": ("Helvetica-Bold", 14, 18, ACCENT),
+    "body": ("Helvetica", 10, 12, BLACK),
+    "description": ("Helvetica", 10, 11, BLACK),
+    "entry_title": ("Helvetica-Bold", 11, 14, BLACK),
+    "entry_subtitle": ("Helvetica", 10, 12, BLACK),
+    "meta": ("Helvetica", 9, 12, MUTED),
+    "meta_italic": ("Helvetica-Oblique", 9, 12, MUTED),
+    "detail": ("Helvetica", 9, 10, BLACK),
+}))
+
+register_template(Template("compact", {
+    "name": ("Helvetica-Bold", 17, 20, ACCENT),
+    "title": ("Helvetica-Oblique", 11, 15, (0.2, 0.2, 0.2)),
+    "heading": ("Helvetica-Bold", 11.5, 15, ACCENT),
+    "body": ("Helvetica", 8.5, 10.5, BLACK),
+    "description": ("Helvetica", 8.5, 10, BLACK),
+    "entry_title": ("Helvetica-Bold", 9.5, 12, BLACK),
+    "entry_subtitle": ("Helvetica", 8.5, 10.5, BLACK),
+    "meta": ("Helvetica", 8, 10, MUTED),
+    "meta_italic": ("Helvetica-Oblique", 8, 10, MUTED),
+    "detail": ("Helvetica", 8, 9.5, BLACK),
+}, margins=(36, 34, 40, 34), entry_gap=4))
+
+# Plain black text, standard headings and no decoration, for applicant tracking systems
+register_template(Template("ats", {
+    "name": ("Helvetica-Bold", 16, 20, BLACK),
+    "title": ("Helvetica", 11, 16, BLACK),
+    "heading": ("Helvetica-Bold", 11, 16, BLACK),
+    "body": ("Helvetica", 10, 12.5, BLACK),
+    "description": ("Helvetica", 10, 12.5, BLACK),
+    "entry_title": ("Helvetica-Bold", 10, 13, BLACK),
+    "entry_subtitle": ("Helvetica", 10, 12.5, BLACK),
+    "meta": ("Helvetica", 9.5, 12, BLACK),
+    "meta_italic": ("Helvetica", 9.5, 12, BLACK),
+    "detail": ("Helvetica", 9.5, 12, BLACK),
+}, margins=(54, 54, 54, 54), accent=None, heading_uppercase=True,
+   entry_title="{role}, {company}", body_indent=0))
+
+
+class Item:
+    """One line (or fixed gap) of the flowed document"""
+
+    __slots__ = ("text", "style", "indent", "height", "keep_with_next", "rule")
+
+    def __init__(self, text: Optional[str], style: Optional[str], indent: float, height: float,
+                 keep_with_next: bool = False, rule: Optional[str] = None):
+        self.text = text
+        self.style = style
+        self.indent = indent
+        self.height = height
+        self.keep_with_next = keep_with_next
+        # "page" for a full-width rule above the line, "underline" for one under its text
+        self.rule = rule
+
+
+def _as_text(value: Any) -> str:
+    return value if isinstance(value, str) else str(value)
+
+
+class _Flow:
+    """Builds the item list for a template"""
+
+    def __init__(self, template: Template):
+        self.template = template
+        top, right, bottom, left = template.margins
+        self.width = template.page_size[0] - left - right
+        self.items: List[Item] = []
+
+    def line(self, text: str, style: str, indent: float = 0, keep_with_next: bool = False, rule: Optional[str] = None):
+        leading = self.template.styles[style][2]
+        self.items.append(Item(text, style, indent, leading, keep_with_next, rule))
+
+    def paragraph(self, text: str, style: str, indent: float = 0, keep_first: int = 0, hanging_prefix: str = ""):
+        """Wrap a paragraph; the first `keep_first` lines are kept with what precedes them"""
+        font, size, leading, _ = self.template.styles[style]
+        hanging = text_width(hanging_prefix, font, size) if hanging_prefix else 0.0
+        lines = wrap_text(" ".join(_as_text(text).split()), font, size, self.width - indent, hanging)
+        for number, line in enumerate(lines):
+            self.items.append(Item(line, style, indent + (hanging if number else 0), leading))
+        self._keep_back(len(lines), keep_first)
+
+    def _keep_back(self, added: int, keep_first: int):
+        # Chain the item before the paragraph to its first lines (orphan control)
+        start = len(self.items) - added
+        for index in range(max(0, start - 1), min(len(self.items), start + keep_first) - 1):
+            self.items[index].keep_with_next = True
+
+    def gap(self, height: float):
+        self.items.append(Item(None, None, 0, height))
+
+
+def build_items(profile: dict, experiences: list, education: list, template: Template) -> List[Item]:
+    """Flow the resume content into lines for a template"""
+    flow = _Flow(template)
+    flow.line(profile.get('name', ''), "name", rule="page" if template.header_rule else None)
+    flow.line(profile.get('title', ''), "title")
+
+    def heading(text):
+        flow.line(text.upper() if template.heading_uppercase else text, "heading",
+                  keep_with_next=True, rule="underline" if template.heading_rule else None)
+
+    for section in template.sections:
+        if section == "summary":
+            summary = profile.get('summary') or profile.get('about') or ''
+            if summary:
+                flow.paragraph(summary, "body")
+                flow.gap(template.entry_gap)
+
+        elif section == "experience" and experiences:
+            heading("Experience")
+            for exp in experiences:
+                role = exp.get('role') or exp.get('title', '')
+                flow.line(template.entry_title.format(role=role, company=exp.get('company', '')),
+                          "entry_title", keep_with_next=True)
+                period = exp.get('period') or f"{exp.get('startDate','')} - {exp.get('endDate','') or 'Present'}"
+                if period and period.strip():
+                    flow.line(period, "meta", keep_with_next=True)
+                if exp.get('location'):
+                    flow.line(exp['location'], "meta_italic", keep_with_next=True)
+                desc = exp.get('description', '')
+                items = desc if isinstance(desc, list) else [desc] if desc else []
+                for number, item in enumerate(items):
+                    bullet = "• " if isinstance(desc, list) else ""
+                    flow.paragraph(f"{bullet}{_as_text(item)}", "description", template.body_indent,
+                                   keep_first=2 if number == 0 else 0, hanging_prefix=bullet)
+                flow.items[-1].keep_with_next = False
+                flow.gap(template.entry_gap)
+
+        elif section == "education" and education:
+            heading("Education")
+            for edu in education:
+                flow.line(edu.get('degree') or edu.get('title', ''), "entry_title", keep_with_next=True)
+                flow.line(edu.get('institution') or edu.get('school', ''), "entry_subtitle", keep_with_next=True)
+                period = edu.get('period') or f"{edu.get('startDate','')} - {edu.get('endDate','')}"
+                if period and period.strip():
+                    flow.line(period, "meta", keep_with_next=True)
+                if edu.get('location'):
+                    flow.line(edu['location'], "meta_italic", keep_with_next=True)
+                desc = edu.get('description') or edu.get('field', '')
+                if desc:
+                    flow.paragraph(desc, "detail", template.body_indent, keep_first=2)
+                flow.items[-1].keep_with_next = False
+                flow.gap(template.entry_gap)
+
+    return flow.items
+
+
+def paginate(items: List[Item], template: Template) -> List[List[Tuple[Item, float]]]:
+    """
+    Assign every item a page and baseline in one pass
+
+    A chain of keep-with-next items moves to a new page as a whole when it does not fit
+    (unless it is taller than a page); gaps at the top of a page are dropped.
+
+    Returns:
+        Pages of (item, y) pairs, y being the top of the item's line box
+    """
+    top, _, bottom, _ = template.margins
+    page_top = template.page_size[1] - top
+    usable = page_top - bottom
+    pages: List[List[Tuple[Item, float]]] = [[]]
+    y = page_top
+    index = 0
+    # Last item of the chain being placed; its later items are not re-measured, so an
+    # oversized chain split across pages does not move its remainder to yet another page
+    chain_end = -1
+    while index < len(items):
+        item = items[index]
+        if item.text is None:
+            if pages[-1]:
+                y -= item.height
+            index += 1
+            continue
+
+        if index > chain_end:
+            # Height of the chain starting here
+            chain_end = index
+            chain_height = items[index].height
+            while items[chain_end].keep_with_next and chain_end + 1 < len(items):
+                chain_end += 1
+                chain_height += items[chain_end].height
+
+            if y - chain_height < bottom and pages[-1] and chain_height <= usable:
+                pages.append([])
+                y = page_top
+        if y - item.height < bottom and pages[-1]:
+            # Chain taller than a page: break inside it
+            pages.append([])
+            y = page_top
+        pages[-1].append((item, y))
+        y -= item.height
+        index += 1
+    return pages
+
+
+def layout_resume(profile: dict, experiences: list, education: list, template: Template) -> List[List[Tuple[Item, float]]]:
+    """Flow and paginate the resume; the result depends only on its inputs"""
+    return paginate(build_items(profile, experiences, education, template), template)
+
+
+def draw_pages(c, pages: List[List[Tuple[Item, float]]], template: Template) -> None:
+    """Draw laid-out pages onto a ReportLab canvas"""
+    _, right, _, left = template.margins
+    page_width = template.page_size[0]
+    for number, page in enumerate(pages):
+        if number:
+            c.showPage()
+        current = None
+        for item, y in page:
+            font, size, leading, color = template.styles[item.style]
+            if item.rule == "page":
+                c.setStrokeColorRGB(*template.accent)
+                c.setLineWidth(3)
+                c.line(left, y + 5, page_width - right, y + 5)
+            # Baseline sits one font size below the top of the line box
+            baseline = y - size
+            if current != (font, size, color):
+                c.setFont(font, size)
+                c.setFillColorRGB(*color)
+                current = (font, size, color)
+            c.drawString(left + item.indent, baseline, item.text)
+            if item.rule == "underline":
+                c.setStrokeColorRGB(*template.accent)
+                c.setLineWidth(1)
+                c.line(left, baseline - 3, left + text_width(item.text, font, size) + 30, baseline - 3)
@@ -0,0 +1,244 @@
+"""
+Resume Renderer - Pure functions turning resume data into PDF or HTML documents
+Kept free of application state so they can run in worker processes (see render_service)
+"""
+
+import io
+from typing import Iterator
+
+from resume_layout import draw_pages, get_template, layout_resume
+
+# ReportLab is optional at runtime; building/installation may require system toolchain (Rust for some wheels)
+HAS_REPORTLAB = True
+try:
+    from reportlab.pdfgen import canvas
+except Exception:
+    HAS_REPORTLAB = False
+
+
+def render_resume_pdf(profile: dict, experiences: list, education: list, template: str = "classic") -> bytes:
+    """Lay out the resume with the named template (see resume_layout) and return the PDF bytes"""
+    layout = get_template(template)
+    pages = layout_resume(profile, experiences, education, layout)
+    buffer = io.BytesIO()
+    # invariant drops the creation date and random document id, so equal input gives equal bytes
+    c = canvas.Canvas(buffer, pagesize=layout.page_size, invariant=1)
+    draw_pages(c, pages, layout)
+    c.save()
+    return buffer.getvalue()
+
+
+def iter_resume_html(sources: dict) -> Iterator[str]:
+    """Yield the printable HTML resume section by section"""
+    profile = sources["profile"]
+    experiences = sources["experience"]
+    education = sources["education"]
+    skills = sources["skills"]
+    ventures = sources["ventures"]
+
+    html_parts = []
+    html_parts.append('<!doctype html><html><head><meta charset="utf-8"><title>Resume</title>')
+    html_parts.append('<style>body{font-family:Arial,Helvetica,sans-serif;padding:20px;color:#111;line-height:1.4} h1{color:#2563eb;font-size:28px;margin-bottom:5px} h2{color:#1f2937;font-size:18px;margin-top:20px;margin-bottom:10px;border-bottom:2px solid #e5e7eb;padding-bottom:5px} .section{margin-top:18px} .muted{color:#6b7280;font-size:14px} .contact{color:#374151;margin-bottom:15px} .experience-item,.education-item{margin-bottom:15px} .skills-grid{display:flex;flex-wrap:wrap;gap:8px} .skill-tag{background-color:#f3f4f6;padding:4px 8px;border-radius:4px;font-size:12px;color:#374151}</style>')
+    html_parts.append('</head><body>')
+    html_parts.append(f"<h1>{profile.get('name','')}</h1>")
+    html_parts.append(f"<div class=\"muted\">{profile.get('title','')}</div>")
+    if profile.get('summary'):
+        html_parts.append(f"<div class='section'><strong>Summary</strong><p>{profile.get('summary')}</p></div>")
+    yield '\n'.join(html_parts)
+
+    if experiences:
+        html_parts = ["<div class='section'><strong>Experience</strong>"]
+        for exp in experiences:
+            html_parts.append(f"<div><strong>{exp.get('title','')} @ {exp.get('company','')}</strong><div class='muted'>{exp.get('startDate','')} - {exp.get('endDate','') or 'Present'}</div><p>{exp.get('description','')}</p></div>")
+        html_parts.append("</div>")
+        yield '\n'.join(html_parts)
+
+    if education:
+        html_parts = ["<div class='section'><strong>Education</strong>"]
+        for edu in education:
+            html_parts.append(f"<div><strong>{edu.get('degree','')} - {edu.get('institution','')}</strong><div class='muted'>{edu.get('startDate','')} - {edu.get('endDate','')}</div></div>")
+        html_parts.append("</div>")
+        yield '\n'.join(html_parts)
+
+    if skills:
+        flat_skills = []
+        for s in skills:
+            items = s.get('items') if isinstance(s, dict) else s
+            if isinstance(items, list):
+                flat_skills.extend(items)
+            elif isinstance(s, list):
+                flat_skills.extend(s)
+        yield "<div class='section'><strong>Skills</strong><p>" + ', '.join(flat_skills[:200]) + "</p></div>"
+
+    if ventures:
+        html_parts = ["<div class='section'><strong>Ventures</strong>"]
+        for v in ventures:
+            html_parts.append(f"<div><strong>{v.get('name','')}</strong> - {v.get('role','')}</div>")
+        html_parts.append("</div>")
+        yield '\n'.join(html_parts)
+
+    yield '</body></html>'
+
+
+def render_resume_html(sources: dict) -> str:
+    """Build the printable HTML resume"""
+    return '\n'.join(iter_resume_html(sources))
+
+
+def iter_ats_resume_html(resume_data: dict) -> Iterator[str]:
+    """Yield the ATS-friendly HTML resume from the AI-optimized resume data, section by section"""
+    html_parts = []
+    html_parts.append('<!doctype html><html><head><meta charset="utf-8"><title>ATS Resume</title>')
+
+    # ATS-friendly CSS
+    ats_css = """
+    <style>
+    body {
+        font-family: Arial, Helvetica, sans-serif;
+        font-size: 11pt;
+        line-height: 1.3;
+        color: #000;
+        margin: 0.5in;
+        max-width: 8.5in;
+    }
+    h1 {
+        font-size: 16pt;
+        font-weight: bold;
+        color: #000;
+        margin: 0 0 5pt 0;
+        text-align: center;
+    }
+    h2 {
+        font-size: 12pt;
+        font-weight: bold;
+        color: #000;
+        margin: 15pt 0 5pt 0;
+        border-bottom: 1pt solid #000;
+        padding-bottom: 2pt;
+        text-transform: uppercase;
+    }
+    .contact {
+        text-align: center;
+        margin-bottom: 15pt;
+        font-size: 10pt;
+    }
+    .section {
+        margin-bottom: 15pt;
+    }
+    .job-title {
+        font-weight: bold;
+        font-size: 11pt;
+    }
+    .company {
+        font-weight: bold;
+    }
+    .duration {
+        float: right;
+        font-weight: normal;
+    }
+    .achievement {
+        margin: 3pt 0;
+    }
+    .skills-section {
+        display: block;
+    }
+    .skill-category {
+        margin: 5pt 0;
+    }
+    .skill-category strong {
+        font-weight: bold;
+    }
+    ul {
+        margin: 3pt 0;
+        padding-left: 15pt;
+    }
+    li {
+        margin: 2pt 0;
+    }
+    </style>
+    """
+
+    html_parts.append(ats_css)
+    html_parts.append('</head><body>')
+    yield '\n'.join(html_parts)
+
+    # Header
+    html_parts = []
+    html_parts.append(f'<h1>{resume_data.get("name", "")}</h1>')
+
+    # Contact Info
+    contact = resume_data.get("contact", {})
+    contact_parts = []
+    if contact.get("email"):
+        contact_parts.append(contact["email"])
+    if contact.get("phone"):
+        contact_parts.append(contact["phone"])
+    if contact.get("location"):
+        contact_parts.append(contact["location"])
+    if contact.get("linkedin"):
+        contact_parts.append(contact["linkedin"])
+    if contact.get("github"):
+        contact_parts.append(contact["github"])
+
+    if contact_parts:
+        html_parts.append(f'<div class="contact">{" | ".join(contact_parts)}</div>')
+
+    # Professional Title
+    if resume_data.get("title"):
+        html_parts.append(f'<div style="text-align: center; font-weight: bold; margin-bottom: 10pt;">{resume_data["title"]}</div>')
+
+    yield '\n'.join(html_parts)
+
+    # Summary
+    if resume_data.get("summary"):
+        yield '\n'.join(['<h2>Professional Summary</h2>', f'<div class="section">{resume_data["summary"]}</div>'])
+
+    # Experience
+    if resume_data.get("experience"):
+        html_parts = ['<h2>Professional Experience</h2>']
+        html_parts.append('<div class="section">')
+        for exp in resume_data["experience"]:
+            html_parts.append(f'<div style="margin-bottom: 12pt;">')
+            html_parts.append(f'<div class="job-title">{exp.get("title", "")} <span class="duration">{exp.get("duration", "")}</span></div>')
+            html_parts.append(f'<div class="company">{exp.get("company", "")}</div>')
+            if exp.get("achievements"):
+                html_parts.append('<ul>')
+                for achievement in exp["achievements"]:
+                    html_parts.append(f'<li>{achievement}</li>')
+                html_parts.append('</ul>')
+            html_parts.append('</div>')
+        html_parts.append('</div>')
+        yield '\n'.join(html_parts)
+
+    # Education
+    if resume_data.get("education"):
+        html_parts = ['<h2>Education</h2>']
+        html_parts.append('<div class="section">')
+        for edu in resume_data["education"]:
+            html_parts.append(f'<div style="margin-bottom: 8pt;">')
+            html_parts.append(f'<div class="job-title">{edu.get("degree", "")} <span class="duration">{edu.get("year", "")}</span></div>')
+            html_parts.append(f'<div>{edu.get("institution", "")}</div>')
+            html_parts.append('</div>')
+        html_parts.append('</div>')
+        yield '\n'.join(html_parts)
+
+    # Skills
+    if resume_data.get("skills"):
+        html_parts = ['<h2>Technical Skills</h2>']
+        html_parts.append('<div class="section skills-section">')
+        skills = resume_data["skills"]
+
+        for category, skill_list in skills.items():
+            if skill_list:
+                category_name = category.replace("_", " ").title()
+                html_parts.append(f'<div class="skill-category"><strong>{category_name}:</strong> {", ".join(skill_list)}</div>')
+
+        html_parts.append('</div>')
+        yield '\n'.join(html_parts)
+
+    yield '</body></html>'
+
+
+def render_ats_resume_html(resume_data: dict) -> str:
+    """Build the ATS-friendly HTML resume from the AI-optimized resume data"""
+    return '\n'.join(iter_ats_resume_html(resume_data))
@@ -0,0 +1,245 @@
+"""
+Resume Service - Content-addressed cache of rendered resume downloads
+A rendered resume is keyed by a hash of its source documents, the output format and
+the template version, so identical data is rendered once and served from memory with
+an ETag (conditional requests) and byte-range support. After an edit to the source
+collections the resume is re-rendered in the background, before the next download.
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from starlette.responses import Response
+
+from conditional import etag_matches, if_range_matches
+
+logger = logging.getLogger(__name__)
+
+# Bump when the resume layout changes so cached renders are not reused
+TEMPLATE_VERSION = 2
+DEFAULT_MAX_ENTRIES = int(os.getenv('RESUME_CACHE_MAX_ENTRIES', '8'))
+# Edits arriving within this many seconds are coalesced into one background render
+REFRESH_DELAY_SECONDS = float(os.getenv('RESUME_REFRESH_DELAY_SECONDS', '2'))
+
+# Collections a resume is built from
+RESUME_SOURCES = ("profile", "experience", "education", "skills", "ventures")
+
+
+def source_hash(sources: Dict[str, Any], output_format: str) -> str:
+    """Hash the source documents together with the output format and template version"""
+    canonical = json.dumps(sources, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(f"{TEMPLATE_VERSION}\n{output_format}\n{canonical}".encode("utf-8")).hexdigest()
+
+
+class RenderedResume:
+    """Rendered resume bytes with the headers they are served with"""
+
+    def __init__(self, body: bytes, media_type: str, filename: str, digest: str, cacheable: bool = True):
+        """
+        Args:
+            body: Rendered document
+            media_type: Content type (application/pdf or text/html)
+            filename: Download file name
+            digest: Source hash the document was rendered from
+            cacheable: False for degraded output (e.g. an HTML fallback) that must not be reused
+        """
+        self.body = body
+        self.media_type = media_type
+        self.filename = filename
+        self.cacheable = cacheable
+        # Degraded output gets its own validator so clients never mix it with the real render
+        self.etag = f'"{digest[:32]}"' if cacheable else f'W/"{digest[:32]}-{media_type.split("/")[-1]}"'
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range "bytes=" Range header
+
+    Returns:
+        Inclusive (start, end), or None to serve the whole body (no header, or a form
+        this server does not support such as multiple ranges)
+
+    Raises:
+        ValueError: If the range cannot be satisfied
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[6:].strip().partition("-")
+    if not (start_text or end_text) or any(text and not text.isdigit() for text in (start_text, end_text)):
+        return None
+    if size == 0:
+        raise ValueError("Empty document")
+    if not start_text:
+        # Suffix range: the last N bytes
+        length = int(end_text)
+        if length == 0:
+            raise ValueError("Empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(start_text)
+    end = min(int(end_text), size - 1) if end_text.isdigit() else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range outside the document")
+    return start, end
+
+
+def resume_response(resume: RenderedResume, headers) -> Response:
+    """
+    Serve a rendered resume, honouring If-None-Match, Range and If-Range
+
+    Args:
+        resume: The rendered resume
+        headers: Request headers
+    """
+    response_headers = {
+        "ETag": resume.etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f"attachment; filename={resume.filename}"
+    }
+    if etag_matches(headers.get("if-none-match"), resume.etag):
+        return Response(status_code=304, headers=response_headers)
+
+    size = len(resume.body)
+    byte_range = None
+    if if_range_matches(headers.get("if-range"), resume.etag):
+        try:
+            byte_range = parse_range(headers.get("range"), size)
+        except ValueError:
+            return Response(status_code=416, headers={**response_headers, "Content-Range": f"bytes */{size}"})
+
+    if byte_range is None:
+        return Response(content=resume.body, media_type=resume.media_type, headers=response_headers)
+    start, end = byte_range
+    return Response(
+        content=resume.body[start:end + 1],
+        status_code=206,
+        media_type=resume.media_type,
+        headers={**response_headers, "Content-Range": f"bytes {start}-{end}/{size}"}
+    )
+
+
+class ResumeService:
+    """LRU of rendered resumes keyed by source hash, refreshed in the background after edits"""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, refresh_delay: float = REFRESH_DELAY_SECONDS):
+        """
+        Args:
+            max_entries: Maximum number of rendered resumes kept in memory
+            refresh_delay: Seconds to wait after an edit before re-rendering
+        """
+        self.max_entries = max_entries
+        self.refresh_delay = refresh_delay
+        self._renders: "OrderedDict[str, RenderedResume]" = OrderedDict()
+        # Per-digest render locks with the number of requests using them
+        self._locks: Dict[str, List] = {}
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._refresh_requested = False
+        self.hits = 0
+        self.renders = 0
+        self.background_renders = 0
+
+    async def get(
+        self,
+        sources: Dict[str, Any],
+        output_format: str,
+        render: Callable[[Dict[str, Any], str], Awaitable[RenderedResume]]
+    ) -> RenderedResume:
+        """
+        Return the resume for the given sources, rendering it only if these exact
+        sources were not rendered before (concurrent misses render once)
+
+        Args:
+            sources: Source documents by collection name
+            output_format: Output format name, part of the cache key
+            render: Coroutine function called with (sources, digest) on a miss, returning
+                a RenderedResume built with that digest
+        """
+        digest = source_hash(sources, output_format)
+        resume = self._lookup(digest)
+        if resume is not None:
+            self.hits += 1
+            return resume
+
+        slot = self._locks.get(digest)
+        if slot is None:
+            slot = self._locks[digest] = [asyncio.Lock(), 0]
+        slot[1] += 1
+        try:
+            async with slot[0]:
+                resume = self._lookup(digest)
+                if resume is not None:
+                    self.hits += 1
+                    return resume
+                resume = await render(sources, digest)
+                self.renders += 1
+                if resume.cacheable:
+                    self._renders[digest] = resume
+                    while len(self._renders) > self.max_entries:
+                        self._renders.popitem(last=False)
+                return resume
+        finally:
+            # Dropped even when rendering fails, once no other request waits on it
+            slot[1] -= 1
+            if slot[1] == 0:
+                del self._locks[digest]
+
+    def _lookup(self, digest: str) -> Optional[RenderedResume]:
+        resume = self._renders.get(digest)
+        if resume is not None:
+            self._renders.move_to_end(digest)
+        return resume
+
+    def schedule_refresh(self, prepare: Callable[[], Awaitable[None]]) -> None:
+        """
+        Re-render in the background after an edit; edits in quick succession share one render
+
+        Args:
+            prepare: Coroutine function loading the current sources and calling get()
+        """
+        self._refresh_requested = True
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        async def refresh():
+            # Repeat if another edit arrived while the sources were being rendered
+            while self._refresh_requested:
+                await asyncio.sleep(self.refresh_delay)
+                self._refresh_requested = False
+                try:
+                    await prepare()
+                    self.background_renders += 1
+                except Exception as e:
+                    logger.warning(f"Background resume render failed: {e}")
+
+        try:
+            self._refresh_task = asyncio.get_running_loop().create_task(refresh())
+        except RuntimeError:
+            # Invalidated outside the event loop (e.g. a script); the next download renders
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Return cache statistics for the admin dashboard"""
+        return {
+            "entries": len(self._renders),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "renders": self.renders,
+            "background_renders": self.background_renders,
+            "template_version": TEMPLATE_VERSION
+        }
+
+
+# Global resume service instance
+_resume_service = None
+
+def get_resume_service() -> ResumeService:
+    """Get or create the global resume service instance"""
+    global _resume_service
+    if _resume_service is None:
+        _resume_service = ResumeService()
+    return _resume_service
@@ -0,0 +1,312 @@
+"""
+Retrieval Service - BM25 index over portfolio content for grounding AI chat answers
+Documents are split into small chunks; only the top-scoring chunks for a question are
+added to the prompt. Sources are re-indexed incrementally when their content changes.
+"""
+
+import os
+import re
+import math
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Words per chunk and words shared between consecutive chunks
+CHUNK_WORDS = int(os.getenv('RETRIEVAL_CHUNK_WORDS', '120'))
+CHUNK_OVERLAP = int(os.getenv('RETRIEVAL_CHUNK_OVERLAP', '20'))
+DEFAULT_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', '4'))
+# Upper bound on the context added to a single prompt
+MAX_CONTEXT_CHARS = int(os.getenv('RETRIEVAL_MAX_CONTEXT_CHARS', '3000'))
+
+# BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Fields that never carry searchable text
+SKIP_FIELDS = {
+    "_id", "id", "image", "featured_image", "images", "slug", "status", "views",
+    "created_at", "updated_at", "published_date", "last_updated", "ai_generated", "level"
+}
+
+# Field used as the chunk heading, by priority
+TITLE_FIELDS = ("title", "name", "role", "degree", "category", "event")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "but", "by", "can", "did", "do", "does",
+    "for", "from", "has", "have", "he", "her", "his", "how", "i", "in", "is", "it", "its",
+    "me", "my", "of", "on", "or", "she", "that", "the", "their", "them", "they", "this",
+    "to", "was", "what", "when", "where", "which", "who", "why", "will", "with", "you", "your"
+}
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase a text and split it into search terms, dropping stopwords"""
+    return [
+        token.rstrip(".") for token in _TOKEN.findall(text.lower())
+        if token not in STOPWORDS
+    ]
+
+
+class BM25Index:
+    """Okapi BM25 inverted index supporting incremental add and remove"""
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        # term -> {doc_id: term frequency}
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, Tuple[str, ...]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._lengths
+
+    @property
+    def vocabulary_size(self) -> int:
+        """Number of distinct indexed terms"""
+        return len(self._postings)
+
+    def add(self, doc_id: str, tokens: List[str]) -> None:
+        """Index a document, replacing any previous version with the same id"""
+        if doc_id in self._lengths:
+            self.remove(doc_id)
+
+        frequencies: Dict[str, int] = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+
+        self._terms[doc_id] = tuple(frequencies)
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        """Remove a document from the index (no-op if absent)"""
+        if doc_id not in self._lengths:
+            return
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+
+    def terms(self) -> Iterable[str]:
+        """Iterate over the indexed terms"""
+        return self._postings.keys()
+
+    def document_frequency(self, term: str) -> int:
+        """Number of documents containing a term"""
+        return len(self._postings.get(term, ()))
+
+    def idf(self, term: str) -> float:
+        """Inverse document frequency of a term (never negative)"""
+        n = self.document_frequency(term)
+        return math.log(1 + (len(self._lengths) - n + 0.5) / (n + 0.5))
+
+    def scores(self, terms: Iterable[str]) -> Dict[str, float]:
+        """Compute BM25 scores for every document matching at least one term"""
+        if not self._lengths:
+            return {}
+        average_length = self._total_length / len(self._lengths) or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(terms):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, frequency in postings.items():
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+        return scores
+
+    def search(self, terms: Iterable[str], k: int) -> List[Tuple[str, float]]:
+        """Return the top-k (doc_id, score) pairs"""
+        scores = self.scores(terms)
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def flatten_text(value: Any) -> List[str]:
+    """Collect the string content of a document, skipping identifiers and metadata"""
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, dict):
+        parts = []
+        for key, item in value.items():
+            if key not in SKIP_FIELDS:
+                parts.extend(flatten_text(item))
+        return parts
+    if isinstance(value, (list, tuple)):
+        parts = []
+        for item in value:
+            parts.extend(flatten_text(item))
+        return parts
+    return []
+
+
+def document_title(doc: Dict[str, Any]) -> str:
+    """Pick a short heading for a document's chunks"""
+    title = next((doc[field] for field in TITLE_FIELDS if isinstance(doc.get(field), str) and doc[field]), "")
+    organisation = doc.get("company") or doc.get("institution") or doc.get("issuer")
+    if title and isinstance(organisation, str) and organisation:
+        return f"{title} at {organisation}"
+    return title
+
+
+def chunk_words(words: List[str], size: int = CHUNK_WORDS, overlap: int = CHUNK_OVERLAP) -> List[str]:
+    """Split a word list into overlapping chunks"""
+    if len(words) <= size:
+        return [" ".join(words)] if words else []
+    step = max(size - overlap, 1)
+    return [" ".join(words[start:start + size]) for start in range(0, len(words) - overlap, step)]
+
+
+class RetrievalService:
+    """Chunked BM25 retrieval over the public portfolio collections"""
+
+    def __init__(self, top_k: int = DEFAULT_TOP_K, max_context_chars: int = MAX_CONTEXT_CHARS):
+        """
+        Args:
+            top_k: Number of chunks added to a prompt
+            max_context_chars: Maximum size of the context block
+        """
+        self.top_k = top_k
+        self.max_context_chars = max_context_chars
+        self._index = BM25Index()
+        # chunk id -> (content hash, label, text)
+        self._chunks: Dict[str, Tuple[str, str, str]] = {}
+        # source -> chunk ids currently indexed for it
+        self._source_chunks: Dict[str, set] = {}
+        # source -> documents object last indexed (the cache returns the same object until it changes)
+        self._source_values: Dict[str, Any] = {}
+        self.fingerprint = ""
+        self.reindexed_chunks = 0
+        self.queries = 0
+
+    def _document_chunks(self, source: str, docs: List[Dict[str, Any]]) -> Dict[str, Tuple[str, str, str]]:
+        chunks = {}
+        label_prefix = source.replace("_", " ").title()
+        for position, doc in enumerate(docs):
+            if not isinstance(doc, dict):
+                continue
+            doc_key = doc.get("id") or doc.get("_id") or str(position)
+            title = document_title(doc)
+            label = f"{label_prefix}: {title}" if title else label_prefix
+            words = " ".join(flatten_text(doc)).split()
+            for n, text in enumerate(chunk_words(words)):
+                content_hash = hashlib.sha1(f"{label}\n{text}".encode("utf-8")).hexdigest()
+                chunks[f"{source}:{doc_key}:{n}"] = (content_hash, label, text)
+        return chunks
+
+    def sync_source(
+        self,
+        source: str,
+        value: Any,
+        extract: Optional[Callable[[Any], List[Dict[str, Any]]]] = None
+    ) -> bool:
+        """
+        Bring one source up to date, re-tokenizing only chunks whose content changed
+
+        Args:
+            source: Source name (e.g. "experience")
+            value: Current cached value of the source (a document or a list of documents)
+            extract: Optional function turning the value into a list of documents
+
+        Returns:
+            True if the index changed
+        """
+        if source in self._source_values and self._source_values[source] is value:
+            return False
+        self._source_values[source] = value
+
+        if extract is not None:
+            docs = extract(value)
+        elif isinstance(value, dict):
+            docs = [value]
+        else:
+            docs = value or []
+
+        chunks = self._document_chunks(source, docs)
+        previous = self._source_chunks.get(source, set())
+        changed = False
+
+        for chunk_id in previous - chunks.keys():
+            self._index.remove(chunk_id)
+            del self._chunks[chunk_id]
+            changed = True
+
+        for chunk_id, chunk in chunks.items():
+            existing = self._chunks.get(chunk_id)
+            if existing is not None and existing[0] == chunk[0]:
+                continue
+            self._chunks[chunk_id] = chunk
+            self._index.add(chunk_id, tokenize(f"{chunk[1]} {chunk[2]}"))
+            self.reindexed_chunks += 1
+            changed = True
+
+        self._source_chunks[source] = set(chunks)
+        if changed:
+            digest = hashlib.sha256()
+            for chunk_id in sorted(self._chunks):
+                digest.update(self._chunks[chunk_id][0].encode("ascii"))
+            self.fingerprint = digest.hexdigest()[:16]
+            logger.debug(f"Retrieval index updated for {source}: {len(chunks)} chunks")
+        return changed
+
+    def search(self, query: str, k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Find the chunks most relevant to a question
+
+        Returns:
+            List of {"label", "text", "score"} dicts, best first
+        """
+        self.queries += 1
+        results = []
+        for chunk_id, score in self._index.search(tokenize(query), k or self.top_k):
+            _, label, text = self._chunks[chunk_id]
+            results.append({"label": label, "text": text, "score": round(score, 4)})
+        return results
+
+    def context_for(self, query: str, k: Optional[int] = None) -> str:
+        """Format the top chunks for a question as a prompt section ("" when nothing matches)"""
+        lines = []
+        size = 0
+        for result in self.search(query, k):
+            line = f"- [{result['label']}] {result['text']}"
+            if size + len(line) > self.max_context_chars:
+                break
+            lines.append(line)
+            size += len(line)
+        if not lines:
+            return ""
+        return "Relevant portfolio information:\n" + "\n".join(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index statistics for the admin dashboard"""
+        return {
+            "sources": sorted(self._source_values),
+            "chunks": len(self._chunks),
+            "terms": self._index.vocabulary_size,
+            "reindexed_chunks": self.reindexed_chunks,
+            "queries": self.queries
+        }
+
+
+# Global retrieval service instance
+_retrieval_service = None
+
+def get_retrieval_service() -> RetrievalService:
+    """Get or create the global retrieval service instance"""
+    global _retrieval_service
+    if _retrieval_service is None:
+        _retrieval_service = RetrievalService()
+    return _retrieval_service
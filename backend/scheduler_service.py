@@ -0,0 +1,222 @@
+"""
+Scheduler Service - Publishes scheduled blog posts at their publication time
+Each scheduled post has one job in the persistent job queue. Every worker polls for due
+jobs; the queue's leases make sure a post is published by exactly one of them. Posts
+that come due together are published with one update and reported to the application
+in one batch, so caches, feeds and the search index are refreshed once per batch.
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from database import blogs_collection
+from job_queue import JobQueue, get_job_queue
+
+logger = logging.getLogger(__name__)
+
+JOB_TYPE = "publish_blog"
+# Upper bound on the time between polls; a post is published at most this late
+POLL_SECONDS = float(os.getenv('SCHEDULER_POLL_SECONDS', '30'))
+# Due posts published per update
+BATCH_SIZE = 50
+# Delay before a failed publish is retried
+RETRY_SECONDS = 60
+
+
+def parse_schedule(value: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO publication time into naive UTC (naive input is taken as UTC)"""
+    if not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
+
+def job_id(blog_id: str) -> str:
+    return f"{JOB_TYPE}:{blog_id}"
+
+
+class SchedulerService:
+    """Background loop turning due `scheduled` posts into `published` ones"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        collection=None,
+        poll_seconds: float = POLL_SECONDS,
+        batch_size: int = BATCH_SIZE
+    ):
+        """
+        Args:
+            queue: Job queue holding one publish job per scheduled post
+            collection: Blogs collection
+            poll_seconds: Maximum seconds between checks for due posts
+            batch_size: Posts claimed and published per batch
+        """
+        self.queue = queue
+        self.collection = collection
+        self.poll_seconds = poll_seconds
+        self.batch_size = batch_size
+        # Called with the newly published posts after each batch
+        self.on_published: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.failed_runs = 0
+        self.last_run: Optional[str] = None
+
+    async def sync_post(self, blog: Dict[str, Any]) -> None:
+        """
+        Bring a post's publish job in line with the post after a write: scheduled posts
+        get (or move) their job, any other status cancels it
+        """
+        if not self.queue.available or not blog or not blog.get("id"):
+            return
+        run_at = parse_schedule(blog.get("scheduled_date"))
+        if blog.get("status") == "scheduled" and run_at is not None:
+            await self.queue.enqueue(JOB_TYPE, {"blog_id": blog["id"]}, run_at=run_at, job_id=job_id(blog["id"]))
+            # Re-plan the sleep in case this post is due before the next poll
+            self._wakeup.set()
+        else:
+            await self.queue.cancel(job_id(blog["id"]))
+
+    async def cancel_post(self, blog_id: str) -> None:
+        """Drop the publish job of a deleted post"""
+        if self.queue.available:
+            await self.queue.cancel(job_id(blog_id))
+
+    async def run_due(self) -> int:
+        """
+        Publish every post whose time has come, in batches
+
+        Returns:
+            Number of posts published
+        """
+        if not self.queue.available or self.collection is None:
+            return 0
+        total = 0
+        while True:
+            jobs = await self.queue.claim_batch(JOB_TYPE, self.batch_size)
+            if not jobs:
+                break
+            try:
+                total += await self._publish(jobs)
+            except Exception as e:
+                self.failed_runs += 1
+                logger.error(f"Scheduled publishing failed: {e}")
+                for job in jobs:
+                    await self.queue.fail(job, str(e), retry_in=RETRY_SECONDS)
+                break
+        self.last_run = datetime.utcnow().isoformat()
+        return total
+
+    async def _publish(self, jobs: List[Dict[str, Any]]) -> int:
+        """
+        Publish the posts of a batch of claimed jobs and report them to on_published
+
+        Each job records its publication time before its post is flipped. If the worker
+        dies (or on_published fails) after the flip, the job is claimed again once its
+        lease expires (or after RETRY_SECONDS) and on_published runs for that post then.
+        on_published only refreshes this worker's caches, feeds and search index; other
+        workers see the post once their cache TTL or search refresh interval has passed.
+        """
+        now = datetime.utcnow().isoformat()
+        published_dates: Dict[str, str] = {}
+        for job in jobs:
+            blog_id = job["payload"]["blog_id"]
+            # A retried job keeps the time its post was (possibly already) published with
+            published_date = (job.get("progress") or {}).get("published_date")
+            if published_date is None:
+                published_date = now
+                if not await self.queue.renew(job, progress={"published_date": now}):
+                    continue  # Cancelled, or taken over by another worker
+            published_dates[blog_id] = published_date
+
+        # Only posts still scheduled: one edited back to draft keeps its status
+        for published_date in set(published_dates.values()):
+            await self.collection.update_many(
+                {
+                    "id": {"$in": [blog_id for blog_id, date in published_dates.items() if date == published_date]},
+                    "status": "scheduled"
+                },
+                {"$set": {"status": "published", "published_date": published_date, "updated_at": published_date}}
+            )
+        published = [
+            blog for blog in await self.collection.find(
+                {"id": {"$in": list(published_dates)}, "status": "published"}, {"_id": 0}
+            ).to_list(length=None)
+            if blog.get("published_date") == published_dates[blog["id"]]
+        ]
+
+        if published and self.on_published is not None:
+            await self.on_published(published)
+        for job in jobs:
+            await self.queue.complete(job)
+
+        self.published += len(published)
+        if published:
+            logger.info(f"Published {len(published)} scheduled blog post(s)")
+        return len(published)
+
+    async def _seconds_until_next(self) -> float:
+        next_run = await self.queue.next_run_at(JOB_TYPE)
+        if next_run is None:
+            return self.poll_seconds
+        return min(self.poll_seconds, max(0.0, (next_run - datetime.utcnow()).total_seconds()))
+
+    async def _run(self) -> None:
+        """Background loop sleeping until the next scheduled post (or the poll interval)"""
+        while True:
+            try:
+                await self.run_due()
+                timeout = await self._seconds_until_next() if self.queue.available else self.poll_seconds
+            except Exception as e:
+                logger.error(f"Scheduler loop error: {e}")
+                timeout = self.poll_seconds
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the background loop (call on app startup)"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop (call on app shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return scheduler statistics for the admin dashboard"""
+        return {
+            "published": self.published,
+            "failed_runs": self.failed_runs,
+            "last_run": self.last_run,
+            "poll_seconds": self.poll_seconds
+        }
+
+
+# Global scheduler service instance
+_scheduler_service = None
+
+def get_scheduler_service() -> SchedulerService:
+    """Get or create the global scheduler service instance"""
+    global _scheduler_service
+    if _scheduler_service is None:
+        _scheduler_service = SchedulerService(get_job_queue(), blogs_collection)
+    return _scheduler_service
@@ -0,0 +1,317 @@
+"""
+Search Service - In-memory full-text search over published blog posts and white papers
+BM25 ranking with field boosts, prefix expansion for typeahead and tag/category facets.
+The index is built once from MongoDB and kept current by the write handlers.
+"""
+
+import os
+import time
+import bisect
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from database import blogs_collection, whitepapers_collection, is_mongodb_available
+from retrieval_service import BM25Index, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Full rebuild interval; picks up writes handled by other uvicorn workers
+REFRESH_SECONDS = float(os.getenv('SEARCH_REFRESH_SECONDS', '300'))
+# Completions a trailing prefix expands to
+MAX_PREFIX_EXPANSIONS = 10
+
+# Field boosts, applied by repeating a field's tokens
+FIELD_WEIGHTS = {"title": 3, "tags": 2, "excerpt": 1, "content": 1}
+
+BLOG_PROJECTION = {
+    "_id": 0, "id": 1, "slug": 1, "title": 1, "excerpt": 1, "content": 1, "tags": 1,
+    "category": 1, "status": 1, "created_at": 1, "published_date": 1
+}
+WHITEPAPER_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "briefDescription": 1, "keyPoints": 1, "category": 1,
+    "publishedDate": 1
+}
+
+
+def blog_fields(blog: Dict[str, Any]) -> Dict[str, str]:
+    """Searchable text of a blog post, by field"""
+    return {
+        "title": blog.get("title") or "",
+        "tags": " ".join(blog.get("tags") or []),
+        "excerpt": blog.get("excerpt") or "",
+        "content": blog.get("content") or ""
+    }
+
+
+def whitepaper_fields(paper: Dict[str, Any]) -> Dict[str, str]:
+    """Searchable text of a white paper, by field"""
+    return {
+        "title": paper.get("title") or "",
+        "excerpt": paper.get("briefDescription") or "",
+        "content": " ".join(paper.get("keyPoints") or [])
+    }
+
+
+class SearchService:
+    """Inverted index with per-document metadata for result cards and facets"""
+
+    def __init__(self, refresh_seconds: float = REFRESH_SECONDS):
+        """
+        Args:
+            refresh_seconds: Age after which the next query starts a background rebuild from MongoDB
+        """
+        self.refresh_seconds = refresh_seconds
+        self._index = BM25Index()
+        # "type:id" -> result card (title, excerpt, tags, ...)
+        self._documents: Dict[str, Dict[str, Any]] = {}
+        self._vocabulary: List[str] = []
+        self._vocabulary_dirty = False
+        self._built_at: Optional[float] = None
+        self._build_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Writes made while a rebuild reads MongoDB, replayed onto the rebuilt index
+        self._writes: Optional[List[Tuple]] = None
+        self.queries = 0
+        self.rebuilds = 0
+
+    def _add(self, doc_type: str, doc_id: str, fields: Dict[str, str], card: Dict[str, Any]) -> None:
+        tokens: List[str] = []
+        for field, text in fields.items():
+            tokens.extend(tokenize(text) * FIELD_WEIGHTS.get(field, 1))
+        key = f"{doc_type}:{doc_id}"
+        self._index.add(key, tokens)
+        self._documents[key] = {"type": doc_type, "id": doc_id, **card}
+        self._vocabulary_dirty = True
+        if self._writes is not None:
+            self._writes.append((doc_type, doc_id, fields, card))
+
+    def remove(self, doc_type: str, doc_id: str) -> None:
+        """Drop a document from the index (no-op if absent)"""
+        key = f"{doc_type}:{doc_id}"
+        if key in self._documents:
+            self._index.remove(key)
+            del self._documents[key]
+            self._vocabulary_dirty = True
+        if self._writes is not None:
+            self._writes.append((doc_type, doc_id, None, None))
+
+    def upsert_blog(self, blog: Dict[str, Any]) -> None:
+        """Index a blog post after a write; unpublished posts are removed instead"""
+        if not blog or not blog.get("id"):
+            return
+        if blog.get("status") != "published":
+            self.remove("blog", blog["id"])
+            return
+        self._add("blog", blog["id"], blog_fields(blog), {
+            "title": blog.get("title"),
+            "slug": blog.get("slug"),
+            "excerpt": blog.get("excerpt"),
+            "tags": blog.get("tags") or [],
+            "category": blog.get("category"),
+            "date": blog.get("published_date") or blog.get("created_at")
+        })
+
+    def upsert_whitepaper(self, paper: Dict[str, Any]) -> None:
+        """Index a white paper after a write"""
+        if not paper or not paper.get("id"):
+            return
+        self._add("whitepaper", paper["id"], whitepaper_fields(paper), {
+            "title": paper.get("title"),
+            "excerpt": paper.get("briefDescription"),
+            "tags": [],
+            "category": paper.get("category"),
+            "date": paper.get("publishedDate")
+        })
+
+    async def build(self) -> None:
+        """Rebuild the whole index from MongoDB"""
+        async with self._build_lock:
+            await self._build()
+
+    async def _build(self) -> None:
+        if not is_mongodb_available() or blogs_collection is None:
+            return
+        # Queries keep using the current index while MongoDB is read
+        self._writes = []
+        try:
+            blogs = await blogs_collection.find({"status": "published"}, BLOG_PROJECTION).to_list(length=None)
+            papers = await whitepapers_collection.find({}, WHITEPAPER_PROJECTION).to_list(length=None)
+        finally:
+            writes, self._writes = self._writes, None
+
+        current = (self._index, self._documents)
+        self._index = BM25Index()
+        self._documents = {}
+        try:
+            for blog in blogs:
+                self.upsert_blog(blog)
+            for paper in papers:
+                self.upsert_whitepaper(paper)
+            # Writes handled while reading may not be in what was read; no await happens
+            # between the swap and this replay, so queries never see the index without them
+            for doc_type, doc_id, fields, card in writes:
+                if fields is None:
+                    self.remove(doc_type, doc_id)
+                else:
+                    self._add(doc_type, doc_id, fields, card)
+        except Exception:
+            self._index, self._documents = current
+            raise
+        finally:
+            self._vocabulary_dirty = True
+
+        self._built_at = time.monotonic()
+        self.rebuilds += 1
+        logger.info(f"Search index built: {len(self._documents)} documents")
+
+    def _is_fresh(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at <= self.refresh_seconds
+
+    async def _refresh(self) -> None:
+        async with self._build_lock:
+            # Another query may have rebuilt the index while this one waited
+            if self._is_fresh():
+                return
+            try:
+                await self._build()
+            except Exception as e:
+                # Keep answering from the previous index
+                logger.error(f"Search index rebuild failed: {e}")
+
+    def mark_stale(self) -> None:
+        """Rebuild on the next query (after bulk writes such as a data migration)"""
+        self._built_at = None
+
+    async def ensure_fresh(self) -> None:
+        """
+        Build the index on first use; once built, an index older than the refresh interval
+        is rebuilt in the background while queries keep being answered from it
+        """
+        if self._is_fresh():
+            return
+        if self.rebuilds == 0:
+            await self._refresh()
+        elif self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    def _sorted_vocabulary(self) -> List[str]:
+        if self._vocabulary_dirty:
+            self._vocabulary = sorted(self._index.terms())
+            self._vocabulary_dirty = False
+        return self._vocabulary
+
+    def complete(self, prefix: str, limit: int = MAX_PREFIX_EXPANSIONS) -> List[str]:
+        """Indexed terms starting with a prefix, most common first"""
+        vocabulary = self._sorted_vocabulary()
+        start = bisect.bisect_left(vocabulary, prefix)
+        matches = []
+        for term in vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            matches.append(term)
+        matches.sort(key=lambda term: self._index.document_frequency(term), reverse=True)
+        return matches[:limit]
+
+    def _query_terms(self, query: str, prefix: bool) -> List[str]:
+        terms = tokenize(query)
+        if prefix and terms and not query.endswith(" "):
+            # Typeahead: the word being typed matches every term it starts
+            last = terms.pop()
+            terms.extend(self.complete(last) or [last])
+        return terms
+
+    def search(
+        self,
+        query: str = "",
+        doc_type: Optional[str] = None,
+        tag: Optional[str] = None,
+        category: Optional[str] = None,
+        prefix: bool = True,
+        limit: int = 10,
+        offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Rank documents for a query
+
+        Args:
+            query: Free-text query; empty lists every document, newest first
+            doc_type: Restrict to "blog" or "whitepaper"
+            tag: Restrict to documents with this tag
+            category: Restrict to this category
+            prefix: Treat the last query word as a prefix
+            limit: Page size
+            offset: Results to skip
+
+        Returns:
+            {"total", "results", "facets": {"type", "tags", "category"}}
+        """
+        self.queries += 1
+        terms = self._query_terms(query, prefix)
+        if terms:
+            scores = self._index.scores(terms)
+        else:
+            scores = {key: 0.0 for key in self._documents}
+
+        matches = []
+        for key, score in scores.items():
+            doc = self._documents[key]
+            if doc_type and doc["type"] != doc_type:
+                continue
+            if tag and tag not in doc["tags"]:
+                continue
+            if category and doc.get("category") != category:
+                continue
+            matches.append((score, doc))
+
+        facets = {"type": Counter(), "tags": Counter(), "category": Counter()}
+        for _, doc in matches:
+            facets["type"][doc["type"]] += 1
+            facets["tags"].update(doc["tags"])
+            if doc.get("category"):
+                facets["category"][doc["category"]] += 1
+
+        if terms:
+            matches.sort(key=lambda match: match[0], reverse=True)
+        else:
+            matches.sort(key=lambda match: match[1].get("date") or "", reverse=True)
+
+        return {
+            "total": len(matches),
+            "results": [
+                {**doc, "score": round(score, 4)} for score, doc in matches[offset:offset + limit]
+            ],
+            "facets": {name: dict(counts.most_common()) for name, counts in facets.items()}
+        }
+
+    def suggest(self, prefix: str, limit: int = 5) -> Dict[str, List]:
+        """Typeahead: term completions plus the titles of the best matching documents"""
+        terms = tokenize(prefix)
+        completions = self.complete(terms[-1], limit) if terms else []
+        titles = [
+            {"type": doc["type"], "id": doc["id"], "slug": doc.get("slug"), "title": doc["title"]}
+            for doc in self.search(prefix, limit=limit)["results"]
+        ] if terms else []
+        return {"completions": completions, "documents": titles}
+
+    def stats(self) -> Dict[str, Any]:
+        """Return index statistics for the admin dashboard"""
+        return {
+            "documents": len(self._documents),
+            "terms": self._index.vocabulary_size,
+            "queries": self.queries,
+            "rebuilds": self.rebuilds,
+            "refresh_seconds": self.refresh_seconds
+        }
+
+
+# Global search service instance
+_search_service = None
+
+def get_search_service() -> SearchService:
+    """Get or create the global search service instance"""
+    global _search_service
+    if _search_service is None:
+        _search_service = SearchService()
+    return _search_service
@@ -1,15 +1,23 @@
-from fastapi import FastAPI, HTTPException, Body, UploadFile, File, Depends, Header, Request
+from fastapi import FastAPI, HTTPException, Body, UploadFile, File, Depends, Header, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-from datetime import datetime
+from datetime import datetime, timezone
 import os
 import uuid
+import json
+import asyncio
+import time
+import hashlib
+import base64
 from typing import List, Optional, Annotated
 import io
-import textwrap
 import re
 import logging
+import httpx
 from fastapi.responses import StreamingResponse
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+from starlette.background import BackgroundTask
 
 # PDF parsing support
 HAS_PDF_PARSER = True
@@ -18,25 +26,41 @@ try:
 except Exception:
     HAS_PDF_PARSER = False
 
-# ReportLab is optional at runtime; building/installation may require system toolchain (Rust for some wheels)
-HAS_REPORTLAB = True
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
-except Exception:
-    HAS_REPORTLAB = False
-
 from database import (
     db, client, profile_collection, experience_collection, education_collection,
     skills_collection, ventures_collection, achievements_collection,
     whitepapers_collection, appointments_collection, analytics_collection,
-    blogs_collection, is_mongodb_available
+    blogs_collection, is_mongodb_available, connect_to_mongo,
+    close_mongo_connection
 )
 from models import (
     Profile, Experience, Education, SkillCategory, Venture,
     Achievements, WhitePaper, Appointment, BlogPost
 )
 from mem0_service import get_mem0_service
+from cache_service import get_cache_service
+from analytics_service import get_analytics_service, GRANULARITIES
+from chat_cache_service import get_chat_cache_service
+from llm_service import get_llm_service
+from retrieval_service import get_retrieval_service
+from indexes import ensure_indexes, report_indexes
+from search_service import get_search_service
+from markdown_service import get_markdown_service
+from feed_service import get_feed_service
+from scheduler_service import get_scheduler_service, parse_schedule
+from generation_service import get_generation_service, blog_request
+from static_export import export_site
+from resume_renderer import (
+    HAS_REPORTLAB, render_resume_pdf, render_resume_html, render_ats_resume_html,
+    iter_resume_html, iter_ats_resume_html
+)
+from resume_layout import TEMPLATES
+from pdf_converter import get_pdf_converter_service, converter_url, html_body
+from render_service import get_render_service, RenderQueueFull
+from resume_service import get_resume_service, resume_response, RenderedResume, RESUME_SOURCES
+from compression import CompressionMiddleware, EncodedBody
+from conditional import etag_matches
+from pymongo.errors import DuplicateKeyError
 
 app = FastAPI(title="Ibrahim El Khalil Portfolio API")
 
@@ -51,20 +75,54 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Compresses uncached responses; cached ones are served precompressed (see cached_json)
+app.add_middleware(CompressionMiddleware)
+
 # Authentication function for admin endpoints
 ADMIN_PASSWORD = os.getenv('ADMIN_PASSWORD', 'pass@123')
 
-# Try to load password from database on startup
-try:
-    if is_mongodb_available():
-        stored_password = db['admin_settings'].find_one({"setting": "admin_password"})
-        if stored_password and stored_password.get('value'):
-            ADMIN_PASSWORD = stored_password['value']
-            logger.info("Loaded admin password from database")
-except Exception as e:
-    logger.warning(f"Could not load admin password from database: {e}")
+async def load_admin_password():
+    """Load the persisted admin password from the database, if any"""
+    global ADMIN_PASSWORD
+    try:
+        if is_mongodb_available():
+            stored_password = await db['admin_settings'].find_one({"setting": "admin_password"})
+            if stored_password and stored_password.get('value'):
+                ADMIN_PASSWORD = stored_password['value']
+                logger.info("Loaded admin password from database")
+    except Exception as e:
+        logger.warning(f"Could not load admin password from database: {e}")
+
+@app.on_event("startup")
+async def startup():
+    """Connect to MongoDB and load persisted settings"""
+    await connect_to_mongo()
+    # Try to load password from database on startup
+    await load_admin_password()
+    await ensure_indexes()
+    analytics.start()
+    # Import the Gemini SDK in the background so the first chat request does not pay for it
+    asyncio.create_task(llm.warmup("chat"))
+    asyncio.create_task(search_index.ensure_fresh())
+    feeds.start()
+    scheduler.start()
+    generation.start()
+    renderer.warmup()
+    pdf_converter.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Flush buffered analytics and release the MongoDB connection pool"""
+    await analytics.stop()
+    await feeds.stop()
+    await scheduler.stop()
+    await generation.stop()
+    renderer.shutdown()
+    await pdf_converter.stop()
+    close_mongo_connection()
 
 async def verify_admin_auth(authorization: Annotated[str | None, Header()] = None):
     """Verify admin authentication for protected endpoints"""
@@ -113,6 +171,71 @@ def generate_id():
     """Generate unique ID"""
     return str(uuid.uuid4())
 
+# Read-through cache for the public portfolio content; write handlers invalidate
+# the collections they touch
+cache = get_cache_service()
+
+# Write-behind analytics counters, flushed in batches by a background task
+analytics = get_analytics_service()
+
+# Answers to repeated chat questions, scoped by the current AI instructions
+chat_cache = get_chat_cache_service()
+
+# Gemini client configured once per process and shared by every AI endpoint
+llm = get_llm_service()
+
+# BM25 index over the portfolio content, used to ground chat answers
+retrieval = get_retrieval_service()
+
+# Full-text index of published blog posts and white papers, updated by the write handlers
+search_index = get_search_service()
+
+# Blog content is rendered to sanitized HTML on write, keyed by content hash
+markdown_renderer = get_markdown_service()
+
+# Rendered resume downloads, keyed by a hash of their source data
+resume_cache = get_resume_service()
+
+# Process pool for CPU-bound document rendering
+renderer = get_render_service()
+
+# Pooled, circuit-broken client for the external HTML-to-PDF converter
+pdf_converter = get_pdf_converter_service()
+
+# Prebuilt RSS/Atom/sitemap documents, updated by the blog write handlers
+feeds = get_feed_service()
+
+# Publishes scheduled blog posts from the persistent job queue
+scheduler = get_scheduler_service()
+
+async def publish_scheduled_posts(blogs):
+    """Refresh everything derived from the published set once per batch of scheduled posts"""
+    cache.invalidate("blogs")
+    for blog in blogs:
+        search_index.upsert_blog(blog)
+        feeds.upsert_blog(blog)
+
+scheduler.on_published = publish_scheduled_posts
+
+# AI blog generation runs as queued jobs on a bounded set of background workers
+generation = get_generation_service()
+
+async def cached_json(request: Request, collection: str, loader, variant=None):
+    """
+    Serve a cached value as JSON, serializing and compressing it once per content version
+    
+    The encoded body is cached next to the value, so invalidating the collection drops both
+    """
+    async def encode():
+        return EncodedBody.from_json(await cache.get_or_load(collection, loader, variant))
+    body = await cache.get_or_load(collection, encode, variant=("encoded", variant))
+    return await body.response(request.headers.get("accept-encoding"))
+
+async def load_collection(collection):
+    """Load and serialize every document of a collection"""
+    docs = await collection.find({}).to_list(length=None)
+    return [serialize_doc(doc) for doc in docs]
+
 # ==================== ROOT & HEALTH ====================
 @app.get("/")
 def read_root():
@@ -123,7 +246,7 @@ def health_check():
     return {"status": "healthy", "service": "portfolio-backend"}
 
 @app.get("/api/system-status")
-def system_status():
+async def system_status():
     """Get comprehensive system status for admin dashboard"""
     import datetime
     import time
@@ -142,7 +265,7 @@ def system_status():
                 raise Exception("Database connection not initialized")
             
             # Test connection with a simple operation
-            client.admin.command('ismaster')
+            await client.admin.command('ping')
             db_latency = round((time.time() - db_latency_start) * 1000, 2)  # Convert to ms
             db_status["connected"] = True
             db_status["latency"] = f"{db_latency}ms"
@@ -160,14 +283,14 @@ def system_status():
             }
             
             # Get document counts and last modified dates
-            collections_info["profile"]["count"] = profile_collection.count_documents({})
-            collections_info["experience"]["count"] = experience_collection.count_documents({})
-            collections_info["education"]["count"] = education_collection.count_documents({})
-            collections_info["skills"]["count"] = skills_collection.count_documents({})
-            collections_info["ventures"]["count"] = ventures_collection.count_documents({})
-            collections_info["achievements"]["count"] = achievements_collection.count_documents({})
-            collections_info["whitepapers"]["count"] = whitepapers_collection.count_documents({})
-            collections_info["appointments"]["count"] = appointments_collection.count_documents({})
+            collections_info["profile"]["count"] = await profile_collection.count_documents({})
+            collections_info["experience"]["count"] = await experience_collection.count_documents({})
+            collections_info["education"]["count"] = await education_collection.count_documents({})
+            collections_info["skills"]["count"] = await skills_collection.count_documents({})
+            collections_info["ventures"]["count"] = await ventures_collection.count_documents({})
+            collections_info["achievements"]["count"] = await achievements_collection.count_documents({})
+            collections_info["whitepapers"]["count"] = await whitepapers_collection.count_documents({})
+            collections_info["appointments"]["count"] = await appointments_collection.count_documents({})
             
             # Get last modified dates (if documents have timestamps)
             for coll_name, collection in [
@@ -182,7 +305,7 @@ def system_status():
             ]:
                 try:
                     # Try to find the most recent document (works if there's a created_at or _id field)
-                    latest_doc = collection.find_one({}, sort=[("_id", -1)])
+                    latest_doc = await collection.find_one({}, sort=[("_id", -1)])
                     if latest_doc and "_id" in latest_doc:
                         # Extract timestamp from MongoDB ObjectId
                         collections_info[coll_name]["last_modified"] = latest_doc["_id"].generation_time.isoformat()
@@ -202,7 +325,8 @@ def system_status():
         
         # Get system metrics (CPU, Memory)
         try:
-            cpu_percent = psutil.cpu_percent(interval=0.1)
+            # cpu_percent sleeps for the sampling interval, keep it off the event loop
+            cpu_percent = await run_in_threadpool(psutil.cpu_percent, interval=0.1)
             memory = psutil.virtual_memory()
             memory_used_gb = round(memory.used / (1024**3), 2)
             memory_total_gb = round(memory.total / (1024**3), 2)
@@ -245,6 +369,19 @@ def system_status():
             "uptime": "Available",
             "database": db_status,
             "backend": backend_status,
+            "cache": cache.stats(),
+            "analytics": analytics.stats(),
+            "chat_cache": chat_cache.stats(),
+            "llm": llm.stats(),
+            "retrieval": retrieval.stats(),
+            "search": search_index.stats(),
+            "markdown": markdown_renderer.stats(),
+            "feeds": feeds.stats(),
+            "scheduler": scheduler.stats(),
+            "blog_generation": generation.stats(),
+            "resume": resume_cache.stats(),
+            "render": renderer.stats(),
+            "pdf_converter": pdf_converter.stats(),
             "api_endpoints": {
                 "total_endpoints": 25,  # Approximate count
                 "authenticated_endpoints": 8,
@@ -261,6 +398,23 @@ def system_status():
             "backend": {"status": "error"}
         }
 
+@app.get("/api/admin/indexes")
+async def get_index_report(_: bool = Depends(verify_admin_auth)):
+    """Compare declared MongoDB indexes with existing ones (Admin only)"""
+    require_database()
+    try:
+        return await report_indexes()
+    except Exception as e:
+        logger.error(f"Error reading indexes: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/api/admin/indexes")
+async def create_missing_indexes(_: bool = Depends(verify_admin_auth)):
+    """Create any declared index that is missing, e.g. after fixing duplicate slugs (Admin only)"""
+    require_database()
+    failures = await ensure_indexes()
+    return {"success": not failures, "failed": failures, "indexes": await report_indexes()}
+
 # Handle preflight OPTIONS requests explicitly
 @app.options("/{full_path:path}")
 def handle_options(full_path: str):
@@ -274,30 +428,38 @@ def handle_options(full_path: str):
     return response
 
 # ==================== PROFILE ====================
+async def load_profile():
+    """Load the profile document, or None if it does not exist"""
+    profile = await profile_collection.find_one({})
+    return serialize_doc(profile) if profile else None
+
 @app.get("/api/profile")
-def get_profile():
+async def get_profile(request: Request):
     """Get profile data"""
     require_database()
     try:
-        profile = profile_collection.find_one({})
+        profile = await cache.get_or_load("profile", load_profile)
         if not profile:
             raise HTTPException(status_code=404, detail="Profile not found")
-        return serialize_doc(profile)
+        return await cached_json(request, "profile", load_profile)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting profile: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 @app.put("/api/profile")
-def update_profile(profile: Profile, _: bool = Depends(verify_admin_auth)):
+async def update_profile(profile: Profile, _: bool = Depends(verify_admin_auth)):
     """Update profile data (Admin only)"""
     require_database()
     try:
         profile_data = profile.dict()
-        result = profile_collection.update_one(
+        result = await profile_collection.update_one(
             {},
             {"$set": profile_data},
             upsert=True
         )
+        cache.invalidate("profile")
         return {"success": True, "message": "Profile updated successfully"}
     except Exception as e:
         logger.error(f"Error updating profile: {e}")
@@ -345,7 +507,7 @@ async def change_admin_password(data: dict = Body(...), authorization: Annotated
     # Store in database for persistence
     try:
         require_database()
-        db['admin_settings'].update_one(
+        await db['admin_settings'].update_one(
             {"setting": "admin_password"},
             {"$set": {"setting": "admin_password", "value": new_password}},
             upsert=True
@@ -360,228 +522,243 @@ async def change_admin_password(data: dict = Body(...), authorization: Annotated
 
 # ==================== EXPERIENCE ====================
 @app.get("/api/experience")
-def get_experience():
+async def get_experience(request: Request):
     """Get all experience entries"""
-    experiences = list(experience_collection.find({}))
-    return [serialize_doc(exp) for exp in experiences]
+    return await cached_json(request, "experience", lambda: load_collection(experience_collection))
 
 @app.post("/api/experience")
-def create_experience(experience: Experience):
+async def create_experience(experience: Experience):
     """Create new experience entry"""
     exp_data = experience.dict()
     exp_data['id'] = generate_id()
-    experience_collection.insert_one(exp_data)
+    await experience_collection.insert_one(exp_data)
+    cache.invalidate("experience")
     return {"success": True, "id": exp_data['id'], "message": "Experience created"}
 
 @app.put("/api/experience/{exp_id}")
-def update_experience(exp_id: str, experience: Experience):
+async def update_experience(exp_id: str, experience: Experience):
     """Update experience entry"""
     exp_data = experience.dict()
-    result = experience_collection.update_one(
+    result = await experience_collection.update_one(
         {"id": exp_id},
         {"$set": exp_data}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Experience not found")
+    cache.invalidate("experience")
     return {"success": True, "message": "Experience updated"}
 
 @app.delete("/api/experience/{exp_id}")
-def delete_experience(exp_id: str):
+async def delete_experience(exp_id: str):
     """Delete experience entry"""
-    result = experience_collection.delete_one({"id": exp_id})
+    result = await experience_collection.delete_one({"id": exp_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Experience not found")
+    cache.invalidate("experience")
     return {"success": True, "message": "Experience deleted"}
 
 # ==================== EDUCATION ====================
 @app.get("/api/education")
-def get_education():
+async def get_education(request: Request):
     """Get all education entries"""
-    education = list(education_collection.find({}))
-    return [serialize_doc(edu) for edu in education]
+    return await cached_json(request, "education", lambda: load_collection(education_collection))
 
 @app.post("/api/education")
-def create_education(education: Education):
+async def create_education(education: Education):
     """Create new education entry"""
     edu_data = education.dict()
     edu_data['id'] = generate_id()
-    education_collection.insert_one(edu_data)
+    await education_collection.insert_one(edu_data)
+    cache.invalidate("education")
     return {"success": True, "id": edu_data['id'], "message": "Education created"}
 
 @app.put("/api/education/{edu_id}")
-def update_education(edu_id: str, education: Education):
+async def update_education(edu_id: str, education: Education):
     """Update education entry"""
     edu_data = education.dict()
-    result = education_collection.update_one(
+    result = await education_collection.update_one(
         {"id": edu_id},
         {"$set": edu_data}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Education not found")
+    cache.invalidate("education")
     return {"success": True, "message": "Education updated"}
 
 @app.delete("/api/education/{edu_id}")
-def delete_education(edu_id: str):
+async def delete_education(edu_id: str):
     """Delete education entry"""
-    result = education_collection.delete_one({"id": edu_id})
+    result = await education_collection.delete_one({"id": edu_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Education not found")
+    cache.invalidate("education")
     return {"success": True, "message": "Education deleted"}
 
 # ==================== SKILLS ====================
 @app.get("/api/skills")
-def get_skills():
+async def get_skills(request: Request):
     """Get all skill categories"""
-    skills = list(skills_collection.find({}))
-    return [serialize_doc(skill) for skill in skills]
+    return await cached_json(request, "skills", lambda: load_collection(skills_collection))
 
 @app.post("/api/skills")
-def create_skill_category(skill_category: SkillCategory):
+async def create_skill_category(skill_category: SkillCategory):
     """Create new skill category"""
     skill_data = skill_category.dict()
     skill_data['id'] = generate_id()
-    skills_collection.insert_one(skill_data)
+    await skills_collection.insert_one(skill_data)
+    cache.invalidate("skills")
     return {"success": True, "id": skill_data['id'], "message": "Skill category created"}
 
 @app.put("/api/skills/{skill_id}")
-def update_skill_category(skill_id: str, skill_category: SkillCategory):
+async def update_skill_category(skill_id: str, skill_category: SkillCategory):
     """Update skill category"""
     skill_data = skill_category.dict()
-    result = skills_collection.update_one(
+    result = await skills_collection.update_one(
         {"id": skill_id},
         {"$set": skill_data}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Skill category not found")
+    cache.invalidate("skills")
     return {"success": True, "message": "Skill category updated"}
 
 @app.delete("/api/skills/{skill_id}")
-def delete_skill_category(skill_id: str):
+async def delete_skill_category(skill_id: str):
     """Delete skill category"""
-    result = skills_collection.delete_one({"id": skill_id})
+    result = await skills_collection.delete_one({"id": skill_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Skill category not found")
+    cache.invalidate("skills")
     return {"success": True, "message": "Skill category deleted"}
 
 # ==================== VENTURES ====================
 @app.get("/api/ventures")
-def get_ventures():
+async def get_ventures(request: Request):
     """Get all ventures"""
-    ventures = list(ventures_collection.find({}))
-    return [serialize_doc(venture) for venture in ventures]
+    return await cached_json(request, "ventures", lambda: load_collection(ventures_collection))
 
 @app.post("/api/ventures")
-def create_venture(venture: Venture):
+async def create_venture(venture: Venture):
     """Create new venture"""
     venture_data = venture.dict()
     venture_data['id'] = generate_id()
-    ventures_collection.insert_one(venture_data)
+    await ventures_collection.insert_one(venture_data)
+    cache.invalidate("ventures")
     return {"success": True, "id": venture_data['id'], "message": "Venture created"}
 
 @app.put("/api/ventures/{venture_id}")
-def update_venture(venture_id: str, venture: Venture):
+async def update_venture(venture_id: str, venture: Venture):
     """Update venture"""
     venture_data = venture.dict()
-    result = ventures_collection.update_one(
+    result = await ventures_collection.update_one(
         {"id": venture_id},
         {"$set": venture_data}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Venture not found")
+    cache.invalidate("ventures")
     return {"success": True, "message": "Venture updated"}
 
 @app.delete("/api/ventures/{venture_id}")
-def delete_venture(venture_id: str):
+async def delete_venture(venture_id: str):
     """Delete venture"""
-    result = ventures_collection.delete_one({"id": venture_id})
+    result = await ventures_collection.delete_one({"id": venture_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Venture not found")
+    cache.invalidate("ventures")
     return {"success": True, "message": "Venture deleted"}
 
 # ==================== ACHIEVEMENTS ====================
-@app.get("/api/achievements")
-def get_achievements():
-    """Get achievements (certificates and hackathons)"""
-    achievements = achievements_collection.find_one({})
+async def load_achievements():
+    """Load the achievements document, defaulting to empty lists"""
+    achievements = await achievements_collection.find_one({})
     if not achievements:
         return {"certificates": [], "hackathons": []}
     return serialize_doc(achievements)
 
+@app.get("/api/achievements")
+async def get_achievements(request: Request):
+    """Get achievements (certificates and hackathons)"""
+    return await cached_json(request, "achievements", load_achievements)
+
 @app.put("/api/achievements")
-def update_achievements(achievements: Achievements):
+async def update_achievements(achievements: Achievements):
     """Update achievements"""
     ach_data = achievements.dict()
-    result = achievements_collection.update_one(
+    result = await achievements_collection.update_one(
         {},
         {"$set": ach_data},
         upsert=True
     )
+    cache.invalidate("achievements")
     return {"success": True, "message": "Achievements updated"}
 
 # ==================== WHITE PAPERS ====================
 @app.get("/api/whitepapers")
-def get_whitepapers():
+async def get_whitepapers(request: Request):
     """Get all white papers"""
-    papers = list(whitepapers_collection.find({}))
-    return [serialize_doc(paper) for paper in papers]
+    return await cached_json(request, "whitepapers", lambda: load_collection(whitepapers_collection))
 
 @app.post("/api/whitepapers")
-def create_whitepaper(whitepaper: WhitePaper):
+async def create_whitepaper(whitepaper: WhitePaper):
     """Create new white paper"""
     paper_data = whitepaper.dict()
     paper_data['id'] = generate_id()
-    whitepapers_collection.insert_one(paper_data)
+    await whitepapers_collection.insert_one(paper_data)
+    cache.invalidate("whitepapers")
+    search_index.upsert_whitepaper(paper_data)
     return {"success": True, "id": paper_data['id'], "message": "White paper created"}
 
 @app.put("/api/whitepapers/{paper_id}")
-def update_whitepaper(paper_id: str, whitepaper: WhitePaper):
+async def update_whitepaper(paper_id: str, whitepaper: WhitePaper):
     """Update white paper"""
     paper_data = whitepaper.dict()
-    result = whitepapers_collection.update_one(
+    result = await whitepapers_collection.update_one(
         {"id": paper_id},
         {"$set": paper_data}
     )
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="White paper not found")
+    cache.invalidate("whitepapers")
+    search_index.upsert_whitepaper({**paper_data, "id": paper_id})
     return {"success": True, "message": "White paper updated"}
 
 @app.delete("/api/whitepapers/{paper_id}")
-def delete_whitepaper(paper_id: str):
+async def delete_whitepaper(paper_id: str):
     """Delete white paper"""
-    result = whitepapers_collection.delete_one({"id": paper_id})
+    result = await whitepapers_collection.delete_one({"id": paper_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="White paper not found")
+    cache.invalidate("whitepapers")
+    search_index.remove("whitepaper", paper_id)
     return {"success": True, "message": "White paper deleted"}
 
 # ==================== APPOINTMENTS ====================
 @app.get("/api/appointments")
-def get_appointments():
+async def get_appointments():
     """Get all appointments"""
-    appointments = list(appointments_collection.find({}))
+    appointments = await appointments_collection.find({}).to_list(length=None)
     return [serialize_doc(apt) for apt in appointments]
 
 @app.post("/api/appointments")
-def create_appointment(appointment: Appointment):
+async def create_appointment(appointment: Appointment):
     """Create new appointment"""
     apt_data = appointment.dict()
     apt_data['id'] = generate_id()
     apt_data['created_at'] = datetime.utcnow().isoformat()
     apt_data['status'] = 'pending'
-    appointments_collection.insert_one(apt_data)
+    await appointments_collection.insert_one(apt_data)
     
     # Update analytics
-    analytics_collection.update_one(
-        {},
-        {"$inc": {"appointments_booked": 1}}
-    )
+    analytics.increment("appointments_booked")
     
     return {"success": True, "id": apt_data['id'], "message": "Appointment created"}
 
 @app.put("/api/appointments/{apt_id}")
-def update_appointment(apt_id: str, appointment: Appointment):
+async def update_appointment(apt_id: str, appointment: Appointment):
     """Update appointment"""
     apt_data = appointment.dict()
-    result = appointments_collection.update_one(
+    result = await appointments_collection.update_one(
         {"id": apt_id},
         {"$set": apt_data}
     )
@@ -590,53 +767,143 @@ def update_appointment(apt_id: str, appointment: Appointment):
     return {"success": True, "message": "Appointment updated"}
 
 @app.delete("/api/appointments/{apt_id}")
-def delete_appointment(apt_id: str):
+async def delete_appointment(apt_id: str):
     """Delete appointment"""
-    result = appointments_collection.delete_one({"id": apt_id})
+    result = await appointments_collection.delete_one({"id": apt_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Appointment not found")
     return {"success": True, "message": "Appointment deleted"}
 
 # ==================== BLOG POSTS ====================
+# Fields returned by the blog listing; the markdown body is only sent with view=full
+BLOG_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "title": 1, "slug": 1, "excerpt": 1, "tags": 1, "reading_time": 1,
+    "category": 1, "author": 1, "featured_image": 1, "status": 1, "views": 1,
+    "published_date": 1, "created_at": 1
+}
+BLOG_PAGE_SIZE = 20
+MAX_BLOG_PAGE_SIZE = 100
+
+def encode_blog_cursor(blog: dict) -> str:
+    """Build an opaque cursor pointing just after a blog post in (created_at, id) order"""
+    raw = json.dumps([blog.get("created_at"), blog.get("id")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_blog_cursor(cursor: str):
+    """Decode a cursor from encode_blog_cursor into (created_at, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, blog_id = json.loads(base64.urlsafe_b64decode(padded))
+        return created_at, blog_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def validate_schedule(blog: dict):
+    """Reject scheduled posts without a usable publication time"""
+    if blog.get("status") == "scheduled" and parse_schedule(blog.get("scheduled_date")) is None:
+        raise HTTPException(status_code=400, detail="Scheduled posts need an ISO scheduled_date")
+
+async def load_blog_page(status, category, limit, cursor, view) -> EncodedBody:
+    """Query one page of the blog listing and encode it with its next-page cursor"""
+    query = {}
+    if status:
+        query["status"] = status
+    if category:
+        query["category"] = category
+    if cursor:
+        created_at, blog_id = decode_blog_cursor(cursor)
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": blog_id}}
+        ]
+    
+    # Without limit or cursor every matching post is returned, as before
+    page_size = min(limit or BLOG_PAGE_SIZE, MAX_BLOG_PAGE_SIZE) if (limit or cursor) else None
+    projection = BLOG_LIST_PROJECTION if view == "list" else None
+    
+    db_cursor = blogs_collection.find(query, projection).sort([("created_at", -1), ("id", -1)])
+    if page_size:
+        # Fetch one extra post to know whether another page exists
+        db_cursor = db_cursor.limit(page_size + 1)
+    
+    blogs = [serialize_doc(blog) async for blog in db_cursor]
+    headers = {}
+    if page_size and len(blogs) > page_size:
+        blogs = blogs[:page_size]
+        headers["X-Next-Cursor"] = encode_blog_cursor(blogs[-1])
+    return EncodedBody.from_json(blogs, headers=headers)
+
 @app.get("/api/blogs")
-def get_blogs(status: Optional[str] = None, category: Optional[str] = None, limit: Optional[int] = None):
-    """Get all blog posts with optional filtering"""
+async def get_blogs(
+    request: Request,
+    status: Optional[str] = None,
+    category: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    view: str = "list"
+):
+    """
+    Get blog posts with optional filtering, newest first
+    
+    Pages are keyed on (created_at, id): pass the X-Next-Cursor header of a response
+    as `cursor` to get the next page. view=list (default) omits the post content,
+    view=full returns complete documents.
+    """
+    if view not in ("list", "full"):
+        raise HTTPException(status_code=400, detail="view must be 'list' or 'full'")
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be positive")
+    
     try:
-        query = {}
-        if status:
-            query["status"] = status
-        if category:
-            query["category"] = category
-        
-        cursor = blogs_collection.find(query).sort("created_at", -1)
-        if limit:
-            cursor = cursor.limit(limit)
-        
-        blogs = [serialize_doc(blog) for blog in cursor]
-        return blogs
+        page = await cache.get_or_load(
+            "blogs",
+            lambda: load_blog_page(status, category, limit, cursor, view),
+            variant=("page", status, category, limit, cursor, view)
+        )
+        return await page.response(request.headers.get("accept-encoding"))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching blogs: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def load_blog(blog_id: str):
+    """
+    Load a blog post by ID, falling back to its slug
+    
+    Returns the post and this worker's recorded view count at load time, so views
+    counted after the post was cached can be added to its stored count. A missing post
+    returns () so the miss is cached too; creating a post invalidates "blogs".
+    """
+    blog = await blogs_collection.find_one({"id": blog_id})
+    if not blog:
+        blog = await blogs_collection.find_one({"slug": blog_id})
+    if not blog:
+        return ()
+    
+    # Posts written before server-side rendering (or by an older renderer) are
+    # rendered once here and stored
+    if not markdown_renderer.is_current(blog):
+        rendered = await markdown_renderer.render(blog.get("content") or "")
+        rendered = {key: value for key, value in rendered.items() if key != "reading_time"}
+        await blogs_collection.update_one({"id": blog.get("id")}, {"$set": rendered})
+        blog.update(rendered)
+    return serialize_doc(blog), analytics.recorded_views(blog.get("id"))
+
 @app.get("/api/blogs/{blog_id}")
-def get_blog(blog_id: str):
+async def get_blog(blog_id: str):
     """Get a single blog post by ID or slug"""
     try:
-        # Try to find by ID first, then by slug
-        blog = blogs_collection.find_one({"id": blog_id})
-        if not blog:
-            blog = blogs_collection.find_one({"slug": blog_id})
-        
-        if not blog:
+        cached = await cache.get_or_load("blogs", lambda: load_blog(blog_id), variant=("post", blog_id))
+        if not cached:
             raise HTTPException(status_code=404, detail="Blog post not found")
+        blog, views_at_load = cached
         
-        # Increment view count
-        blogs_collection.update_one(
-            {"id": blog.get("id")},
-            {"$inc": {"views": 1}}
-        )
-        
-        return serialize_doc(blog)
+        # Views are buffered and written in bulk by the analytics flush instead of
+        # one write per read; the count shown includes views since the post was cached
+        analytics.record_view(blog.get("id"))
+        views = blog.get("views", 0) + analytics.recorded_views(blog.get("id")) - views_at_load
+        return {**blog, "views": views}
     except HTTPException:
         raise
     except Exception as e:
@@ -644,8 +911,9 @@ def get_blog(blog_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/blogs")
-def create_blog(blog: BlogPost):
+async def create_blog(blog: BlogPost):
     """Create a new blog post"""
+    validate_schedule(blog.dict())
     try:
         blog_dict = blog.dict(exclude_none=True)
         blog_id = str(uuid.uuid4())
@@ -657,58 +925,78 @@ def create_blog(blog: BlogPost):
         if not blog_dict.get("slug"):
             blog_dict["slug"] = re.sub(r'[^a-z0-9]+', '-', blog_dict["title"].lower()).strip('-')
         
-        # Calculate reading time if not provided (approx 200 words per minute)
-        if not blog_dict.get("reading_time") and blog_dict.get("content"):
-            word_count = len(blog_dict["content"].split())
-            blog_dict["reading_time"] = max(1, round(word_count / 200))
-        
-        blogs_collection.insert_one(blog_dict)
+        # Pre-render the content; reading time comes from the same pass unless provided
+        rendered = await markdown_renderer.render(blog_dict.get("content") or "")
+        reading_time = blog_dict.get("reading_time") or rendered["reading_time"]
+        blog_dict.update(rendered)
+        blog_dict["reading_time"] = reading_time
+        
+        await blogs_collection.insert_one(blog_dict)
+        cache.invalidate("blogs")
+        search_index.upsert_blog(blog_dict)
+        feeds.upsert_blog(blog_dict)
+        await scheduler.sync_post(blog_dict)
         return serialize_doc(blog_dict)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A blog post with this slug already exists")
     except Exception as e:
         logger.error(f"Error creating blog: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/api/blogs/{blog_id}")
-def update_blog(blog_id: str, blog: BlogPost):
+async def update_blog(blog_id: str, blog: BlogPost):
     """Update an existing blog post"""
     try:
-        existing_blog = blogs_collection.find_one({"id": blog_id})
+        existing_blog = await blogs_collection.find_one({"id": blog_id})
         if not existing_blog:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
         blog_dict = blog.dict(exclude_none=True)
         blog_dict["updated_at"] = datetime.utcnow().isoformat()
+        validate_schedule({**existing_blog, **blog_dict})
         
         # Update slug if title changed
         if blog_dict.get("title") and blog_dict["title"] != existing_blog.get("title"):
             if not blog_dict.get("slug"):
                 blog_dict["slug"] = re.sub(r'[^a-z0-9]+', '-', blog_dict["title"].lower()).strip('-')
         
-        # Recalculate reading time if content changed
-        if blog_dict.get("content") and blog_dict["content"] != existing_blog.get("content"):
-            word_count = len(blog_dict["content"].split())
-            blog_dict["reading_time"] = max(1, round(word_count / 200))
+        # Re-render (and recalculate reading time unless provided) only if the content changed
+        if not markdown_renderer.is_current({**existing_blog, **blog_dict}):
+            rendered = await markdown_renderer.render(blog_dict.get("content") or "")
+            reading_time = blog_dict.get("reading_time") or rendered["reading_time"]
+            blog_dict.update(rendered)
+            blog_dict["reading_time"] = reading_time
         
-        blogs_collection.update_one(
+        await blogs_collection.update_one(
             {"id": blog_id},
             {"$set": blog_dict}
         )
         
-        updated_blog = blogs_collection.find_one({"id": blog_id})
+        updated_blog = await blogs_collection.find_one({"id": blog_id})
+        cache.invalidate("blogs")
+        search_index.upsert_blog(updated_blog)
+        feeds.upsert_blog(updated_blog)
+        await scheduler.sync_post(updated_blog)
         return serialize_doc(updated_blog)
     except HTTPException:
         raise
+    except DuplicateKeyError:
+        raise HTTPException(status_code=409, detail="A blog post with this slug already exists")
     except Exception as e:
         logger.error(f"Error updating blog: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.delete("/api/blogs/{blog_id}")
-def delete_blog(blog_id: str):
+async def delete_blog(blog_id: str):
     """Delete a blog post"""
     try:
-        result = blogs_collection.delete_one({"id": blog_id})
+        result = await blogs_collection.delete_one({"id": blog_id})
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Blog post not found")
+        cache.invalidate("blogs")
+        search_index.remove("blog", blog_id)
+        feeds.remove(blog_id)
+        await scheduler.cancel_post(blog_id)
         return {"success": True, "message": "Blog post deleted"}
     except HTTPException:
         raise
@@ -718,166 +1006,221 @@ def delete_blog(blog_id: str):
 
 @app.post("/api/blogs/generate")
 async def generate_blog_with_ai(data: dict = Body(...)):
-    """Generate blog content using Gemini AI"""
+    """Generate blog content using Gemini AI, waiting for the result (prefer the job endpoints)"""
     try:
-        topic = data.get("topic", "")
-        category = data.get("category", "")
-        tone = data.get("tone", "professional")
-        length = data.get("length", "medium")
-        
-        if not topic:
+        params = blog_request(data)
+        if not params["topic"]:
             raise HTTPException(status_code=400, detail="Topic is required")
-        
-        # Check if Gemini API is available
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key or api_key == "your-gemini-api-key-here":
-            # Return a demo blog post when API key is not available
-            word_count = {"short": 500, "medium": 1000, "long": 1500}.get(length, 1000)
-            demo_content = f"""# {topic}
-
-## Introduction
-
-This is a sample blog post about {topic}. This content is generated as a placeholder since the Gemini AI API key is not configured.
-
-## Main Content
-
-To enable AI-powered blog generation, you need to:
-
-1. Get a Gemini API key from Google AI Studio
-2. Add it to your environment variables
-3. Restart the backend service
-
-## Key Points
-
-- This feature requires a valid Gemini API key
-- The AI can generate professional content in various tones
-- Blog posts can be customized by length and category
-- Generated content includes SEO optimization
-
-## Conclusion
-
-Once properly configured, this feature will generate high-quality blog content tailored to your specifications using Google's Gemini AI model.
-
-*Note: This is demo content. Configure your Gemini API key to enable AI generation.*"""
-
-            return {
-                "title": f"Sample: {topic}",
-                "excerpt": f"This is a sample blog post about {topic}. Configure Gemini API for AI generation.",
-                "content": demo_content,
-                "tags": [category, "sample", "demo"] if category else ["sample", "demo"],
-                "seo_title": f"{topic} - Sample Blog Post",
-                "seo_description": f"Learn about {topic} in this sample blog post. Configure AI for automated content generation.",
-                "ai_generated": False,
-                "demo": True
-            }
-        
-        # Import Gemini if available
-        try:
-            import google.generativeai as genai
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-        except Exception as e:
-            logger.error(f"Failed to configure Gemini: {e}")
-            raise HTTPException(status_code=500, detail="Gemini API configuration failed")
-        
-        # Generate prompt based on parameters
-        word_count = {"short": 500, "medium": 1000, "long": 1500}.get(length, 1000)
-        
-        prompt = f"""Write a professional blog post about: {topic}
-
-Category: {category}
-Tone: {tone}
-Target length: approximately {word_count} words
-
-Please structure the blog post with:
-1. An engaging title
-2. A compelling excerpt (2-3 sentences)
-3. Well-organized main content with proper headings
-4. SEO-friendly keywords
-5. A conclusion
-
-Format the response as JSON with the following structure:
-{{
-    "title": "Blog Title",
-    "excerpt": "Brief description...",
-    "content": "Full blog content with markdown formatting...",
-    "tags": ["tag1", "tag2", "tag3"],
-    "seo_title": "SEO optimized title",
-    "seo_description": "SEO meta description"
-}}"""
-        
-        response = model.generate_content(prompt)
-        
-        # Try to parse JSON from response
-        import json
-        try:
-            # Extract JSON from response (handle markdown code blocks)
-            text = response.text
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0]
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0]
-            
-            blog_data = json.loads(text.strip())
-            blog_data["ai_generated"] = True
-            blog_data["demo"] = False
-            return blog_data
-        except:
-            # If JSON parsing fails, return raw content
-            return {
-                "title": topic,
-                "excerpt": "",
-                "content": response.text,
-                "tags": [category] if category else [],
-                "ai_generated": True,
-                "demo": False
-            }
+        return await generation.generate(params)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Error generating blog with AI: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/blogs/generate/jobs", status_code=202)
+async def submit_blog_generation(data: dict = Body(...)):
+    """Queue an AI blog generation and return its job id immediately"""
+    if not is_mongodb_available():
+        raise HTTPException(status_code=503, detail="Background generation needs the database")
+    try:
+        job_id = await generation.submit(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job_id, "status": "pending"}
+
+@app.get("/api/blogs/generate/jobs/{job_id}")
+async def get_blog_generation(job_id: str):
+    """Status, progress and (once done) the generated post of a generation job"""
+    job = await generation.status(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+    return job
+
+@app.get("/api/blogs/generate/jobs/{job_id}/events")
+async def stream_blog_generation(job_id: str):
+    """
+    Server-Sent Events for a generation job: a "progress" event whenever the job
+    changes, then a "done" event carrying the final job state
+    """
+    if await generation.status(job_id) is None:
+        raise HTTPException(status_code=404, detail="Generation job not found")
+
+    async def event_stream():
+        last_update = None
+        while True:
+            job = await generation.status(job_id)
+            if job is None:
+                yield sse_event({"detail": "Generation job expired"}, event="error")
+                return
+            if job["status"] in ("done", "failed"):
+                yield sse_event(jsonable_encoder(job), event="done")
+                return
+            if job["updated_at"] != last_update:
+                last_update = job["updated_at"]
+                yield sse_event(jsonable_encoder(job), event="progress")
+            await asyncio.sleep(1)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+# ==================== SEARCH ====================
+@app.get("/api/search")
+async def search_content(
+    q: str = "",
+    type: Optional[str] = None,
+    tag: Optional[str] = None,
+    category: Optional[str] = None,
+    prefix: bool = True,
+    limit: int = 10,
+    offset: int = 0
+):
+    """
+    Full-text search over published blog posts and white papers
+    
+    Results are BM25-ranked with tag/category/type facet counts; the last word of
+    `q` also matches as a prefix unless prefix=false
+    """
+    if type not in (None, "blog", "whitepaper"):
+        raise HTTPException(status_code=400, detail="type must be 'blog' or 'whitepaper'")
+    if not 1 <= limit <= 50 or offset < 0:
+        raise HTTPException(status_code=400, detail="limit must be 1-50 and offset non-negative")
+    
+    await search_index.ensure_fresh()
+    return search_index.search(q, doc_type=type, tag=tag, category=category, prefix=prefix, limit=limit, offset=offset)
+
+@app.get("/api/search/suggest")
+async def search_suggestions(q: str, limit: int = 5):
+    """Typeahead suggestions: completions of the word being typed and matching titles"""
+    await search_index.ensure_fresh()
+    return search_index.suggest(q, limit=max(1, min(limit, 10)))
+
+# ==================== FEEDS ====================
+# Served from prebuilt bytes; crawlers polling these never reach MongoDB
+@app.get("/feed.xml")
+async def rss_feed(request: Request):
+    """RSS 2.0 feed of the newest published blog posts"""
+    return await feeds.document("rss").response(request.headers.get("accept-encoding"))
+
+@app.get("/atom.xml")
+async def atom_feed(request: Request):
+    """Atom feed of the newest published blog posts"""
+    return await feeds.document("atom").response(request.headers.get("accept-encoding"))
+
+@app.get("/sitemap.xml")
+async def sitemap(request: Request):
+    """Sitemap of the public pages and every published blog post"""
+    return await feeds.document("sitemap").response(request.headers.get("accept-encoding"))
+
 # ==================== ANALYTICS ====================
 @app.get("/api/analytics")
-def get_analytics():
-    """Get analytics data"""
-    analytics = analytics_collection.find_one({})
-    if not analytics:
-        return {
+async def get_analytics():
+    """Get analytics data (including increments this worker has not flushed yet)"""
+    analytics_doc = await analytics_collection.find_one({})
+    if not analytics_doc:
+        analytics_doc = {
             'total_visits': 0,
             'unique_visitors': 0,
             'ai_chat_sessions': 0,
             'appointments_booked': 0,
             'skills_viewed': 0
         }
-    return serialize_doc(analytics)
+    for field, amount in analytics.pending().items():
+        analytics_doc[field] = analytics_doc.get(field, 0) + amount
+    # Distinct visitors come from the HyperLogLog sketches, not a counter
+    analytics_doc['unique_visitors'] = await analytics.unique_visitors()
+    return serialize_doc(analytics_doc)
+
+def get_visitor_key(request: Request, visitor_id: Optional[str] = None) -> str:
+    """Identify a visitor by client-supplied id, or by client IP and user agent"""
+    if visitor_id:
+        return f"id:{visitor_id}"
+    forwarded_for = request.headers.get("x-forwarded-for")
+    client_ip = forwarded_for.split(",")[0].strip() if forwarded_for else (request.client.host if request.client else "")
+    return f"ip:{client_ip}|ua:{request.headers.get('user-agent', '')}"
 
 @app.post("/api/analytics/track")
-def track_event(event_type: str = Body(..., embed=True)):
+async def track_event(
+    request: Request,
+    event_type: str = Body(..., embed=True),
+    visitor_id: Optional[str] = Body(None, embed=True)
+):
     """Track analytics event"""
     valid_events = ['visit', 'ai_chat', 'skills_view']
     
     if event_type == 'visit':
-        analytics_collection.update_one(
-            {},
-            {"$inc": {"total_visits": 1, "unique_visitors": 1}}
-        )
+        analytics.increment("total_visits")
+        analytics.add_visitor(get_visitor_key(request, visitor_id))
     elif event_type == 'ai_chat':
-        analytics_collection.update_one(
-            {},
-            {"$inc": {"ai_chat_sessions": 1}}
-        )
+        analytics.increment("ai_chat_sessions")
     elif event_type == 'skills_view':
-        analytics_collection.update_one(
-            {},
-            {"$inc": {"skills_viewed": 1}}
-        )
+        analytics.increment("skills_viewed")
     else:
         raise HTTPException(status_code=400, detail="Invalid event type")
     
     return {"success": True, "message": "Event tracked"}
 
+ANALYTICS_METRICS = ['total_visits', 'unique_visitors', 'ai_chat_sessions', 'appointments_booked', 'skills_viewed']
+# Default look-back window and maximum number of points per granularity
+TIMESERIES_WINDOWS = {"minute": (60, 1440), "hour": (24, 24 * 90), "day": (30, 366 * 3)}
+
+def parse_utc(value: str) -> datetime:
+    """Parse an ISO 8601 timestamp into a naive UTC datetime"""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+@app.get("/api/analytics/timeseries")
+async def get_analytics_timeseries(
+    metric: str = "total_visits",
+    granularity: str = "hour",
+    start: Optional[str] = None,
+    end: Optional[str] = None
+):
+    """Get a metric per minute/hour/day from the precomputed analytics rollups"""
+    if metric not in ANALYTICS_METRICS:
+        raise HTTPException(status_code=400, detail=f"Invalid metric. Use one of: {', '.join(ANALYTICS_METRICS)}")
+    if granularity not in GRANULARITIES:
+        raise HTTPException(status_code=400, detail="Invalid granularity. Use minute, hour or day")
+    
+    default_points, max_points = TIMESERIES_WINDOWS[granularity]
+    try:
+        end_dt = parse_utc(end) if end else datetime.utcnow()
+        start_dt = parse_utc(start) if start else end_dt - GRANULARITIES[granularity] * default_points
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start and end must be ISO 8601 timestamps (UTC)")
+    
+    if start_dt >= end_dt:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if (end_dt - start_dt) / GRANULARITIES[granularity] > max_points:
+        raise HTTPException(status_code=400, detail=f"Range too large: at most {max_points} {granularity} buckets")
+    
+    result = {
+        "metric": metric,
+        "granularity": granularity,
+        "start": start_dt.isoformat(),
+        "end": end_dt.isoformat()
+    }
+    if metric == 'unique_visitors':
+        # Estimated from the daily HyperLogLog sketches; "total" is distinct across the range
+        if granularity != 'day':
+            raise HTTPException(status_code=400, detail="unique_visitors is only available per day")
+        result.update(await analytics.unique_visitors_timeseries(start_dt, end_dt))
+    else:
+        result["points"] = await analytics.timeseries(metric, granularity, start_dt, end_dt)
+    return result
+
+@app.post("/api/admin/analytics/flush")
+async def flush_analytics(_: bool = Depends(verify_admin_auth)):
+    """Write buffered analytics counters and rollups to the database immediately (Admin only)"""
+    flushed = await analytics.flush()
+    await analytics.rollup()
+    return {"success": True, "flushed": flushed, "stats": analytics.stats()}
+
 # ==================== ENVIRONMENT VARIABLES ====================
 @app.get("/api/env-variables")
 def get_env_variables():
@@ -915,18 +1258,24 @@ def update_env_variables(env_vars: dict = Body(...)):
             for key, value in existing_vars.items():
                 f.write(f"{key}={value}\n")
         
+        # Apply a changed Gemini key immediately; the shared client reconfigures on next use
+        gemini_keys = {key: str(env_vars[key]) for key in ('GEMINI_API_KEY', 'GOOGLE_API_KEY') if key in env_vars}
+        if any(os.environ.get(key) != value for key, value in gemini_keys.items()):
+            os.environ.update(gemini_keys)
+            llm.reload()
+        
         return {"success": True, "message": "Environment variables updated. Server restart may be required."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating environment variables: {str(e)}")
 
 # ==================== AI INSTRUCTIONS ====================
 @app.get("/api/ai-instructions")
-def get_ai_instructions():
+async def get_ai_instructions():
     """Get AI chat instructions"""
     try:
         # Try to get from database first
         require_database()
-        instructions_doc = db['ai_instructions'].find_one({})
+        instructions_doc = await db['ai_instructions'].find_one({})
         if instructions_doc and 'instructions' in instructions_doc:
             return {"instructions": instructions_doc['instructions']}
     except Exception as e:
@@ -947,18 +1296,21 @@ Remember to maintain a conversational tone while being informative and respectfu
     return {"instructions": default_instructions}
 
 @app.put("/api/ai-instructions")
-def update_ai_instructions(data: dict = Body(...)):
+async def update_ai_instructions(data: dict = Body(...)):
     """Update AI chat instructions"""
     try:
         require_database()
         instructions = data.get('instructions', '')
         
         # Upsert to database
-        db['ai_instructions'].update_one(
+        await db['ai_instructions'].update_one(
             {},
             {"$set": {"instructions": instructions}},
             upsert=True
         )
+        # Cached answers are scoped by the instructions, but drop them eagerly to free memory
+        cache.invalidate("ai_instructions")
+        chat_cache.clear()
         
         return {"success": True, "message": "AI instructions updated successfully"}
     except Exception as e:
@@ -966,10 +1318,9 @@ def update_ai_instructions(data: dict = Body(...)):
         raise HTTPException(status_code=500, detail=f"Error updating AI instructions: {str(e)}")
 
 # ==================== THEME ====================
-@app.get("/api/theme")
-def get_theme():
-    """Get theme colors"""
-    theme_doc = db['theme'].find_one({})
+async def load_theme():
+    """Load theme colors, falling back to the default theme"""
+    theme_doc = await db['theme'].find_one({})
     if theme_doc:
         return {
             "primary_color": theme_doc.get('primary_color', '#ef4444'),
@@ -1006,8 +1357,13 @@ def get_theme():
         "gradient_style": "linear"
     }
 
+@app.get("/api/theme")
+async def get_theme(request: Request):
+    """Get theme colors"""
+    return await cached_json(request, "theme", load_theme)
+
 @app.post("/api/theme")
-def update_theme(data: dict = Body(...)):
+async def update_theme(data: dict = Body(...)):
     """Update theme colors"""
     try:
         theme_data = {
@@ -1028,389 +1384,233 @@ def update_theme(data: dict = Body(...)):
         }
         
         # Upsert to database
-        db['theme'].update_one(
+        await db['theme'].update_one(
             {},
             {"$set": theme_data},
             upsert=True
         )
+        cache.invalidate("theme")
         
         return {"success": True, "message": "Theme updated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error updating theme: {str(e)}")
 
 # ==================== DATA MIGRATION ====================
+MIGRATABLE_COLLECTIONS = [
+    "profile", "experience", "education", "skills", "ventures", "achievements", "whitepapers"
+]
+
 @app.post("/api/migrate")
-def migrate_data(data: dict = Body(...)):
+async def migrate_data(data: dict = Body(...)):
     """Migrate data from constants.js to MongoDB"""
     try:
         # Migrate Profile
         if 'profile' in data:
-            profile_collection.delete_many({})
-            profile_collection.insert_one(data['profile'])
+            await profile_collection.delete_many({})
+            await profile_collection.insert_one(data['profile'])
         
         # Migrate Experience
         if 'experience' in data:
-            experience_collection.delete_many({})
+            await experience_collection.delete_many({})
             for exp in data['experience']:
                 exp['id'] = generate_id()
-                experience_collection.insert_one(exp)
+                await experience_collection.insert_one(exp)
         
         # Migrate Education
         if 'education' in data:
-            education_collection.delete_many({})
+            await education_collection.delete_many({})
             for edu in data['education']:
                 edu['id'] = generate_id()
-                education_collection.insert_one(edu)
+                await education_collection.insert_one(edu)
         
         # Migrate Skills
         if 'skills' in data:
-            skills_collection.delete_many({})
+            await skills_collection.delete_many({})
             for skill in data['skills']:
                 skill['id'] = generate_id()
-                skills_collection.insert_one(skill)
+                await skills_collection.insert_one(skill)
         
         # Migrate Ventures
         if 'ventures' in data:
-            ventures_collection.delete_many({})
+            await ventures_collection.delete_many({})
             for venture in data['ventures']:
                 venture['id'] = generate_id()
-                ventures_collection.insert_one(venture)
+                await ventures_collection.insert_one(venture)
         
         # Migrate Achievements
         if 'achievements' in data:
-            achievements_collection.delete_many({})
-            achievements_collection.insert_one(data['achievements'])
+            await achievements_collection.delete_many({})
+            await achievements_collection.insert_one(data['achievements'])
         
         # Migrate White Papers
         if 'whitepapers' in data:
-            whitepapers_collection.delete_many({})
+            await whitepapers_collection.delete_many({})
             for paper in data['whitepapers']:
                 paper['id'] = generate_id()
-                whitepapers_collection.insert_one(paper)
+                await whitepapers_collection.insert_one(paper)
         
+        cache.invalidate(*[name for name in MIGRATABLE_COLLECTIONS if name in data])
+        if "whitepapers" in data:
+            search_index.mark_stale()
         return {"success": True, "message": "Data migrated successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Migration failed: {str(e)}")
 
 
 # ==================== RESUME GENERATION ====================
-@app.post("/api/generate_resume")
-def generate_resume():
-    """Generate a simple PDF resume from stored profile data and return it."""
-    try:
-        # Gather data (use fallback data when MongoDB is down)
-        def safe_find_one(coll):
-            try:
-                return coll.find_one({}) or {}
-            except Exception:
-                return {}
+# Placeholder resume used when the database holds no resume data
+SAMPLE_RESUME = {
+    "profile": {
+        "name": "Ibrahim El Khalil",
+        "title": "AI & Full Stack Developer",
+        "summary": "Experienced AI Developer and Full Stack Engineer specializing in machine learning, web development, and cloud solutions. Strong background in developing scalable applications and implementing AI-driven features."
+    },
+    "experience": [
+        {
+            "title": "Senior AI Developer",
+            "company": "Tech Solutions Inc.",
+            "startDate": "2023",
+            "endDate": "Present",
+            "description": "Led AI initiatives and developed machine learning solutions for enterprise clients. Implemented natural language processing systems and computer vision applications."
+        },
+        {
+            "title": "Full Stack Developer",
+            "company": "Digital Innovations Ltd",
+            "startDate": "2021",
+            "endDate": "2023",
+            "description": "Developed and maintained scalable web applications using React, Node.js, and Python. Implemented microservices architecture and RESTful APIs."
+        }
+    ],
+    "education": [
+        {
+            "degree": "Master of Science in Computer Science",
+            "institution": "Tech University",
+            "startDate": "2019",
+            "endDate": "2021"
+        },
+        {
+            "degree": "Bachelor of Science in Software Engineering",
+            "institution": "Engineering Institute",
+            "startDate": "2015",
+            "endDate": "2019"
+        }
+    ],
+    "skills": [
+        {
+            "category": "Programming Languages",
+            "items": ["Python", "JavaScript", "TypeScript", "Java", "C++"]
+        },
+        {
+            "category": "Web Technologies",
+            "items": ["React", "Node.js", "Express", "FastAPI", "GraphQL"]
+        },
+        {
+            "category": "AI & ML",
+            "items": ["TensorFlow", "PyTorch", "Scikit-learn", "NLP", "Computer Vision"]
+        }
+    ],
+    "ventures": [
+        {
+            "name": "AI Solutions Hub",
+            "role": "Founder & Lead Developer"
+        },
+        {
+            "name": "Tech Education Initiative",
+            "role": "Technical Advisor"
+        }
+    ]
+}
 
-        def safe_find_list(coll):
-            try:
-                return list(coll.find({}))
-            except Exception:
-                return []
+async def load_resume_sources():
+    """Load the resume's source documents through the read-through cache"""
+    async def safe_load(name, loader, empty):
+        try:
+            return await cache.get_or_load(name, loader) or empty
+        except Exception:
+            return empty
+
+    profile, experiences, education, skills, ventures = await asyncio.gather(
+        safe_load("profile", load_profile, {}),
+        safe_load("experience", lambda: load_collection(experience_collection), []),
+        safe_load("education", lambda: load_collection(education_collection), []),
+        safe_load("skills", lambda: load_collection(skills_collection), []),
+        safe_load("ventures", lambda: load_collection(ventures_collection), [])
+    )
+    # Use sample data if MongoDB is unreachable or empty
+    if not profile and not experiences and not education:
+        return SAMPLE_RESUME
+    return {
+        "profile": profile,
+        "experience": experiences,
+        "education": education,
+        "skills": skills,
+        "ventures": ventures
+    }
 
-        # Try MongoDB first, fall back to sample data if unreachable
-        profile = safe_find_one(profile_collection)
-        experiences = safe_find_list(experience_collection)
-        education = safe_find_list(education_collection)
-        skills = safe_find_list(skills_collection)
-        ventures = safe_find_list(ventures_collection)
-
-        # Use sample data if MongoDB returned empty results
-        if not profile and not experiences and not education:
-            profile = {
-                "name": "Ibrahim El Khalil",
-                "title": "AI & Full Stack Developer",
-                "summary": "Experienced AI Developer and Full Stack Engineer specializing in machine learning, web development, and cloud solutions. Strong background in developing scalable applications and implementing AI-driven features."
-            }
-            experiences = [
-                {
-                    "title": "Senior AI Developer",
-                    "company": "Tech Solutions Inc.",
-                    "startDate": "2023",
-                    "endDate": "Present",
-                    "description": "Led AI initiatives and developed machine learning solutions for enterprise clients. Implemented natural language processing systems and computer vision applications."
-                },
-                {
-                    "title": "Full Stack Developer",
-                    "company": "Digital Innovations Ltd",
-                    "startDate": "2021",
-                    "endDate": "2023",
-                    "description": "Developed and maintained scalable web applications using React, Node.js, and Python. Implemented microservices architecture and RESTful APIs."
-                }
-            ]
-            education = [
-                {
-                    "degree": "Master of Science in Computer Science",
-                    "institution": "Tech University",
-                    "startDate": "2019",
-                    "endDate": "2021"
-                },
-                {
-                    "degree": "Bachelor of Science in Software Engineering",
-                    "institution": "Engineering Institute",
-                    "startDate": "2015",
-                    "endDate": "2019"
-                }
-            ]
-            skills = [
-                {
-                    "category": "Programming Languages",
-                    "items": ["Python", "JavaScript", "TypeScript", "Java", "C++"]
-                },
-                {
-                    "category": "Web Technologies",
-                    "items": ["React", "Node.js", "Express", "FastAPI", "GraphQL"]
-                },
-                {
-                    "category": "AI & ML",
-                    "items": ["TensorFlow", "PyTorch", "Scikit-learn", "NLP", "Computer Vision"]
-                }
-            ]
-            ventures = [
-                {
-                    "name": "AI Solutions Hub",
-                    "role": "Founder & Lead Developer"
-                },
-                {
-                    "name": "Tech Education Initiative",
-                    "role": "Technical Advisor"
-                }
-            ]
+def resume_output_format(template: str = "classic") -> str:
+    """Name of the rendering path (and PDF template) in use; part of the resume cache key"""
+    if HAS_REPORTLAB:
+        return f"reportlab:{template}"
+    return "converter" if converter_url() else "html"
+
+async def render_resume(sources: dict, digest: str, template: str = "classic") -> RenderedResume:
+    """Render the resume as PDF (ReportLab or the converter service) or as HTML"""
+    if HAS_REPORTLAB:
+        # ReportLab layout is CPU-bound and holds the GIL; run it in a worker process
+        pdf_bytes = await renderer.run(
+            render_resume_pdf, sources["profile"], sources["experience"], sources["education"], template
+        )
+        return RenderedResume(pdf_bytes, "application/pdf", "resume.pdf", digest)
 
-        # If ReportLab is available and configured, produce a PDF
-        if HAS_REPORTLAB:
-            buffer = io.BytesIO()
-            c = canvas.Canvas(buffer, pagesize=A4)
-            width, height = A4
-            y = height - 50
-
-            # Add a subtle red line at the top
-            c.setStrokeColorRGB(0.72, 0.11, 0.11)  # Red color
-            c.setLineWidth(3)
-            c.line(40, y + 5, width - 40, y + 5)
-            y -= 10
-
-            # Header with enhanced styling
-            c.setFillColorRGB(0.72, 0.11, 0.11)  # Red color for name
-            c.setFont("Helvetica-Bold", 22)
-            c.drawString(40, y, profile.get('name', ''))
-            y -= 26
-            c.setFillColorRGB(0.2, 0.2, 0.2)  # Dark gray for title
-            c.setFont("Helvetica-Oblique", 13)
-            c.drawString(40, y, profile.get('title', ''))
-            y -= 20
-
-            # Reset to black for body text
-            c.setFillColorRGB(0, 0, 0)
-
-            # Summary (if present) - condensed
-            summary = profile.get('summary') or profile.get('about') or ''
-            if summary:
-                # Ensure summary is a string
-                summary_text = str(summary) if not isinstance(summary, str) else summary
-                c.setFont("Helvetica", 10)
-                for line in textwrap.wrap(summary_text, 95):
-                    if y < 80:
-                        c.showPage()
-                        y = height - 50
-                    c.drawString(40, y, line)
-                    y -= 12
-                y -= 6
-
-            # Experience with improved styling
-            if experiences:
-                # Section header with red accent
-                c.setFillColorRGB(0.72, 0.11, 0.11)
-                c.setFont("Helvetica-Bold", 14)
-                if y < 80:
-                    c.showPage()
-                    y = height - 50
-                c.drawString(40, y, "Experience")
-                c.setStrokeColorRGB(0.72, 0.11, 0.11)
-                c.setLineWidth(1)
-                c.line(40, y - 3, 140, y - 3)
-                c.setFillColorRGB(0, 0, 0)
-                y -= 18
-                
-                for exp in experiences:
-                    if y < 100:
-                        c.showPage()
-                        y = height - 50
-                    # Title and Company
-                    role = exp.get('role') or exp.get('title', '')
-                    company = exp.get('company', '')
-                    title = f"{role} @ {company}"
-                    c.setFont("Helvetica-Bold", 11)
-                    c.drawString(40, y, title)
-                    y -= 14
-                    # Date range - use 'period' field or construct from startDate/endDate
-                    c.setFont("Helvetica", 9)
-                    c.setFillColorRGB(0.3, 0.3, 0.3)
-                    period = exp.get('period') or f"{exp.get('startDate','')} - {exp.get('endDate','') or 'Present'}"
-                    if period and period.strip():
-                        c.drawString(40, y, period)
-                        y -= 12
-                    # Location if available
-                    location = exp.get('location', '')
-                    if location:
-                        c.setFont("Helvetica-Oblique", 9)
-                        c.drawString(40, y, location)
-                        y -= 12
-                    c.setFillColorRGB(0, 0, 0)
-                    # Description - condensed spacing
-                    c.setFont("Helvetica", 10)
-                    desc = exp.get('description', '')
-                    # Handle both string and list descriptions
-                    if isinstance(desc, list):
-                        for item in desc:
-                            item_text = str(item) if not isinstance(item, str) else item
-                            for line in textwrap.wrap(f"• {item_text}", 90):
-                                if y < 60:
-                                    c.showPage()
-                                    y = height - 50
-                                c.drawString(44, y, line)
-                                y -= 11
-                    else:
-                        desc_text = str(desc) if not isinstance(desc, str) else desc
-                        for line in textwrap.wrap(desc_text, 95):
-                            if y < 60:
-                                c.showPage()
-                                y = height - 50
-                            c.drawString(44, y, line)
-                            y -= 11
-                    y -= 6
-
-            # Education with improved styling
-            if education:
-                # Section header with red accent
-                c.setFillColorRGB(0.72, 0.11, 0.11)
-                c.setFont("Helvetica-Bold", 14)
-                if y < 80:
-                    c.showPage()
-                    y = height - 50
-                c.drawString(40, y, "Education")
-                c.setStrokeColorRGB(0.72, 0.11, 0.11)
-                c.setLineWidth(1)
-                c.line(40, y - 3, 130, y - 3)
-                c.setFillColorRGB(0, 0, 0)
-                y -= 18
-                
-                for edu in education:
-                    if y < 100:
-                        c.showPage()
-                        y = height - 50
-                    # Degree and Institution
-                    degree = edu.get('degree') or edu.get('title', '')
-                    institution = edu.get('institution') or edu.get('school', '')
-                    c.setFont("Helvetica-Bold", 11)
-                    c.drawString(40, y, degree)
-                    y -= 14
-                    c.setFont("Helvetica", 10)
-                    c.drawString(40, y, institution)
-                    y -= 12
-                    # Date range
-                    period = edu.get('period') or f"{edu.get('startDate','')} - {edu.get('endDate','')}"
-                    if period and period.strip():
-                        c.setFont("Helvetica", 9)
-                        c.setFillColorRGB(0.3, 0.3, 0.3)
-                        c.drawString(40, y, period)
-                        y -= 12
-                    # Location if available
-                    location = edu.get('location', '')
-                    if location:
-                        c.setFont("Helvetica-Oblique", 9)
-                        c.drawString(40, y, location)
-                        y -= 12
-                    c.setFillColorRGB(0, 0, 0)
-                    # Description or field of study - condensed
-                    desc = edu.get('description') or edu.get('field', '')
-                    if desc:
-                        c.setFont("Helvetica", 9)
-                        desc_text = str(desc) if not isinstance(desc, str) else desc
-                        for line in textwrap.wrap(desc_text, 95):
-                            if y < 60:
-                                c.showPage()
-                                y = height - 50
-                            c.drawString(44, y, line)
-                            y -= 10
-                    y -= 6
-
-            # Skills section removed to save space and fit on one page
-
-            c.save()
-            buffer.seek(0)
-
-            return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": "attachment; filename=resume.pdf"})
-
-        # Build HTML resume
-        html_parts = []
-        html_parts.append('<!doctype html><html><head><meta charset="utf-8"><title>Resume</title>')
-        html_parts.append('<style>body{font-family:Arial,Helvetica,sans-serif;padding:20px;color:#111;line-height:1.4} h1{color:#2563eb;font-size:28px;margin-bottom:5px} h2{color:#1f2937;font-size:18px;margin-top:20px;margin-bottom:10px;border-bottom:2px solid #e5e7eb;padding-bottom:5px} .section{margin-top:18px} .muted{color:#6b7280;font-size:14px} .contact{color:#374151;margin-bottom:15px} .experience-item,.education-item{margin-bottom:15px} .skills-grid{display:flex;flex-wrap:wrap;gap:8px} .skill-tag{background-color:#f3f4f6;padding:4px 8px;border-radius:4px;font-size:12px;color:#374151}</style>')
-        html_parts.append('</head><body>')
-        html_parts.append(f"<h1>{profile.get('name','')}</h1>")
-        html_parts.append(f"<div class=\"muted\">{profile.get('title','')}</div>")
-        if profile.get('summary'):
-            html_parts.append(f"<div class='section'><strong>Summary</strong><p>{profile.get('summary')}</p></div>")
-
-        if experiences:
-            html_parts.append("<div class='section'><strong>Experience</strong>")
-            for exp in experiences:
-                html_parts.append(f"<div><strong>{exp.get('title','')} @ {exp.get('company','')}</strong><div class='muted'>{exp.get('startDate','')} - {exp.get('endDate','') or 'Present'}</div><p>{exp.get('description','')}</p></div>")
-            html_parts.append("</div>")
-
-        if education:
-            html_parts.append("<div class='section'><strong>Education</strong>")
-            for edu in education:
-                html_parts.append(f"<div><strong>{edu.get('degree','')} - {edu.get('institution','')}</strong><div class='muted'>{edu.get('startDate','')} - {edu.get('endDate','')}</div></div>")
-            html_parts.append("</div>")
-
-        if skills:
-            flat_skills = []
-            for s in skills:
-                items = s.get('items') if isinstance(s, dict) else s
-                if isinstance(items, list):
-                    flat_skills.extend(items)
-                elif isinstance(s, list):
-                    flat_skills.extend(s)
-            html_parts.append("<div class='section'><strong>Skills</strong><p>" + ', '.join(flat_skills[:200]) + "</p></div>")
-
-        if ventures:
-            html_parts.append("<div class='section'><strong>Ventures</strong>")
-            for v in ventures:
-                html_parts.append(f"<div><strong>{v.get('name','')}</strong> - {v.get('role','')}</div>")
-            html_parts.append("</div>")
-
-        html_parts.append('</body></html>')
-        html = '\n'.join(html_parts)
-
-        # If a PDF converter service is configured, forward HTML to it to produce a PDF
-        pdf_converter_url = os.getenv('PDF_CONVERTER_URL')
-        if pdf_converter_url:
+    # If a PDF converter service is configured, stream the HTML to it as it is generated
+    if converter_url():
+        pdf = await pdf_converter.convert(iter_resume_html(sources))
+        if pdf is not None:
             try:
-                # import requests lazily so server can start even if requests isn't installed
-                import requests
-                conv_endpoint = pdf_converter_url.rstrip('/') + '/pdf'
-                # send HTML to converter and stream back PDF
-                r = requests.post(conv_endpoint, json={'html': html}, stream=True, timeout=60)
-                if r.status_code == 200:
-                    headers = {
-                        'Content-Type': r.headers.get('Content-Type', 'application/pdf'),
-                        'Content-Disposition': r.headers.get('Content-Disposition', 'attachment; filename=resume.pdf')
-                    }
-                    return StreamingResponse(r.raw, status_code=200, headers=headers)
-                else:
-                    # fall back to returning HTML if converter failed
-                    return StreamingResponse(io.BytesIO(html.encode('utf-8')), media_type='text/html', headers={"Content-Disposition": "attachment; filename=resume.html"})
-            except Exception as e:
-                # log and fall back to HTML
-                print('PDF converter call failed:', e)
-                return StreamingResponse(io.BytesIO(html.encode('utf-8')), media_type='text/html', headers={"Content-Disposition": "attachment; filename=resume.html"})
-
-        # Default fallback: return HTML for browsers to print
-        return StreamingResponse(io.BytesIO(html.encode('utf-8')), media_type='text/html', headers={"Content-Disposition": "attachment; filename=resume.html"})
+                return RenderedResume(await pdf.read(), pdf.media_type, "resume.pdf", digest)
+            except httpx.HTTPError as e:
+                # e.g. a read timeout after the converter already answered 200
+                logger.error(f"PDF converter response failed: {e}")
+        # Fall back to HTML, but do not cache it: the converter may be back for the next download
+        html = await renderer.run(render_resume_html, sources)
+        return RenderedResume(html.encode('utf-8'), "text/html", "resume.html", digest, cacheable=False)
+
+    html = await renderer.run(render_resume_html, sources)
+    # Default fallback: return HTML for browsers to print
+    return RenderedResume(html.encode('utf-8'), "text/html", "resume.html", digest)
+
+async def prerender_resume():
+    """Render the current resume into the resume cache"""
+    await resume_cache.get(await load_resume_sources(), resume_output_format(), render_resume)
+
+# Re-render in the background after an edit, so the next download is served from memory
+cache.subscribe(lambda collections: resume_cache.schedule_refresh(prerender_resume), *RESUME_SOURCES)
+
+@app.get("/api/generate_resume")
+@app.post("/api/generate_resume")
+async def generate_resume(request: Request, template: str = "classic"):
+    """
+    Download the resume generated from the stored profile data
+    
+    Renders are cached by a hash of the source data and template, so repeat downloads
+    are served from memory with ETag (If-None-Match) and Range support
+
+    Query params:
+    - template: PDF layout (classic, compact or ats)
+    """
+    if template not in TEMPLATES:
+        raise HTTPException(status_code=400, detail=f"Unknown template. Use one of: {', '.join(TEMPLATES)}")
+    try:
+        sources = await load_resume_sources()
+        resume = await resume_cache.get(
+            sources, resume_output_format(template),
+            lambda sources, digest: render_resume(sources, digest, template)
+        )
+        return resume_response(resume, request.headers)
+    except RenderQueueFull:
+        raise HTTPException(status_code=503, detail="Resume rendering is busy, retry shortly", headers={"Retry-After": "5"})
+    except TimeoutError as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except RuntimeError as re:
         # Informative error when build-time deps are missing
         raise HTTPException(status_code=503, detail=str(re))
@@ -1426,35 +1626,27 @@ async def generate_ats_resume(request: dict):
         job_description = request.get('job_description', '')
         target_role = request.get('target_role', 'Software Engineer')
         
-        # Import Gemini API
-        import google.generativeai as genai
-        
-        # Configure Gemini
-        api_key = os.getenv('GEMINI_API_KEY')
-        if not api_key:
+        if not llm.is_configured():
             raise HTTPException(status_code=503, detail="Gemini API key not configured")
         
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        
         # Gather data from database
-        def safe_find_one(coll):
+        async def safe_find_one(coll):
             try:
-                return coll.find_one({}) or {}
+                return await coll.find_one({}) or {}
             except Exception:
                 return {}
 
-        def safe_find_list(coll):
+        async def safe_find_list(coll):
             try:
-                return list(coll.find({}))
+                return await coll.find({}).to_list(length=None)
             except Exception:
                 return []
 
-        profile = safe_find_one(profile_collection)
-        experiences = safe_find_list(experience_collection)
-        education = safe_find_list(education_collection)
-        skills = safe_find_list(skills_collection)
-        ventures = safe_find_list(ventures_collection)
+        profile = await safe_find_one(profile_collection)
+        experiences = await safe_find_list(experience_collection)
+        education = await safe_find_list(education_collection)
+        skills = await safe_find_list(skills_collection)
+        ventures = await safe_find_list(ventures_collection)
 
         # Prepare data for AI analysis
         profile_data = {
@@ -1529,7 +1721,7 @@ Focus on relevance, impact, and ATS compatibility. Remove unnecessary informatio
 """
 
         # Get AI response
-        response = model.generate_content(ai_prompt)
+        response = await llm.generate("resume", ai_prompt)
         
         # Parse AI response
         import json
@@ -1554,184 +1746,31 @@ Focus on relevance, impact, and ATS compatibility. Remove unnecessary informatio
         except json.JSONDecodeError as e:
             raise Exception(f"Invalid JSON from AI: {str(e)}")
 
-        # Generate HTML resume with ATS-friendly styling
-        html_parts = []
-        html_parts.append('<!doctype html><html><head><meta charset="utf-8"><title>ATS Resume</title>')
-        
-        # ATS-friendly CSS
-        ats_css = """
-        <style>
-        body {
-            font-family: Arial, Helvetica, sans-serif;
-            font-size: 11pt;
-            line-height: 1.3;
-            color: #000;
-            margin: 0.5in;
-            max-width: 8.5in;
-        }
-        h1 {
-            font-size: 16pt;
-            font-weight: bold;
-            color: #000;
-            margin: 0 0 5pt 0;
-            text-align: center;
-        }
-        h2 {
-            font-size: 12pt;
-            font-weight: bold;
-            color: #000;
-            margin: 15pt 0 5pt 0;
-            border-bottom: 1pt solid #000;
-            padding-bottom: 2pt;
-            text-transform: uppercase;
-        }
-        .contact {
-            text-align: center;
-            margin-bottom: 15pt;
-            font-size: 10pt;
-        }
-        .section {
-            margin-bottom: 15pt;
-        }
-        .job-title {
-            font-weight: bold;
-            font-size: 11pt;
-        }
-        .company {
-            font-weight: bold;
-        }
-        .duration {
-            float: right;
-            font-weight: normal;
-        }
-        .achievement {
-            margin: 3pt 0;
-        }
-        .skills-section {
-            display: block;
-        }
-        .skill-category {
-            margin: 5pt 0;
-        }
-        .skill-category strong {
-            font-weight: bold;
-        }
-        ul {
-            margin: 3pt 0;
-            padding-left: 15pt;
-        }
-        li {
-            margin: 2pt 0;
-        }
-        </style>
-        """
-        
-        html_parts.append(ats_css)
-        html_parts.append('</head><body>')
-        
-        # Header
-        html_parts.append(f'<h1>{resume_data.get("name", "")}</h1>')
-        
-        # Contact Info
-        contact = resume_data.get("contact", {})
-        contact_parts = []
-        if contact.get("email"):
-            contact_parts.append(contact["email"])
-        if contact.get("phone"):
-            contact_parts.append(contact["phone"])
-        if contact.get("location"):
-            contact_parts.append(contact["location"])
-        if contact.get("linkedin"):
-            contact_parts.append(contact["linkedin"])
-        if contact.get("github"):
-            contact_parts.append(contact["github"])
-        
-        if contact_parts:
-            html_parts.append(f'<div class="contact">{" | ".join(contact_parts)}</div>')
-        
-        # Professional Title
-        if resume_data.get("title"):
-            html_parts.append(f'<div style="text-align: center; font-weight: bold; margin-bottom: 10pt;">{resume_data["title"]}</div>')
-        
-        # Summary
-        if resume_data.get("summary"):
-            html_parts.append('<h2>Professional Summary</h2>')
-            html_parts.append(f'<div class="section">{resume_data["summary"]}</div>')
-        
-        # Experience
-        if resume_data.get("experience"):
-            html_parts.append('<h2>Professional Experience</h2>')
-            html_parts.append('<div class="section">')
-            for exp in resume_data["experience"]:
-                html_parts.append(f'<div style="margin-bottom: 12pt;">')
-                html_parts.append(f'<div class="job-title">{exp.get("title", "")} <span class="duration">{exp.get("duration", "")}</span></div>')
-                html_parts.append(f'<div class="company">{exp.get("company", "")}</div>')
-                if exp.get("achievements"):
-                    html_parts.append('<ul>')
-                    for achievement in exp["achievements"]:
-                        html_parts.append(f'<li>{achievement}</li>')
-                    html_parts.append('</ul>')
-                html_parts.append('</div>')
-            html_parts.append('</div>')
-        
-        # Education
-        if resume_data.get("education"):
-            html_parts.append('<h2>Education</h2>')
-            html_parts.append('<div class="section">')
-            for edu in resume_data["education"]:
-                html_parts.append(f'<div style="margin-bottom: 8pt;">')
-                html_parts.append(f'<div class="job-title">{edu.get("degree", "")} <span class="duration">{edu.get("year", "")}</span></div>')
-                html_parts.append(f'<div>{edu.get("institution", "")}</div>')
-                html_parts.append('</div>')
-            html_parts.append('</div>')
-        
-        # Skills
-        if resume_data.get("skills"):
-            html_parts.append('<h2>Technical Skills</h2>')
-            html_parts.append('<div class="section skills-section">')
-            skills = resume_data["skills"]
-            
-            for category, skill_list in skills.items():
-                if skill_list:
-                    category_name = category.replace("_", " ").title()
-                    html_parts.append(f'<div class="skill-category"><strong>{category_name}:</strong> {", ".join(skill_list)}</div>')
-            
-            html_parts.append('</div>')
-        
-        html_parts.append('</body></html>')
-        html = '\n'.join(html_parts)
-        
         # Return the enhanced resume
         if request.get('format') == 'json':
+            # Generate HTML resume with ATS-friendly styling
+            html = await renderer.run(render_ats_resume_html, resume_data)
             return {
                 "status": "success",
                 "resume_data": resume_data,
                 "html": html
             }
         
-        # Return as HTML/PDF
-        pdf_converter_url = os.getenv('PDF_CONVERTER_URL')
-        if pdf_converter_url:
-            try:
-                import requests
-                conv_endpoint = pdf_converter_url.rstrip('/') + '/pdf'
-                r = requests.post(conv_endpoint, json={'html': html}, stream=True, timeout=60)
-                if r.status_code == 200:
-                    headers = {
-                        'Content-Type': 'application/pdf',
-                        'Content-Disposition': 'attachment; filename=ats_resume.pdf'
-                    }
-                    return StreamingResponse(r.raw, status_code=200, headers=headers)
-            except Exception as e:
-                print('PDF converter call failed:', e)
-        
-        # Return HTML
+        # Return as PDF, streaming the HTML through the converter section by section
+        pdf = await pdf_converter.convert(iter_ats_resume_html(resume_data))
+        if pdf is not None:
+            headers = {'Content-Disposition': 'attachment; filename=ats_resume.pdf'}
+            return StreamingResponse(pdf, media_type='application/pdf', headers=headers)
+        
+        # Return HTML, sent as each section is generated
         return StreamingResponse(
-            io.BytesIO(html.encode('utf-8')), 
+            html_body(iter_ats_resume_html(resume_data)),
             media_type='text/html', 
             headers={"Content-Disposition": "attachment; filename=ats_resume.html"}
         )
         
+    except RenderQueueFull:
+        raise HTTPException(status_code=503, detail="Resume rendering is busy, retry shortly", headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"AI resume generation failed: {str(e)}")
 
@@ -1751,12 +1790,9 @@ async def import_resume(file: UploadFile = File(...)):
     try:
         # Read PDF content
         content = await file.read()
-        pdf_reader = PdfReader(io.BytesIO(content))
         
-        # Extract text from all pages
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
+        # Extract text from all pages (CPU-bound, keep it off the event loop)
+        text = await run_in_threadpool(extract_pdf_text, content)
         
         if not text.strip():
             raise HTTPException(status_code=400, detail="Could not extract text from PDF")
@@ -1765,7 +1801,8 @@ async def import_resume(file: UploadFile = File(...)):
         parsed_data = parse_resume_text(text)
         
         # Populate database
-        populate_database_from_parsed_resume(parsed_data)
+        await populate_database_from_parsed_resume(parsed_data)
+        cache.invalidate("profile", "experience", "education", "skills")
         
         return {
             "success": True,
@@ -1778,6 +1815,14 @@ async def import_resume(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error importing resume: {str(e)}")
 
+def extract_pdf_text(content: bytes) -> str:
+    """Extract the text of every page of a PDF document"""
+    pdf_reader = PdfReader(io.BytesIO(content))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text() + "\n"
+    return text
+
 def parse_resume_text(text: str) -> dict:
     """Parse resume text and extract structured data"""
     lines = text.split('\n')
@@ -1889,12 +1934,12 @@ def parse_resume_text(text: str) -> dict:
     
     return parsed
 
-def populate_database_from_parsed_resume(data: dict):
+async def populate_database_from_parsed_resume(data: dict):
     """Populate database collections from parsed resume data"""
     
     # Update profile
     if data['profile']:
-        profile_collection.update_one(
+        await profile_collection.update_one(
             {},
             {"$set": data['profile']},
             upsert=True
@@ -1910,7 +1955,7 @@ def populate_database_from_parsed_resume(data: dict):
             exp.setdefault('location', '')
             exp.setdefault('period', '')
             exp.setdefault('description', [])
-            experience_collection.insert_one(exp)
+            await experience_collection.insert_one(exp)
     
     # Add education entries
     for edu in data['education']:
@@ -1922,7 +1967,7 @@ def populate_database_from_parsed_resume(data: dict):
             edu.setdefault('location', '')
             edu.setdefault('period', '')
             edu.setdefault('field', '')
-            education_collection.insert_one(edu)
+            await education_collection.insert_one(edu)
     
     # Add skills
     if data['skills']:
@@ -1932,9 +1977,130 @@ def populate_database_from_parsed_resume(data: dict):
             'category': 'General Skills',
             'skills': data['skills']
         }
-        skills_collection.insert_one(skill_category)
+        await skills_collection.insert_one(skill_category)
 
 # ==================== AI CHAT WITH MEMORY ====================
+DEFAULT_CHAT_INSTRUCTIONS = """You are Ibrahim El Khalil's AI assistant. You help visitors learn about his portfolio, skills, and experience.
+            
+Be professional, friendly, and helpful. Provide accurate information about Ibrahim's:
+- Professional experience and projects
+- Technical skills and expertise
+- Education and achievements
+- Ventures and entrepreneurial activities
+
+If you remember previous conversations with the user, use that context to provide personalized responses."""
+
+async def load_ai_instructions():
+    """Load the custom AI instructions ("" when none are stored)"""
+    instructions_doc = await db['ai_instructions'].find_one({})
+    return (instructions_doc.get('instructions') if instructions_doc else None) or ""
+
+async def load_published_blog_text():
+    """Load the searchable fields of published blog posts for the retrieval index"""
+    cursor = blogs_collection.find(
+        {"status": "published"},
+        {"_id": 0, "id": 1, "title": 1, "excerpt": 1, "content": 1, "tags": 1, "category": 1}
+    )
+    return await cursor.to_list(length=None)
+
+# Collections indexed for chat retrieval: name -> (loader, document extractor)
+RETRIEVAL_SOURCES = {
+    "profile": (load_profile, None),
+    "experience": (lambda: load_collection(experience_collection), None),
+    "education": (lambda: load_collection(education_collection), None),
+    "skills": (lambda: load_collection(skills_collection), None),
+    "ventures": (lambda: load_collection(ventures_collection), None),
+    "achievements": (
+        load_achievements,
+        lambda doc: doc.get("certificates", []) + doc.get("hackathons", [])
+    ),
+    "whitepapers": (lambda: load_collection(whitepapers_collection), None),
+}
+
+async def refresh_retrieval_index():
+    """
+    Re-index sources whose cached content changed since the last question
+    
+    Values come from the read-through cache, so an unchanged source is the same
+    object as last time and is skipped without any work
+    """
+    names = list(RETRIEVAL_SOURCES) + ["blogs"]
+    values = await asyncio.gather(
+        *[cache.get_or_load(name, loader) for name, (loader, _) in RETRIEVAL_SOURCES.items()],
+        cache.get_or_load("blogs", load_published_blog_text, variant="retrieval")
+    )
+    for name, value in zip(names, values):
+        extract = RETRIEVAL_SOURCES[name][1] if name in RETRIEVAL_SOURCES else None
+        retrieval.sync_source(name, value, extract)
+
+async def build_chat_prompt(message: str, user_id: str, mem0_service):
+    """
+    Build the chat prompt from the AI instructions, the portfolio chunks most
+    relevant to the question and the user's memories
+    
+    Returns the prompt and the response-cache scope, which is None when the prompt
+    carries per-user memory context and must not be answered from the cache
+    """
+    # Get AI instructions from database
+    system_instruction = await cache.get_or_load("ai_instructions", load_ai_instructions)
+    
+    if not system_instruction:
+        system_instruction = DEFAULT_CHAT_INSTRUCTIONS
+    
+    # Ground the answer in the portfolio content instead of the instructions alone
+    portfolio_context = ""
+    try:
+        await refresh_retrieval_index()
+        portfolio_context = retrieval.context_for(message)
+    except Exception as e:
+        logger.warning(f"Portfolio retrieval unavailable: {e}")
+    
+    # Get relevant context from memories
+    memory_context = ""
+    if mem0_service.is_available():
+        memory_context = await run_in_threadpool(
+            mem0_service.get_context_for_chat, message, user_id, limit=3
+        )
+    
+    # Build the prompt with portfolio and memory context
+    full_prompt = system_instruction
+    if portfolio_context:
+        full_prompt += f"\n\n{portfolio_context}"
+    if memory_context:
+        full_prompt += f"\n\n{memory_context}\n\nUser's current question: {message}"
+    else:
+        full_prompt += f"\n\nUser's question: {message}"
+    
+    # Answers depend on the indexed content too, so editing the portfolio starts a new scope
+    cache_scope = None if memory_context else chat_cache.scope_for(f"{system_instruction}\n{retrieval.fingerprint}")
+    return full_prompt, cache_scope
+
+async def record_chat_exchange(mem0_service, message: str, ai_response: str, user_id: str, session_id: str):
+    """Store a finished exchange in memory and count it in analytics"""
+    # Store conversation in memory
+    if mem0_service.is_available():
+        conversation = [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": ai_response}
+        ]
+        await run_in_threadpool(
+            mem0_service.add_conversation,
+            conversation,
+            user_id=user_id,
+            metadata={
+                "session_id": session_id,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        )
+    
+    # Track analytics
+    analytics.increment("ai_chat_sessions")
+
+def sse_event(data: dict, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Event"""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
 @app.post("/api/ai/chat")
 async def ai_chat(data: dict = Body(...)):
     """
@@ -1952,72 +2118,25 @@ async def ai_chat(data: dict = Body(...)):
         # Get Mem0 service
         mem0_service = get_mem0_service()
         
-        # Get AI instructions from database
-        instructions_doc = db['ai_instructions'].find_one({})
-        system_instruction = instructions_doc.get('instructions') if instructions_doc else None
-        
-        if not system_instruction:
-            system_instruction = """You are Ibrahim El Khalil's AI assistant. You help visitors learn about his portfolio, skills, and experience.
-            
-Be professional, friendly, and helpful. Provide accurate information about Ibrahim's:
-- Professional experience and projects
-- Technical skills and expertise
-- Education and achievements
-- Ventures and entrepreneurial activities
-
-If you remember previous conversations with the user, use that context to provide personalized responses."""
-        
-        # Get relevant context from memories
-        memory_context = ""
-        if mem0_service.is_available():
-            memory_context = mem0_service.get_context_for_chat(message, user_id, limit=3)
-        
-        # Import Gemini
         try:
-            import google.generativeai as genai
-            api_key = os.getenv("GEMINI_API_KEY") or os.getenv("GOOGLE_API_KEY")
-            
-            if not api_key or api_key == "your-gemini-api-key-here":
+            if not llm.is_configured():
                 return {
                     "response": "I'm currently in demo mode. Please configure the Gemini API key to enable AI chat functionality.",
                     "has_memory": False
                 }
             
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
+            full_prompt, cache_scope = await build_chat_prompt(message, user_id, mem0_service)
             
-            # Build the prompt with memory context
-            full_prompt = system_instruction
-            if memory_context:
-                full_prompt += f"\n\n{memory_context}\n\nUser's current question: {message}"
-            else:
-                full_prompt += f"\n\nUser's question: {message}"
-            
-            # Generate response
-            response = model.generate_content(full_prompt)
-            ai_response = response.text
+            # Serve repeated questions from the response cache
+            ai_response = chat_cache.get(message, cache_scope) if cache_scope else None
+            if ai_response is None:
+                # Generate response
+                response = await llm.generate("chat", full_prompt)
+                ai_response = response.text
+                if cache_scope:
+                    chat_cache.put(message, cache_scope, ai_response)
             
-            # Store conversation in memory
-            if mem0_service.is_available():
-                conversation = [
-                    {"role": "user", "content": message},
-                    {"role": "assistant", "content": ai_response}
-                ]
-                mem0_service.add_conversation(
-                    conversation,
-                    user_id=user_id,
-                    metadata={
-                        "session_id": session_id,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                )
-            
-            # Track analytics
-            analytics_collection.update_one(
-                {},
-                {"$inc": {"ai_chat_sessions": 1}},
-                upsert=True
-            )
+            await record_chat_exchange(mem0_service, message, ai_response, user_id, session_id)
             
             return {
                 "response": ai_response,
@@ -2035,10 +2154,95 @@ If you remember previous conversations with the user, use that context to provid
         logger.error(f"Error in AI chat endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/ai/chat/stream")
+async def ai_chat_stream(data: dict = Body(...)):
+    """
+    Streaming variant of the AI chat endpoint (Server-Sent Events)
+    Emits a "data" event per generated chunk, then a "done" event; memory and
+    analytics are recorded after the stream closes
+    """
+    message = data.get("message", "")
+    user_id = data.get("user_id", "anonymous")
+    session_id = data.get("session_id", str(uuid.uuid4()))
+    
+    if not message:
+        raise HTTPException(status_code=400, detail="Message is required")
+    
+    mem0_service = get_mem0_service()
+    
+    try:
+        demo_mode = not llm.is_configured()
+        full_prompt, cache_scope = (
+            (None, None) if demo_mode else await build_chat_prompt(message, user_id, mem0_service)
+        )
+    except Exception as e:
+        logger.error(f"Error preparing AI chat stream: {e}")
+        raise HTTPException(status_code=500, detail=f"AI chat error: {str(e)}")
+    
+    # Filled in by the generator and read by the background task once the stream is sent
+    state = {"parts": [], "completed": False}
+    cached_response = chat_cache.get(message, cache_scope) if cache_scope else None
+    
+    async def event_stream():
+        if demo_mode:
+            yield sse_event({"text": "I'm currently in demo mode. Please configure the Gemini API key to enable AI chat functionality."})
+            yield sse_event({"session_id": session_id, "has_memory": False}, event="done")
+            return
+        if cached_response is not None:
+            state["parts"].append(cached_response)
+            state["completed"] = True
+            yield sse_event({"text": cached_response})
+            yield sse_event({"session_id": session_id, "has_memory": mem0_service.is_available()}, event="done")
+            return
+        try:
+            async for text in llm.stream("chat", full_prompt):
+                state["parts"].append(text)
+                yield sse_event({"text": text})
+            state["completed"] = True
+            if cache_scope:
+                chat_cache.put(message, cache_scope, "".join(state["parts"]))
+            yield sse_event({"session_id": session_id, "has_memory": mem0_service.is_available()}, event="done")
+        except Exception as e:
+            logger.error(f"Error in AI chat stream: {e}")
+            yield sse_event({"detail": f"AI chat error: {str(e)}"}, event="error")
+    
+    async def persist_exchange():
+        if state["completed"]:
+            await record_chat_exchange(mem0_service, message, "".join(state["parts"]), user_id, session_id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(persist_exchange)
+    )
+
 # ==================== MEMORY MANAGEMENT ====================
 # ==================== SECTION VISIBILITY SETTINGS ====================
+async def load_section_visibility():
+    """Load section visibility settings, creating the defaults on first use"""
+    collection = db['section_visibility']
+    sections = await collection.find({}, {"_id": 0}).to_list(length=None)
+    
+    # If no settings exist, create default ones
+    if not sections:
+        default_sections = [
+            {"section_name": "hero", "is_visible": True, "display_order": 0, "last_updated": datetime.now().isoformat()},
+            {"section_name": "ventures", "is_visible": True, "display_order": 1, "last_updated": datetime.now().isoformat()},
+            {"section_name": "experience", "is_visible": True, "display_order": 2, "last_updated": datetime.now().isoformat()},
+            {"section_name": "education", "is_visible": True, "display_order": 3, "last_updated": datetime.now().isoformat()},
+            {"section_name": "achievements", "is_visible": True, "display_order": 4, "last_updated": datetime.now().isoformat()},
+            {"section_name": "blog", "is_visible": True, "display_order": 5, "last_updated": datetime.now().isoformat()}
+        ]
+        
+        # Insert default settings (insert_many adds _id to the dicts, so copy them)
+        await collection.insert_many([dict(section) for section in default_sections])
+        sections = default_sections
+    
+    return {"sections": sections}
+
 @app.get("/api/section-visibility")
-async def get_section_visibility():
+async def get_section_visibility(request: Request):
     """Get section visibility settings for portfolio"""
     try:
         if not is_mongodb_available():
@@ -2053,25 +2257,7 @@ async def get_section_visibility():
             ]
             return {"sections": default_sections}
         
-        collection = db['section_visibility']
-        sections = list(collection.find({}, {"_id": 0}))
-        
-        # If no settings exist, create default ones
-        if not sections:
-            default_sections = [
-                {"section_name": "hero", "is_visible": True, "display_order": 0, "last_updated": datetime.now().isoformat()},
-                {"section_name": "ventures", "is_visible": True, "display_order": 1, "last_updated": datetime.now().isoformat()},
-                {"section_name": "experience", "is_visible": True, "display_order": 2, "last_updated": datetime.now().isoformat()},
-                {"section_name": "education", "is_visible": True, "display_order": 3, "last_updated": datetime.now().isoformat()},
-                {"section_name": "achievements", "is_visible": True, "display_order": 4, "last_updated": datetime.now().isoformat()},
-                {"section_name": "blog", "is_visible": True, "display_order": 5, "last_updated": datetime.now().isoformat()}
-            ]
-            
-            # Insert default settings
-            collection.insert_many(default_sections)
-            sections = default_sections
-        
-        return {"sections": sections}
+        return await cached_json(request, "section_visibility", load_section_visibility)
         
     except Exception as e:
         logger.error(f"Error getting section visibility: {e}")
@@ -2090,11 +2276,12 @@ async def update_section_visibility(sections_data: dict = Body(...), _: bool = D
         # Update each section
         for section in sections:
             section['last_updated'] = datetime.now().isoformat()
-            collection.update_one(
+            await collection.update_one(
                 {"section_name": section['section_name']},
                 {"$set": section},
                 upsert=True
             )
+        cache.invalidate("section_visibility")
         
         return {"success": True, "message": "Section visibility updated successfully"}
         
@@ -2119,7 +2306,7 @@ async def get_portfolio_settings(_: bool = Depends(verify_admin_auth)):
         visibility_collection = db['section_visibility']
         
         # Get general settings
-        settings = settings_collection.find_one({}, {"_id": 0})
+        settings = await settings_collection.find_one({}, {"_id": 0})
         if not settings:
             settings = {
                 "maintenance_mode": False,
@@ -2129,7 +2316,7 @@ async def get_portfolio_settings(_: bool = Depends(verify_admin_auth)):
             }
         
         # Get section visibility
-        sections = list(visibility_collection.find({}, {"_id": 0}))
+        sections = await visibility_collection.find({}, {"_id": 0}).to_list(length=None)
         settings['section_visibility'] = sections
         
         return settings
@@ -2152,7 +2339,7 @@ async def update_portfolio_settings(settings_data: dict = Body(...), _: bool = D
         
         # Update general settings
         settings_data['last_updated'] = datetime.now().isoformat()
-        settings_collection.update_one(
+        await settings_collection.update_one(
             {},
             {"$set": settings_data},
             upsert=True
@@ -2163,11 +2350,12 @@ async def update_portfolio_settings(settings_data: dict = Body(...), _: bool = D
             visibility_collection = db['section_visibility']
             for section in sections:
                 section['last_updated'] = datetime.now().isoformat()
-                visibility_collection.update_one(
+                await visibility_collection.update_one(
                     {"section_name": section['section_name']},
                     {"$set": section},
                     upsert=True
                 )
+            cache.invalidate("section_visibility")
         
         return {"success": True, "message": "Portfolio settings updated successfully"}
         
@@ -2175,6 +2363,156 @@ async def update_portfolio_settings(settings_data: dict = Body(...), _: bool = D
         logger.error(f"Error updating portfolio settings: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# ==================== PORTFOLIO SNAPSHOT ====================
+# One pre-serialized document with every public section, rebuilt only when
+# one of its source collections is invalidated
+SNAPSHOT_SOURCES = [
+    "profile", "experience", "education", "skills", "ventures", "achievements",
+    "whitepapers", "theme", "section_visibility", "blogs"
+]
+cache.depends_on("portfolio", *SNAPSHOT_SOURCES)
+
+# ETag of the last snapshot, kept past the cache TTL so revalidations are answered
+# without loading anything while the snapshot's sources are unchanged in this worker.
+# Writes through other uvicorn workers are not seen here, so it still expires.
+PORTFOLIO_VALIDATOR_SECONDS = float(os.getenv('PORTFOLIO_VALIDATOR_SECONDS', '300'))
+portfolio_validator = {"etag": None, "generation": None, "expires_at": 0.0}
+
+async def load_published_blogs():
+    """Load published blog posts for listings, without their full content"""
+    cursor = blogs_collection.find(
+        {"status": "published"}, {"content": 0, "content_html": 0, "toc": 0}
+    ).sort("created_at", -1)
+    return [serialize_doc(blog) async for blog in cursor]
+
+async def build_portfolio_snapshot():
+    """Serialize every public section once and derive a strong ETag from the bytes"""
+    generation = cache.generation("portfolio")
+    (profile, experience, education, skills, ventures, achievements,
+     whitepapers, theme, visibility, blogs) = await asyncio.gather(
+        cache.get_or_load("profile", load_profile),
+        cache.get_or_load("experience", lambda: load_collection(experience_collection)),
+        cache.get_or_load("education", lambda: load_collection(education_collection)),
+        cache.get_or_load("skills", lambda: load_collection(skills_collection)),
+        cache.get_or_load("ventures", lambda: load_collection(ventures_collection)),
+        cache.get_or_load("achievements", load_achievements),
+        cache.get_or_load("whitepapers", lambda: load_collection(whitepapers_collection)),
+        cache.get_or_load("theme", load_theme),
+        cache.get_or_load("section_visibility", load_section_visibility),
+        load_published_blogs()
+    )
+
+    snapshot = {
+        "profile": profile,
+        "experience": experience,
+        "education": education,
+        "skills": skills,
+        "ventures": ventures,
+        "achievements": achievements,
+        "whitepapers": whitepapers,
+        "theme": theme,
+        "sections": visibility["sections"],
+        "blogs": blogs
+    }
+    body = json.dumps(snapshot, default=str, separators=(",", ":")).encode("utf-8")
+    # Hash the content rather than using the version alone, so ETags stay valid
+    # across uvicorn workers whose version counters differ
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    if cache.generation("portfolio") == generation:
+        # Not raced by a write, so the ETag describes the current sources
+        portfolio_validator.update(
+            etag=etag, generation=generation, expires_at=time.monotonic() + PORTFOLIO_VALIDATOR_SECONDS
+        )
+    return {"body": EncodedBody(body), "etag": etag}
+
+def current_portfolio_etag() -> Optional[str]:
+    """ETag of the current snapshot if known without loading it, else None"""
+    if (
+        portfolio_validator["generation"] == cache.generation("portfolio")
+        and portfolio_validator["expires_at"] > time.monotonic()
+    ):
+        return portfolio_validator["etag"]
+    return None
+
+@app.get("/api/portfolio")
+async def get_portfolio(request: Request, if_none_match: Annotated[str | None, Header()] = None):
+    """Get every public portfolio section in one response (supports If-None-Match)"""
+    # Revalidation of an unchanged snapshot: answer before touching the cache or MongoDB
+    etag = current_portfolio_etag()
+    if etag is not None and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"})
+
+    require_database()
+    try:
+        snapshot = await cache.get_or_load("portfolio", build_portfolio_snapshot)
+    except Exception as e:
+        logger.error(f"Error building portfolio snapshot: {e}")
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    headers = {"ETag": snapshot["etag"], "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(if_none_match, snapshot["etag"]):
+        return Response(status_code=304, headers=headers)
+    return await snapshot["body"].response(request.headers.get("accept-encoding"), headers=headers)
+
+# ==================== STATIC EXPORT ====================
+async def load_published_posts():
+    """
+    Load published blog posts with their rendered content, rendering any that lack it
+
+    View counts are left out: the exported files are a snapshot, and the counter would
+    otherwise change every post's data file on every export.
+    """
+    blogs = await blogs_collection.find({"status": "published"}, {"_id": 0, "views": 0}).sort(
+        [("created_at", -1), ("id", -1)]
+    ).to_list(length=None)
+    for blog in blogs:
+        if not markdown_renderer.is_current(blog):
+            blog.update(await markdown_renderer.render(blog.get("content") or ""))
+    return blogs
+
+async def load_static_sources():
+    """Load every public document the static export renders"""
+    (profile, experience, education, skills, ventures, achievements,
+     whitepapers, theme, visibility, blogs) = await asyncio.gather(
+        cache.get_or_load("profile", load_profile),
+        cache.get_or_load("experience", lambda: load_collection(experience_collection)),
+        cache.get_or_load("education", lambda: load_collection(education_collection)),
+        cache.get_or_load("skills", lambda: load_collection(skills_collection)),
+        cache.get_or_load("ventures", lambda: load_collection(ventures_collection)),
+        cache.get_or_load("achievements", load_achievements),
+        cache.get_or_load("whitepapers", lambda: load_collection(whitepapers_collection)),
+        cache.get_or_load("theme", load_theme),
+        cache.get_or_load("section_visibility", load_section_visibility),
+        load_published_posts()
+    )
+    return {
+        "profile": profile,
+        "experience": experience,
+        "education": education,
+        "skills": skills,
+        "ventures": ventures,
+        "achievements": achievements,
+        "whitepapers": whitepapers,
+        "theme": theme,
+        "sections": visibility["sections"],
+        "blogs": blogs
+    }
+
+@app.post("/api/admin/export-static")
+async def export_static_site(force: bool = False, _: bool = Depends(verify_admin_auth)):
+    """
+    Write the public site as static files for a CDN or nginx (Admin only)
+    
+    Only pages whose source documents changed since the last export are rendered;
+    force=true re-renders everything
+    """
+    require_database()
+    try:
+        return await export_site(await load_static_sources(), force=force)
+    except Exception as e:
+        logger.error(f"Static export failed: {e}")
+        raise HTTPException(status_code=500, detail=f"Static export failed: {str(e)}")
+
 # ==================== MEMORY ENDPOINTS ====================
 @app.get("/api/memories")
 async def get_memories(user_id: str = "anonymous", limit: Optional[int] = None):
@@ -2191,10 +2529,10 @@ async def get_memories(user_id: str = "anonymous", limit: Optional[int] = None):
         
         if limit:
             # Search with limit
-            memories = mem0_service.search_memories("", user_id, limit)
+            memories = await run_in_threadpool(mem0_service.search_memories, "", user_id, limit)
         else:
             # Get all memories
-            memories = mem0_service.get_all_memories(user_id)
+            memories = await run_in_threadpool(mem0_service.get_all_memories, user_id)
         
         return {
             "success": True,
@@ -2223,7 +2561,7 @@ async def search_memories(data: dict = Body(...)):
                 "results": []
             }
         
-        results = mem0_service.search_memories(query, user_id, limit)
+        results = await run_in_threadpool(mem0_service.search_memories, query, user_id, limit)
         
         return {
             "success": True,
@@ -2244,7 +2582,7 @@ async def delete_memory(memory_id: str):
         if not mem0_service.is_available():
             raise HTTPException(status_code=503, detail="Memory service not available")
         
-        success = mem0_service.delete_memory(memory_id)
+        success = await run_in_threadpool(mem0_service.delete_memory, memory_id)
         
         if success:
             return {"success": True, "message": "Memory deleted"}
@@ -2266,7 +2604,7 @@ async def delete_all_user_memories(user_id: str):
         if not mem0_service.is_available():
             raise HTTPException(status_code=503, detail="Memory service not available")
         
-        success = mem0_service.delete_all_memories(user_id)
+        success = await run_in_threadpool(mem0_service.delete_all_memories, user_id)
         
         if success:
             return {"success": True, "message": f"All memories deleted for user {user_id}"}
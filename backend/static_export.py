@@ -0,0 +1,365 @@
+"""
+Static Export - Prerenders the public portfolio to static JSON and HTML files
+JSON data files get content-hashed names and can be cached forever; HTML pages keep
+stable paths. manifest.json records the source fingerprint of every page so a rerun
+only renders pages whose source documents changed.
+
+Usage:
+    python static_export.py [--output DIR]
+"""
+
+import os
+import re
+import sys
+import json
+import html
+import asyncio
+import hashlib
+import logging
+import argparse
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = os.getenv(
+    'STATIC_EXPORT_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static_export')
+)
+MANIFEST_NAME = "manifest.json"
+SAFE_SLUG = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]*$")
+SAFE_COLOR = re.compile(r"^[#A-Za-z0-9(),.% ]+$")
+
+# Portfolio sections rendered on the home page, by section_visibility name
+SECTION_TITLES = {
+    "ventures": "Ventures",
+    "experience": "Experience",
+    "education": "Education",
+    "achievements": "Achievements",
+    "blog": "Blog"
+}
+
+
+def to_json_bytes(value: Any) -> bytes:
+    """Serialize a value deterministically"""
+    return json.dumps(value, default=str, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def fingerprint(value: Any) -> str:
+    """Hash the source documents of a page"""
+    return hashlib.sha256(to_json_bytes(value)).hexdigest()[:16]
+
+
+def hashed_name(stem: str, body: bytes, extension: str) -> str:
+    """Build a content-hashed file name such as data/portfolio.3f2a9c1b0d4e.json"""
+    return f"{stem}.{hashlib.sha256(body).hexdigest()[:12]}.{extension}"
+
+
+def _text(value: Any) -> str:
+    return html.escape(str(value)) if value else ""
+
+
+def _list_items(items: List[str]) -> str:
+    return "<ul>" + "".join(f"<li>{_text(item)}</li>" for item in items if item) + "</ul>" if items else ""
+
+
+def html_document(title: str, description: str, body: str, theme: Dict[str, Any]) -> bytes:
+    """Wrap a page body in a minimal themed HTML document"""
+    theme = theme or {}
+
+    def color(name: str, default: str) -> str:
+        value = str(theme.get(name) or default)
+        return value if SAFE_COLOR.match(value) else default
+
+    style = (
+        f"body{{margin:0 auto;max-width:52rem;padding:2rem;font-family:system-ui,sans-serif;"
+        f"background:{color('background_color', '#000000')};color:{color('text_color', '#ffffff')}}}"
+        f"h1,h2,h3{{color:{color('header_color', '#ef4444')}}}"
+        f"a{{color:{color('primary_color', '#ef4444')}}}"
+        f".muted{{color:{color('muted_text_color', '#9ca3af')}}}"
+    )
+    document = (
+        "<!DOCTYPE html>\n"
+        "<html lang=\"en\"><head><meta charset=\"utf-8\">"
+        "<meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">"
+        f"<title>{_text(title)}</title>"
+        f"<meta name=\"description\" content=\"{_text(description)}\">"
+        f"<style>{style}</style></head>"
+        f"<body>{body}</body></html>\n"
+    )
+    return document.encode("utf-8")
+
+
+def render_section(name: str, sources: Dict[str, Any]) -> str:
+    """Render one home page section as HTML ("" when it has no content)"""
+    if name == "experience":
+        items = [
+            f"<h3>{_text(exp.get('role'))} &middot; {_text(exp.get('company'))}</h3>"
+            f"<p class=\"muted\">{_text(exp.get('period'))} {_text(exp.get('location'))}</p>"
+            f"{_list_items(exp.get('description') or [])}"
+            for exp in sources["experience"]
+        ]
+        skills = [
+            f"<h3>{_text(category.get('category'))}</h3>"
+            f"<p>{_text(', '.join(skill.get('name', '') for skill in category.get('skills') or []))}</p>"
+            for category in sources["skills"]
+        ]
+        if skills:
+            items.append("<h2>Skills</h2>" + "".join(skills))
+    elif name == "education":
+        items = [
+            f"<h3>{_text(edu.get('degree'))} &middot; {_text(edu.get('institution'))}</h3>"
+            f"<p class=\"muted\">{_text(edu.get('period'))} {_text(edu.get('field'))}</p>"
+            f"{_list_items(edu.get('details') or [])}"
+            for edu in sources["education"]
+        ]
+    elif name == "ventures":
+        items = [
+            f"<h3>{_text(venture.get('name'))} &middot; {_text(venture.get('role'))}</h3>"
+            f"<p>{_text(venture.get('description'))}</p>{_list_items(venture.get('achievements') or [])}"
+            for venture in sources["ventures"]
+        ]
+    elif name == "achievements":
+        achievements = sources["achievements"] or {}
+        items = [
+            f"<h3>{_text(cert.get('name'))}</h3><p class=\"muted\">{_text(cert.get('issuer'))} {_text(cert.get('year'))}</p>"
+            for cert in achievements.get("certificates") or []
+        ] + [
+            f"<h3>{_text(hackathon.get('event'))}</h3><p>{_text(hackathon.get('description'))}</p>"
+            for hackathon in achievements.get("hackathons") or []
+        ]
+    elif name == "blog":
+        items = [blog_list_html(sources["blogs"])] if sources["blogs"] else []
+    else:
+        items = []
+
+    if not items:
+        return ""
+    return f"<section id=\"{name}\"><h2>{SECTION_TITLES[name]}</h2>{''.join(items)}</section>"
+
+
+def blog_list_html(blogs: List[Dict[str, Any]]) -> str:
+    """Render links to every published post"""
+    return "<ul>" + "".join(
+        f"<li><a href=\"/blog/{html.escape(blog['slug'])}/\">{_text(blog.get('title'))}</a>"
+        f"<p class=\"muted\">{_text(blog.get('excerpt'))}</p></li>"
+        for blog in blogs
+    ) + "</ul>"
+
+
+def blog_summary(blog: Dict[str, Any]) -> Dict[str, Any]:
+    """Listing fields of a post (the body is only in the post's own page)"""
+    return {key: blog.get(key) for key in (
+        "id", "slug", "title", "excerpt", "tags", "category", "featured_image",
+        "reading_time", "published_date", "created_at"
+    )}
+
+
+def post_page(blog: Dict[str, Any]) -> Dict[str, Any]:
+    """Fields of a post its HTML page is rendered from (and fingerprinted by)"""
+    return {key: blog.get(key) for key in (
+        "slug", "title", "excerpt", "seo_title", "seo_description", "content_html",
+        "reading_time", "published_date", "created_at"
+    )}
+
+
+def plan_pages(sources: Dict[str, Any]) -> Dict[str, Tuple[Any, Callable[[Any], Tuple[str, bytes]]]]:
+    """
+    Describe every page of the site
+
+    Returns:
+        page key -> (source documents, renderer returning (relative path, bytes))
+    """
+    # Slugs become file paths, so only plain ones are exported
+    blogs = [blog for blog in sources["blogs"] if SAFE_SLUG.match(blog.get("slug") or "")]
+    listing = [blog_summary(blog) for blog in blogs]
+    portfolio = {
+        "profile": sources["profile"],
+        "experience": sources["experience"],
+        "education": sources["education"],
+        "skills": sources["skills"],
+        "ventures": sources["ventures"],
+        "achievements": sources["achievements"],
+        "theme": sources["theme"],
+        "sections": sources["sections"],
+        "blogs": listing
+    }
+    home = {**portfolio, "whitepapers": sources["whitepapers"]}
+
+    def render_json(stem):
+        def render(source):
+            body = to_json_bytes(source)
+            return hashed_name(stem, body, "json"), body
+        return render
+
+    def render_home(source):
+        profile = source["profile"] or {}
+        visible = sorted(
+            (s for s in source["sections"] if s.get("is_visible", True)),
+            key=lambda s: s.get("display_order", 0)
+        )
+        body = (
+            f"<header><h1>{_text(profile.get('name'))}</h1><p>{_text(profile.get('title'))}</p>"
+            f"<p class=\"muted\">{_text(profile.get('location'))}</p><p>{_text(profile.get('summary'))}</p></header>"
+        )
+        for section in visible:
+            if section.get("section_name") in SECTION_TITLES:
+                body += render_section(section["section_name"], {**source, "blogs": listing})
+        if source["whitepapers"]:
+            body += "<section id=\"whitepapers\"><h2>White Papers</h2>" + "".join(
+                f"<h3>{_text(paper.get('title'))}</h3><p>{_text(paper.get('briefDescription'))}</p>"
+                for paper in source["whitepapers"]
+            ) + "</section>"
+        title = " - ".join(filter(None, [profile.get("name"), profile.get("title")])) or "Portfolio"
+        return "index.html", html_document(title, profile.get("summary") or "", body, source["theme"])
+
+    def render_blog_index(source):
+        body = f"<h1>Blog</h1>{blog_list_html(source['blogs'])}"
+        return "blog/index.html", html_document("Blog", "Published blog posts", body, source["theme"])
+
+    def render_post(source):
+        post = source["post"]
+        body = (
+            f"<article><h1>{_text(post.get('title'))}</h1>"
+            f"<p class=\"muted\">{_text(post.get('published_date') or post.get('created_at'))}"
+            f"{' &middot; ' + str(post['reading_time']) + ' min read' if post.get('reading_time') else ''}</p>"
+            f"{post.get('content_html') or ''}</article>"
+            "<p><a href=\"/blog/\">All posts</a></p>"
+        )
+        description = post.get("seo_description") or post.get("excerpt") or ""
+        title = post.get("seo_title") or post.get("title") or "Blog"
+        return f"blog/{post['slug']}/index.html", html_document(title, description, body, source["theme"])
+
+    pages = {
+        "data/portfolio": (portfolio, render_json("data/portfolio")),
+        "data/whitepapers": (sources["whitepapers"], render_json("data/whitepapers")),
+        "html/index": (home, render_home),
+        "html/blog": ({"blogs": listing, "theme": sources["theme"]}, render_blog_index),
+    }
+    for blog in blogs:
+        slug = blog["slug"]
+        pages[f"data/blog/{slug}"] = (blog, render_json(f"data/blog/{slug}"))
+        pages[f"html/blog/{slug}"] = ({"post": post_page(blog), "theme": sources["theme"]}, render_post)
+    return pages
+
+
+def _write_atomic(path: str, body: bytes) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # A unique name per write, so concurrent exports never write to the same temporary file
+    f = tempfile.NamedTemporaryFile(dir=directory, prefix=".tmp-", delete=False)
+    try:
+        with f:
+            f.write(body)
+        # Temporary files are private; exported files are served by a web server
+        os.chmod(f.name, 0o644)
+        os.replace(f.name, path)
+    except BaseException:
+        os.remove(f.name)
+        raise
+
+
+def _remove(output_dir: str, relative_path: str) -> None:
+    """Delete an exported file and any directories it leaves empty"""
+    try:
+        os.remove(os.path.join(output_dir, relative_path))
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(relative_path)
+    while directory:
+        path = os.path.join(output_dir, directory)
+        if not os.path.isdir(path) or os.listdir(path):
+            break
+        os.rmdir(path)
+        directory = os.path.dirname(directory)
+
+
+def write_site(sources: Dict[str, Any], output_dir: str = DEFAULT_OUTPUT_DIR, force: bool = False) -> Dict[str, Any]:
+    """
+    Render and write the pages whose sources changed since the last export
+
+    Args:
+        sources: Public content (see load_static_sources in server.py)
+        output_dir: Directory to write the site to
+        force: Render every page even if unchanged
+
+    Returns:
+        Report of written, unchanged and removed files
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    previous: Dict[str, Dict[str, str]] = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path, "r") as f:
+            previous = json.load(f).get("pages", {})
+
+    pages: Dict[str, Dict[str, str]] = {}
+    written, unchanged, obsolete = [], 0, []
+    for key, (source, render) in plan_pages(sources).items():
+        source_hash = fingerprint(source)
+        entry = previous.get(key)
+        if entry and entry["source"] == source_hash and os.path.exists(os.path.join(output_dir, entry["file"])):
+            pages[key] = entry
+            unchanged += 1
+            continue
+
+        relative_path, body = render(source)
+        _write_atomic(os.path.join(output_dir, relative_path), body)
+        pages[key] = {"source": source_hash, "file": relative_path}
+        written.append(relative_path)
+        if entry and entry["file"] != relative_path:
+            obsolete.append(entry["file"])
+
+    obsolete.extend(entry["file"] for key, entry in previous.items() if key not in pages)
+    kept = {entry["file"] for entry in pages.values()}
+
+    # The manifest goes last so a crash mid-export never points at missing files
+    _write_atomic(manifest_path, json.dumps({
+        "generated_at": datetime.utcnow().isoformat(),
+        "pages": pages
+    }, indent=2, sort_keys=True).encode("utf-8"))
+
+    removed = []
+    for relative_path in obsolete:
+        if relative_path not in kept:
+            _remove(output_dir, relative_path)
+            removed.append(relative_path)
+
+    logger.info(f"Static export: {len(written)} written, {unchanged} unchanged, {len(removed)} removed")
+    return {
+        "output_dir": output_dir,
+        "written": written,
+        "unchanged": unchanged,
+        "removed": removed,
+        "files": {key: entry["file"] for key, entry in sorted(pages.items())}
+    }
+
+
+async def export_site(sources: Dict[str, Any], output_dir: str = DEFAULT_OUTPUT_DIR, force: bool = False) -> Dict[str, Any]:
+    """Run write_site in a worker thread so file IO does not block the event loop"""
+    return await asyncio.to_thread(write_site, sources, output_dir, force)
+
+
+async def _main(output_dir: str, force: bool) -> int:
+    # Imported here: server.py imports this module for the admin endpoint
+    from database import connect_to_mongo, close_mongo_connection, is_mongodb_available
+    from server import load_static_sources
+
+    await connect_to_mongo()
+    try:
+        if not is_mongodb_available():
+            logger.error("MongoDB not available - nothing exported")
+            return 1
+        report = await export_site(await load_static_sources(), output_dir, force)
+        print(json.dumps({key: report[key] for key in ("output_dir", "written", "unchanged", "removed")}, indent=2))
+        return 0
+    finally:
+        close_mongo_connection()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the public portfolio as static files")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="Output directory")
+    parser.add_argument("--force", action="store_true", help="Re-render every page")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(_main(args.output, args.force)))
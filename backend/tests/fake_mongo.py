@@ -0,0 +1,161 @@
+"""In-memory stand-in for the subset of the Motor collection API the services use"""
+
+import copy
+from types import SimpleNamespace
+
+from pymongo import ReturnDocument
+
+_MISSING = object()
+
+
+def _matches_condition(value, condition):
+    if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+        for operator, operand in condition.items():
+            if operator == "$in":
+                ok = value in operand
+            elif operator == "$ne":
+                ok = value != operand
+            elif operator == "$exists":
+                ok = (value is not _MISSING) == operand
+            elif value is _MISSING or value is None:
+                ok = False
+            elif operator == "$lt":
+                ok = value < operand
+            elif operator == "$lte":
+                ok = value <= operand
+            elif operator == "$gt":
+                ok = value > operand
+            elif operator == "$gte":
+                ok = value >= operand
+            else:
+                raise NotImplementedError(operator)
+            if not ok:
+                return False
+        return True
+    if value is _MISSING:
+        return condition is None
+    return value == condition
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, sub) for sub in condition):
+                return False
+        elif not _matches_condition(doc.get(key, _MISSING), condition):
+            return False
+    return True
+
+
+def _parent(doc, path):
+    """The dict holding the last part of a dotted path, and that part"""
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    return doc, last
+
+
+def _apply(doc, update, inserting=False):
+    for key, value in update.get("$set", {}).items():
+        parent, last = _parent(doc, key)
+        parent[last] = copy.deepcopy(value)
+    for key in update.get("$unset", {}):
+        parent, last = _parent(doc, key)
+        parent.pop(last, None)
+    for key, value in update.get("$inc", {}).items():
+        parent, last = _parent(doc, key)
+        parent[last] = parent.get(last, 0) + value
+    if inserting:
+        for key, value in update.get("$setOnInsert", {}).items():
+            parent, last = _parent(doc, key)
+            parent[last] = copy.deepcopy(value)
+
+
+def _project(doc, projection):
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    # Dotted inclusions return the whole top-level field
+    included = [key.split(".")[0] for key, value in projection.items() if value and key != "_id"]
+    if included:
+        doc = {key: doc[key] for key in included if key in doc}
+    for key, value in projection.items():
+        if not value:
+            doc.pop(key, None)
+    return doc
+
+
+def _sorted(docs, sort):
+    for key, direction in reversed(sort or []):
+        docs = sorted(docs, key=lambda doc: doc.get(key), reverse=direction < 0)
+    return docs
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self._docs = docs
+
+    def sort(self, key, direction=1):
+        self._docs = _sorted(self._docs, key if isinstance(key, list) else [(key, direction)])
+        return self
+
+    async def to_list(self, length=None):
+        return self._docs[:length] if length else list(self._docs)
+
+    async def __aiter__(self):
+        for doc in self._docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, docs=()):
+        self.docs = [copy.deepcopy(doc) for doc in docs]
+
+    def _find(self, query, sort=None):
+        return _sorted([doc for doc in self.docs if matches(doc, query)], sort)
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([_project(doc, projection) for doc in self._find(query or {})])
+
+    async def find_one(self, query=None, projection=None, sort=None):
+        found = self._find(query or {}, sort)
+        return _project(found[0], projection) if found else None
+
+    async def insert_one(self, doc):
+        self.docs.append(copy.deepcopy(doc))
+
+    async def bulk_write(self, operations, ordered=True):
+        # UpdateOne keeps its arguments in private attributes
+        for operation in operations:
+            await self.update_one(operation._filter, operation._doc, upsert=operation._upsert)
+
+    async def update_one(self, query, update, upsert=False):
+        found = self._find(query)
+        if found:
+            _apply(found[0], update)
+            return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            doc = {key: value for key, value in query.items() if not key.startswith("$")}
+            _apply(doc, update, inserting=True)
+            self.docs.append(doc)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def update_many(self, query, update):
+        found = self._find(query)
+        for doc in found:
+            _apply(doc, update)
+        return SimpleNamespace(matched_count=len(found), modified_count=len(found))
+
+    async def find_one_and_update(self, query, update, sort=None, projection=None, return_document=ReturnDocument.BEFORE):
+        found = self._find(query, sort)
+        if not found:
+            return None
+        before = _project(found[0], projection)
+        _apply(found[0], update)
+        return _project(found[0], projection) if return_document == ReturnDocument.AFTER else before
+
+    async def delete_one(self, query):
+        found = self._find(query)
+        if found:
+            self.docs.remove(found[0])
+        return SimpleNamespace(deleted_count=len(found[:1]))
@@ -0,0 +1,116 @@
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+import analytics_service
+from analytics_service import AnalyticsService, bucket_start
+from fake_mongo import FakeCollection, FakeCursor
+
+
+class BucketsCollection(FakeCollection):
+    """Adds the rollup's counts-summing aggregation to the in-memory collection"""
+
+    def aggregate(self, pipeline):
+        totals = Counter()
+        for doc in self._find(pipeline[0]["$match"]):
+            totals.update(doc.get("counts", {}))
+        return FakeCursor([{"_id": field, "total": total} for field, total in totals.items()])
+
+
+class FailingCollection(FakeCollection):
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+
+    async def update_one(self, query, update, upsert=False):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("MongoDB unreachable")
+        return await super().update_one(query, update, upsert=upsert)
+
+
+@pytest.fixture(autouse=True)
+def mongodb_available(monkeypatch):
+    monkeypatch.setattr(analytics_service, "is_mongodb_available", lambda: True)
+
+
+def service(collection=None, buckets=None):
+    return AnalyticsService(collection or FakeCollection(), buckets or BucketsCollection(), max_pending=10**6)
+
+
+def test_bucket_start_truncates_to_granularity():
+    moment = datetime(2024, 5, 6, 7, 8, 9, 10)
+    assert bucket_start(moment, "minute") == datetime(2024, 5, 6, 7, 8)
+    assert bucket_start(moment, "hour") == datetime(2024, 5, 6, 7)
+    assert bucket_start(moment, "day") == datetime(2024, 5, 6)
+    with pytest.raises(ValueError):
+        bucket_start(moment, "week")
+
+
+def test_flush_writes_totals_and_minute_buckets_and_rollup_sums_them():
+    buckets = BucketsCollection()
+    analytics = service(buckets=buckets)
+    hour = bucket_start(datetime.utcnow(), "hour")
+    # Minute buckets written earlier in the hour (e.g. by another worker)
+    buckets.docs.append({"granularity": "minute", "bucket": hour, "counts": {"total_visits": 5}})
+
+    async def main():
+        for _ in range(3):
+            analytics.increment("total_visits")
+        analytics.increment("resume_downloads", 2)
+        assert await analytics.flush() == {"total_visits": 3, "resume_downloads": 2}
+        assert await analytics.rollup() == 1
+        return (
+            await analytics.timeseries("total_visits", "hour", hour, hour + timedelta(hours=1)),
+            await analytics.timeseries("resume_downloads", "day", bucket_start(hour, "day"), hour + timedelta(hours=1))
+        )
+
+    hourly, daily = asyncio.run(main())
+    totals = analytics.collection.docs[0]
+    assert (totals["total_visits"], totals["resume_downloads"]) == (3, 2)
+    assert hourly == [{"bucket": hour.isoformat(), "value": 8}]
+    assert daily[-1]["value"] == 2
+    assert analytics.pending() == {}
+
+
+def test_failed_flush_restores_the_batch_ahead_of_newer_increments():
+    collection = FailingCollection(failures=1)
+    analytics = service(collection=collection)
+
+    async def main():
+        analytics.increment("total_visits", 4)
+        assert await analytics.flush() == {}
+        assert analytics.pending() == {"total_visits": 4}
+
+        analytics.increment("total_visits")
+        return await analytics.flush()
+
+    assert asyncio.run(main()) == {"total_visits": 5}
+    assert collection.docs[0]["total_visits"] == 5
+    assert analytics.failed_flushes == 1
+    minute_counts = sum(doc["counts"]["total_visits"] for doc in analytics.buckets_collection.docs)
+    assert minute_counts == 5
+
+
+def test_failed_bucket_write_is_retried_without_counting_totals_twice():
+    class FailingBuckets(BucketsCollection):
+        failures = 1
+
+        async def bulk_write(self, operations, ordered=True):
+            if self.failures:
+                self.failures -= 1
+                raise ConnectionError("MongoDB unreachable")
+            return await super().bulk_write(operations, ordered)
+
+    analytics = service(buckets=FailingBuckets())
+
+    async def main():
+        analytics.increment("total_visits", 3)
+        await analytics.flush()
+        await analytics.flush()
+
+    asyncio.run(main())
+    assert analytics.collection.docs[0]["total_visits"] == 3
+    assert sum(doc["counts"]["total_visits"] for doc in analytics.buckets_collection.docs) == 3
@@ -0,0 +1,94 @@
+import asyncio
+
+import cache_service
+from cache_service import CacheService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_service.time, "monotonic", clock)
+    cache = CacheService(ttl_seconds=60, max_entries=10)
+
+    cache.set("blogs", ["post"])
+    clock.now += 59
+    assert cache.get("blogs") == ["post"]
+    clock.now += 2
+    assert cache.get("blogs") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = CacheService(ttl_seconds=60, max_entries=2)
+    cache.set("blogs", 1, "a")
+    cache.set("blogs", 2, "b")
+    cache.get("blogs", "a")
+    cache.set("blogs", 3, "c")
+
+    assert cache.get("blogs", "a") == 1
+    assert cache.get("blogs", "b") is None
+    assert cache.get("blogs", "c") == 3
+    assert cache.evictions == 1
+
+
+def test_concurrent_misses_load_once():
+    cache = CacheService(ttl_seconds=60, max_entries=10)
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"title": "post"}
+
+    async def main():
+        return await asyncio.gather(*(cache.get_or_load("blogs", loader, "slug") for _ in range(5)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(result == {"title": "post"} for result in results)
+    assert cache.misses == 1
+    assert cache.hits == 4
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    cache = CacheService(ttl_seconds=60, max_entries=10)
+
+    async def loader():
+        # An admin write lands while the old document is being read
+        cache.invalidate("blogs")
+        return "stale"
+
+    async def main():
+        return await cache.get_or_load("blogs", loader)
+
+    assert asyncio.run(main()) == "stale"
+    assert cache.get("blogs") is None
+
+
+def test_load_locks_are_dropped_when_unused():
+    cache = CacheService(ttl_seconds=60, max_entries=10)
+
+    async def missing():
+        await asyncio.sleep(0)
+        return None
+
+    async def failing():
+        raise RuntimeError("database down")
+
+    async def main():
+        await asyncio.gather(*(cache.get_or_load("blogs", missing, f"slug-{i}") for i in range(20)))
+        await asyncio.gather(*(cache.get_or_load("blogs", missing, "same") for _ in range(5)))
+        try:
+            await cache.get_or_load("blogs", failing, "broken")
+        except RuntimeError:
+            pass
+
+    asyncio.run(main())
+    assert cache._locks == {}
@@ -0,0 +1,58 @@
+import pytest
+
+from chat_cache_service import ChatCacheService
+
+SCOPE = ChatCacheService.scope_for("instructions")
+
+MUST_NOT_MATCH = [
+    ("What programming languages and frameworks does he use most often in his projects?",
+     "What programming languages and frameworks does he use least often in his projects?"),
+    ("What did he work on in 2020?", "What did he work on in 2021?"),
+    ("Is he available for freelance work?", "Is he not available for freelance work?"),
+    ("Where did he work before Google?", "When did he work before Google?"),
+    ("What does he do now?", "What did he do now?"),
+    ("Does he know Python?", "Does he know Python well?"),
+]
+
+MUST_MATCH = [
+    ("What projects has he built with React?", "what projects has he built with react"),
+    ("What projects has he built with React?", "With React, what projects has he built?"),
+    ("What is his current role?", "Can you please tell me what is his current role?"),
+]
+
+
+@pytest.mark.parametrize("cached, asked", MUST_NOT_MATCH)
+def test_different_questions_miss(cached, asked):
+    cache = ChatCacheService()
+    cache.put(cached, SCOPE, "answer")
+
+    assert cache.get(asked, SCOPE) is None
+    assert cache.get(cached, SCOPE) == "answer"
+
+
+@pytest.mark.parametrize("cached, asked", MUST_MATCH)
+def test_rewordings_hit(cached, asked):
+    cache = ChatCacheService()
+    cache.put(cached, SCOPE, "answer")
+
+    assert cache.get(asked, SCOPE) == "answer"
+
+
+def test_scope_separates_answers():
+    cache = ChatCacheService()
+    cache.put("What is his current role?", SCOPE, "answer")
+
+    assert cache.get("What is his current role?", ChatCacheService.scope_for("edited")) is None
+
+
+def test_least_recently_used_answer_is_evicted():
+    cache = ChatCacheService(max_entries=2)
+    cache.put("first question", SCOPE, "1")
+    cache.put("second question", SCOPE, "2")
+    cache.get("first question", SCOPE)
+    cache.put("third question", SCOPE, "3")
+
+    assert cache.get("second question", SCOPE) is None
+    assert cache.get("question second", SCOPE) is None
+    assert cache.get("first question", SCOPE) == "1"
+    assert cache.evictions == 1
@@ -0,0 +1,48 @@
+import pytest
+
+from hyperloglog import HyperLogLog
+
+
+def sketch_of(keys):
+    sketch = HyperLogLog()
+    for key in keys:
+        sketch.add(key)
+    return sketch
+
+
+@pytest.mark.parametrize("distinct", [10, 1000, 50000])
+def test_estimate_is_within_a_few_standard_errors(distinct):
+    sketch = sketch_of(f"visitor-{n}" for n in range(distinct))
+
+    # ~1.6% standard error at the default precision; allow 5%
+    assert abs(sketch.count() - distinct) <= max(1, 0.05 * distinct)
+
+
+def test_repeat_visits_are_not_counted_again():
+    sketch = sketch_of(f"visitor-{n}" for n in range(500))
+
+    assert not any(sketch.add(f"visitor-{n}") for n in range(500))
+    assert sketch.count() == sketch_of(f"visitor-{n}" for n in range(500)).count()
+
+
+def test_merge_counts_the_union():
+    monday = sketch_of(f"visitor-{n}" for n in range(0, 6000))
+    tuesday = sketch_of(f"visitor-{n}" for n in range(4000, 10000))
+
+    union = HyperLogLog().merge(monday).merge(tuesday)
+    assert abs(union.count() - 10000) <= 500
+    assert union.registers == sketch_of(f"visitor-{n}" for n in range(10000)).registers
+
+
+def test_serialized_sketch_round_trips():
+    sketch = sketch_of(f"visitor-{n}" for n in range(300))
+
+    restored = HyperLogLog(registers=sketch.to_bytes())
+    assert restored.count() == sketch.count()
+    with pytest.raises(ValueError):
+        HyperLogLog(registers=b"\x00" * 10)
+
+
+def test_merge_rejects_different_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=12).merge(HyperLogLog(precision=10))
@@ -0,0 +1,110 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+import job_queue
+from fake_mongo import FakeCollection
+from job_queue import DONE, FAILED, PENDING, JobQueue
+
+
+@pytest.fixture(autouse=True)
+def mongodb_available(monkeypatch):
+    monkeypatch.setattr(job_queue, "is_mongodb_available", lambda: True)
+
+
+def expire_lease(collection, job_id):
+    next(doc for doc in collection.docs if doc["id"] == job_id)["lease_expires"] = datetime(2000, 1, 1)
+
+
+def test_due_jobs_are_claimed_once_in_run_order():
+    collection = FakeCollection()
+    queue = JobQueue(collection, owner="worker-1")
+    other = JobQueue(collection, owner="worker-2")
+
+    async def main():
+        now = datetime.utcnow()
+        await queue.enqueue("task", {"n": 2}, run_at=now - timedelta(seconds=1), job_id="second")
+        await queue.enqueue("task", {"n": 1}, run_at=now - timedelta(seconds=2), job_id="first")
+        await queue.enqueue("task", {"n": 3}, run_at=now + timedelta(hours=1), job_id="later")
+        first = await queue.claim("task")
+        second = await other.claim("task")
+        return first, second, await queue.claim("task")
+
+    first, second, nothing = asyncio.run(main())
+    assert (first["id"], first["lease_owner"], first["attempts"]) == ("first", "worker-1", 1)
+    assert (second["id"], second["lease_owner"]) == ("second", "worker-2")
+    assert nothing is None
+
+
+def test_expired_lease_is_taken_over_and_old_owner_is_fenced_out():
+    collection = FakeCollection()
+    stalled = JobQueue(collection, owner="stalled")
+    healthy = JobQueue(collection, owner="healthy")
+
+    async def main():
+        await stalled.enqueue("task", {}, job_id="job")
+        stale_job = await stalled.claim("task")
+        assert await healthy.claim("task") is None
+
+        expire_lease(collection, "job")
+        job = await healthy.claim("task")
+        assert job["attempts"] == 2
+
+        # The stalled worker wakes up: none of its writes may land
+        assert not await stalled.renew(stale_job, progress="late")
+        assert not await stalled.complete(stale_job, result="late")
+        assert not await stalled.fail(stale_job, "late", retry_in=1)
+
+        assert await healthy.renew(job, progress="half")
+        assert await healthy.complete(job, result="ok")
+        return await healthy.get("job")
+
+    job = asyncio.run(main())
+    assert (job["status"], job["result"], job["progress"]) == (DONE, "ok", "half")
+    assert "lease_owner" not in job
+
+
+def test_cancelled_job_cannot_be_completed():
+    queue = JobQueue(FakeCollection(), owner="worker-1")
+
+    async def main():
+        await queue.enqueue("task", {}, job_id="job")
+        job = await queue.claim("task")
+        assert await queue.cancel("job")
+        return await queue.complete(job)
+
+    assert asyncio.run(main()) is False
+
+
+def test_failed_job_is_retried_until_attempts_run_out():
+    collection = FakeCollection()
+    queue = JobQueue(collection, owner="worker-1")
+
+    async def main():
+        await queue.enqueue("task", {}, job_id="job", max_attempts=2)
+        job = await queue.claim("task")
+        await queue.fail(job, "boom", retry_in=0)
+        assert (await queue.get("job"))["status"] == PENDING
+
+        job = await queue.claim("task")
+        await queue.fail(job, "boom again", retry_in=0)
+        return await queue.get("job")
+
+    job = asyncio.run(main())
+    assert (job["status"], job["error"], job["attempts"]) == (FAILED, "boom again", 2)
+
+
+def test_job_whose_worker_keeps_dying_is_failed():
+    collection = FakeCollection()
+    queue = JobQueue(collection, owner="worker-1")
+
+    async def main():
+        await queue.enqueue("task", {}, job_id="job", max_attempts=1)
+        await queue.claim("task")
+        expire_lease(collection, "job")
+        assert await queue.claim("task") is None
+        return await queue.get("job")
+
+    job = asyncio.run(main())
+    assert job["status"] == FAILED
@@ -0,0 +1,150 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from pdf_converter import CircuitBreaker, PdfConverterService
+
+PDF = b"%PDF-1.4\n%stub\n%%EOF\n"
+
+
+class StubConverter:
+    """In-process stand-in for pdf_converter/stub.js, served through httpx.MockTransport"""
+
+    def __init__(self):
+        self.status = 200
+        self.healthy = True
+        self.pdf_requests = []
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/health":
+            return httpx.Response(200 if self.healthy else 503, json={"status": "ok"})
+        self.pdf_requests.append(json.loads(request.read()))
+        if self.status != 200:
+            return httpx.Response(self.status, json={"error": "Stub converter failure"})
+        return httpx.Response(200, content=PDF, headers={"Content-Type": "application/pdf"})
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setenv("PDF_CONVERTER_URL", "http://converter.test/")
+    return StubConverter()
+
+
+def make_service(stub, **kwargs):
+    service = PdfConverterService(health_interval=0, **kwargs)
+    service._client = httpx.AsyncClient(transport=httpx.MockTransport(stub.handler))
+    return service
+
+
+def test_convert_streams_html_and_returns_pdf(stub):
+    async def run():
+        service = make_service(stub)
+        pdf = await service.convert(iter(["<h1>Jane</h1>", "<p>\"quoted\" é</p>"]))
+        assert pdf is not None
+        assert pdf.media_type == "application/pdf"
+        assert await pdf.read() == PDF
+        await service.stop()
+        return service
+
+    service = asyncio.run(run())
+    assert stub.pdf_requests == [{"html": "<h1>Jane</h1>\n<p>\"quoted\" é</p>"}]
+    assert service.stats()["conversions"] == 1
+    assert service.breaker.state == CircuitBreaker.CLOSED
+
+
+def test_server_error_falls_back_without_pdf(stub):
+    stub.status = 500
+
+    async def run():
+        service = make_service(stub, failure_threshold=3)
+        assert await service.convert(iter(["<p>x</p>"])) is None
+        return service
+
+    service = asyncio.run(run())
+    assert service.breaker.state == CircuitBreaker.CLOSED
+    assert service.breaker.failures == 1
+
+
+def test_client_error_does_not_count_against_the_circuit(stub):
+    stub.status = 400
+
+    async def run():
+        service = make_service(stub, failure_threshold=1)
+        assert await service.convert(iter(["<p>x</p>"])) is None
+        return service
+
+    assert asyncio.run(run()).breaker.state == CircuitBreaker.CLOSED
+
+
+def test_open_circuit_short_circuits_without_calling_the_converter(stub):
+    stub.status = 503
+
+    async def run():
+        service = make_service(stub, failure_threshold=2, reset_seconds=60)
+        for _ in range(2):
+            assert await service.convert(iter(["<p>x</p>"])) is None
+        calls = len(stub.pdf_requests)
+        assert await service.convert(iter(["<p>x</p>"])) is None
+        assert len(stub.pdf_requests) == calls
+        return service
+
+    service = asyncio.run(run())
+    assert service.breaker.state == CircuitBreaker.OPEN
+    assert service.stats()["short_circuited"] == 1
+
+
+def test_half_open_trial_closes_the_circuit_on_success(stub):
+    stub.status = 503
+
+    async def run():
+        service = make_service(stub, failure_threshold=1, reset_seconds=0)
+        assert await service.convert(iter(["<p>x</p>"])) is None
+        assert service.breaker.state == CircuitBreaker.OPEN
+        stub.status = 200
+        pdf = await service.convert(iter(["<p>x</p>"]))
+        assert pdf is not None and await pdf.read() == PDF
+        return service
+
+    assert asyncio.run(run()).breaker.state == CircuitBreaker.CLOSED
+
+
+def test_health_probe_opens_and_closes_the_circuit(stub):
+    async def run():
+        service = make_service(stub)
+        stub.healthy = False
+        assert await service.probe() is False
+        assert service.breaker.state == CircuitBreaker.OPEN
+        assert await service.convert(iter(["<p>x</p>"])) is None
+        assert stub.pdf_requests == []
+        stub.healthy = True
+        assert await service.probe() is True
+        return service
+
+    assert asyncio.run(run()).breaker.state == CircuitBreaker.CLOSED
+
+
+def test_breaker_allows_a_single_half_open_trial():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=0)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_breaker_stays_open_until_the_reset_time():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    assert not breaker.allow()
+    assert breaker.state == CircuitBreaker.OPEN
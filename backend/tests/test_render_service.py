@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import pytest
+
+from render_service import RenderQueueFull, RenderService
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_timed_out_job_stays_in_flight_until_it_ends(workers):
+    service = RenderService(max_workers=workers, max_queue_depth=1, timeout=0.2)
+
+    async def main():
+        if workers:
+            # Start the worker process so the timeout does not count its startup
+            await service.run(time.sleep, 0)
+        with pytest.raises(TimeoutError):
+            await service.run(time.sleep, 1)
+        assert service.stats()["in_flight"] == 1
+        with pytest.raises(RenderQueueFull):
+            await service.run(time.sleep, 0)
+
+        for _ in range(100):
+            if service.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.05)
+        assert service.stats()["in_flight"] == 0
+        await service.run(time.sleep, 0)
+
+    try:
+        asyncio.run(main())
+    finally:
+        service.shutdown()
+    assert service.timeouts == 1
+    assert service.rejected == 1
+
+
+def test_completed_jobs_leave_nothing_in_flight():
+    service = RenderService(max_workers=0, max_queue_depth=4, timeout=5)
+
+    async def main():
+        return await asyncio.gather(*(service.run(pow, 2, n) for n in range(4)))
+
+    assert asyncio.run(main()) == [1, 2, 4, 8]
+    assert service.stats()["in_flight"] == 0
@@ -0,0 +1,81 @@
+import pytest
+
+from resume_layout import Item, Template, get_template, layout_resume, paginate, text_width, wrap_text
+
+# 100pt tall pages with 10pt margins: eight 10pt lines per page
+SMALL = Template("small", {}, page_size=(100, 100), margins=(10, 0, 10, 0))
+
+
+def line(text, keep_with_next=False):
+    return Item(text, "body", 0, 10, keep_with_next)
+
+
+def texts(pages):
+    return [[item.text for item, _ in page] for page in pages]
+
+
+def test_lines_fill_pages_top_down():
+    pages = paginate([line(str(n)) for n in range(10)], SMALL)
+
+    assert texts(pages) == [[str(n) for n in range(8)], ["8", "9"]]
+    assert [y for _, y in pages[0][:3]] == [90, 80, 70]
+    assert pages[1][0][1] == 90
+
+
+def test_heading_moves_to_the_next_page_with_its_first_lines():
+    items = [line(str(n)) for n in range(7)] + [line("heading", keep_with_next=True), line("first")]
+    pages = paginate(items, SMALL)
+
+    assert texts(pages) == [[str(n) for n in range(7)], ["heading", "first"]]
+
+
+def test_chain_that_fits_stays_on_the_page():
+    items = [line(str(n)) for n in range(6)] + [line("heading", keep_with_next=True), line("first")]
+
+    assert len(paginate(items, SMALL)) == 1
+
+
+def test_chain_taller_than_a_page_breaks_inside_it():
+    items = [line(str(n), keep_with_next=True) for n in range(9)] + [line("9")]
+    pages = paginate(items, SMALL)
+
+    assert [len(page) for page in pages] == [8, 2]
+
+
+def test_gap_at_the_top_of_a_page_is_dropped():
+    items = [line(str(n)) for n in range(8)] + [Item(None, None, 0, 30), line("next")]
+    pages = paginate(items, SMALL)
+
+    assert texts(pages)[1] == ["next"]
+    assert pages[1][0][1] == 90
+
+
+@pytest.fixture
+def reportlab():
+    return pytest.importorskip("reportlab")
+
+
+def test_wrapped_lines_fit_the_width(reportlab):
+    text = "Led the migration of a monolith to services " * 6 + "https://example.com/" + "x" * 120
+    lines = wrap_text(text, "Helvetica", 10, 200, hanging=8)
+
+    assert " ".join(lines).replace(" ", "") == text.replace(" ", "")
+    assert text_width(lines[0], "Helvetica", 10) <= 200
+    assert all(text_width(l, "Helvetica", 10) <= 192 for l in lines[1:])
+
+
+def test_entry_headers_never_end_a_page(reportlab):
+    experiences = [
+        {
+            "role": f"Engineer {n}", "company": "Acme", "period": "2020 - 2021", "location": "Remote",
+            "description": ["Built and operated distributed systems for payments and search " * 3] * 3
+        }
+        for n in range(12)
+    ]
+    template = get_template("classic")
+    pages = layout_resume({"name": "Jane", "title": "Engineer", "summary": "Summary"}, experiences, [], template)
+
+    assert len(pages) > 1
+    for page in pages[:-1]:
+        last, _ = page[-1]
+        assert not last.keep_with_next, last.text
@@ -0,0 +1,192 @@
+import asyncio
+
+import pytest
+
+from conditional import etag_matches
+from resume_service import RenderedResume, ResumeService, parse_range, resume_response, source_hash
+
+BODY = bytes(range(100))
+
+
+def rendered(digest="a" * 64, body=BODY, cacheable=True):
+    return RenderedResume(body, "application/pdf", "resume.pdf", digest, cacheable=cacheable)
+
+
+class TestParseRange:
+    def test_no_header_serves_whole_body(self):
+        assert parse_range(None, 100) is None
+
+    def test_closed_range(self):
+        assert parse_range("bytes=10-19", 100) == (10, 19)
+
+    def test_end_is_clamped_to_the_body(self):
+        assert parse_range("bytes=90-500", 100) == (90, 99)
+
+    def test_open_ended_range(self):
+        assert parse_range("bytes=40-", 100) == (40, 99)
+
+    def test_suffix_range(self):
+        assert parse_range("bytes=-10", 100) == (90, 99)
+
+    def test_suffix_longer_than_body(self):
+        assert parse_range("bytes=-500", 100) == (0, 99)
+
+    @pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200", "bytes=20-10", "bytes=-0"])
+    def test_unsatisfiable_ranges(self, header):
+        with pytest.raises(ValueError):
+            parse_range(header, 100)
+
+    @pytest.mark.parametrize("header", ["bytes=-5", "bytes=0-"])
+    def test_empty_body_is_unsatisfiable(self, header):
+        with pytest.raises(ValueError):
+            parse_range(header, 0)
+
+    @pytest.mark.parametrize("header", ["bytes=0-1,5-6", "items=0-5", "bytes=-", "bytes=a-5", "bytes=5-b"])
+    def test_unsupported_forms_serve_whole_body(self, header):
+        assert parse_range(header, 100) is None
+
+
+class TestResumeResponse:
+    def test_full_body_with_validators(self):
+        resume = rendered()
+        response = resume_response(resume, {})
+        assert response.status_code == 200
+        assert response.body == BODY
+        assert response.headers["etag"] == resume.etag
+        assert response.headers["accept-ranges"] == "bytes"
+
+    @pytest.mark.parametrize("header", ["{etag}", '"other", {etag}', "W/{etag}", "*"])
+    def test_if_none_match(self, header):
+        resume = rendered()
+        response = resume_response(resume, {"if-none-match": header.format(etag=resume.etag)})
+        assert response.status_code == 304
+
+    def test_if_none_match_is_not_a_substring_test(self):
+        resume = rendered()
+        partial = resume.etag[:10] + '"'
+        assert resume_response(resume, {"if-none-match": partial}).status_code == 200
+
+    def test_range(self):
+        response = resume_response(rendered(), {"range": "bytes=-10"})
+        assert response.status_code == 206
+        assert response.body == BODY[90:]
+        assert response.headers["content-range"] == "bytes 90-99/100"
+
+    def test_unsatisfiable_range(self):
+        response = resume_response(rendered(), {"range": "bytes=500-"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */100"
+
+    def test_empty_body_range_is_unsatisfiable(self):
+        response = resume_response(rendered(body=b""), {"range": "bytes=-5"})
+        assert response.status_code == 416
+        assert response.headers["content-range"] == "bytes */0"
+
+    def test_if_range_match_applies_the_range(self):
+        resume = rendered()
+        response = resume_response(resume, {"range": "bytes=0-9", "if-range": resume.etag})
+        assert response.status_code == 206
+
+    def test_if_range_mismatch_serves_whole_body(self):
+        response = resume_response(rendered(), {"range": "bytes=0-9", "if-range": '"stale"'})
+        assert response.status_code == 200
+        assert response.body == BODY
+
+    def test_if_range_never_matches_a_weak_etag(self):
+        resume = rendered(cacheable=False)
+        response = resume_response(resume, {"range": "bytes=0-9", "if-range": resume.etag})
+        assert response.status_code == 200
+
+
+def test_etag_matches():
+    assert etag_matches('"a", "b"', '"b"')
+    assert etag_matches('W/"b"', '"b"')
+    assert etag_matches('"b"', 'W/"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"ab"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_source_hash_depends_on_content_and_format():
+    sources = {"profile": {"name": "Jane"}, "experience": []}
+    reordered = {"experience": [], "profile": {"name": "Jane"}}
+    assert source_hash(sources, "reportlab:classic") == source_hash(reordered, "reportlab:classic")
+    assert source_hash(sources, "reportlab:classic") != source_hash(sources, "reportlab:ats")
+    assert source_hash(sources, "html") != source_hash({"profile": {"name": "John"}, "experience": []}, "html")
+
+
+class CountingRenderer:
+    def __init__(self, cacheable=True):
+        self.cacheable = cacheable
+        self.calls = 0
+
+    async def __call__(self, sources, digest):
+        self.calls += 1
+        await asyncio.sleep(0)
+        return RenderedResume(b"%PDF", "application/pdf", "resume.pdf", digest, cacheable=self.cacheable)
+
+
+def test_repeat_and_concurrent_requests_render_once():
+    service = ResumeService(max_entries=4)
+    render = CountingRenderer()
+    sources = {"profile": {"name": "Jane"}}
+
+    async def run():
+        first, second = await asyncio.gather(
+            service.get(sources, "html", render), service.get(sources, "html", render)
+        )
+        third = await service.get(sources, "html", render)
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert render.calls == 1
+    assert first is second is third
+    assert service.stats()["hits"] == 2
+
+
+def test_least_recently_used_render_is_evicted():
+    service = ResumeService(max_entries=2)
+    render = CountingRenderer()
+
+    async def run():
+        for name in ("a", "b"):
+            await service.get({"name": name}, "html", render)
+        await service.get({"name": "a"}, "html", render)   # a is now most recent
+        await service.get({"name": "c"}, "html", render)   # evicts b
+        assert render.calls == 3
+        await service.get({"name": "a"}, "html", render)
+        assert render.calls == 3
+        await service.get({"name": "b"}, "html", render)
+        assert render.calls == 4
+
+    asyncio.run(run())
+    assert service.stats()["entries"] == 2
+
+
+def test_uncacheable_renders_are_not_stored():
+    service = ResumeService()
+    render = CountingRenderer(cacheable=False)
+
+    async def run():
+        await service.get({"name": "a"}, "converter", render)
+        await service.get({"name": "a"}, "converter", render)
+
+    asyncio.run(run())
+    assert render.calls == 2
+    assert service.stats()["entries"] == 0
+
+
+def test_render_locks_are_dropped_even_when_rendering_fails():
+    service = ResumeService()
+    render = CountingRenderer()
+
+    async def failing(sources, digest):
+        raise RuntimeError("render failed")
+
+    async def run():
+        await asyncio.gather(*(service.get({"name": "a"}, "html", render) for _ in range(3)))
+        with pytest.raises(RuntimeError):
+            await service.get({"name": "b"}, "html", failing)
+
+    asyncio.run(run())
+    assert service._locks == {}
@@ -0,0 +1,78 @@
+from retrieval_service import BM25Index, RetrievalService, chunk_words, tokenize
+
+
+def test_tokenize_keeps_technical_terms_and_drops_stopwords():
+    assert tokenize("What is his experience with C++, C# and Node.js?") == [
+        "experience", "c++", "c#", "node.js"
+    ]
+
+
+def test_bm25_prefers_rarer_terms_and_shorter_documents():
+    index = BM25Index()
+    index.add("python", ["python", "backend", "services"])
+    index.add("python-long", ["python"] + ["filler"] * 50)
+    index.add("rust", ["rust", "backend", "services"])
+
+    ranked = [doc_id for doc_id, _ in index.search(["python", "backend"], 3)]
+    assert ranked[0] == "python"
+    assert set(ranked) == {"python", "python-long", "rust"}
+    assert index.idf("rust") > index.idf("python") > 0
+
+
+def test_bm25_remove_forgets_document_and_terms():
+    index = BM25Index()
+    index.add("a", ["kubernetes", "go"])
+    index.add("b", ["go"])
+    index.remove("a")
+
+    assert "a" not in index
+    assert index.scores(["kubernetes"]) == {}
+    assert index.vocabulary_size == 1
+
+
+def test_chunks_overlap():
+    words = [str(n) for n in range(25)]
+
+    chunks = chunk_words(words, size=10, overlap=2)
+    assert chunks[0].split()[-2:] == chunks[1].split()[:2]
+    assert chunks[-1].split()[-1] == "24"
+
+
+def test_sync_source_reindexes_only_changed_chunks():
+    retrieval = RetrievalService(top_k=2)
+    experience = [
+        {"id": "1", "role": "Engineer", "company": "Acme", "description": ["Built payment systems in Go"]},
+        {"id": "2", "role": "Lead", "company": "Initech", "description": ["Ran the data platform on Spark"]},
+    ]
+
+    assert retrieval.sync_source("experience", experience)
+    assert retrieval.reindexed_chunks == 2
+    assert retrieval.search("spark platform")[0]["label"] == "Experience: Lead at Initech"
+
+    # The same cached object is skipped without re-chunking
+    assert not retrieval.sync_source("experience", experience)
+
+    edited = [experience[0], {**experience[1], "description": ["Ran the data platform on Flink"]}]
+    fingerprint = retrieval.fingerprint
+    assert retrieval.sync_source("experience", edited)
+    assert retrieval.reindexed_chunks == 3
+    assert retrieval.fingerprint != fingerprint
+    assert retrieval.search("spark") == []
+    assert retrieval.search("flink")[0]["label"] == "Experience: Lead at Initech"
+
+    # An equal copy changes nothing
+    assert not retrieval.sync_source("experience", [dict(doc) for doc in edited])
+
+    assert retrieval.sync_source("experience", edited[:1])
+    assert retrieval.search("flink") == []
+    assert retrieval.stats()["chunks"] == 1
+
+
+def test_context_is_capped():
+    retrieval = RetrievalService(top_k=4, max_context_chars=120)
+    retrieval.sync_source("skills", [{"id": str(n), "category": f"Go {n}", "text": "go " * 30} for n in range(4)])
+
+    context = retrieval.context_for("go")
+    assert context.startswith("Relevant portfolio information:")
+    assert context.count("\n- [") == 1
+    assert retrieval.context_for("haskell") == ""
@@ -0,0 +1,95 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+import job_queue
+from fake_mongo import FakeCollection
+from job_queue import JobQueue
+from scheduler_service import SchedulerService
+
+DUE = "2020-01-01T09:00:00Z"
+
+
+class WorkerDied(BaseException):
+    """Stops a batch the way a killed process would: nothing after it runs"""
+
+
+@pytest.fixture(autouse=True)
+def mongodb_available(monkeypatch):
+    monkeypatch.setattr(job_queue, "is_mongodb_available", lambda: True)
+
+
+def scheduled(blog_id, **fields):
+    return {"id": blog_id, "title": blog_id, "status": "scheduled", "scheduled_date": DUE, **fields}
+
+
+def scheduler_for(jobs, blogs, owner):
+    scheduler = SchedulerService(JobQueue(jobs, owner=owner), blogs)
+    reported = []
+
+    async def on_published(posts):
+        reported.extend(post["id"] for post in posts)
+
+    scheduler.on_published = on_published
+    return scheduler, reported
+
+
+def test_due_posts_are_published_in_one_batch():
+    jobs = FakeCollection()
+    blogs = FakeCollection([scheduled("a"), scheduled("b"), scheduled("later", scheduled_date="2999-01-01T00:00:00")])
+    scheduler, reported = scheduler_for(jobs, blogs, "worker-1")
+
+    async def main():
+        for blog in blogs.docs:
+            await scheduler.sync_post(blog)
+        return await scheduler.run_due()
+
+    assert asyncio.run(main()) == 2
+    assert sorted(reported) == ["a", "b"]
+    statuses = {blog["id"]: blog["status"] for blog in blogs.docs}
+    assert statuses == {"a": "published", "b": "published", "later": "scheduled"}
+
+
+def test_post_edited_back_to_draft_is_not_published():
+    jobs = FakeCollection()
+    blogs = FakeCollection([scheduled("a")])
+    scheduler, reported = scheduler_for(jobs, blogs, "worker-1")
+
+    async def main():
+        await scheduler.sync_post(blogs.docs[0])
+        blogs.docs[0]["status"] = "draft"
+        return await scheduler.run_due()
+
+    assert asyncio.run(main()) == 0
+    assert reported == []
+    assert blogs.docs[0]["status"] == "draft"
+
+
+def test_callback_runs_after_worker_dies_between_publish_and_callback():
+    jobs = FakeCollection()
+    blogs = FakeCollection([scheduled("a")])
+    first, _ = scheduler_for(jobs, blogs, "worker-1")
+    second, reported = scheduler_for(jobs, blogs, "worker-2")
+
+    async def die(posts):
+        raise WorkerDied()
+
+    first.on_published = die
+
+    async def main():
+        await first.sync_post(blogs.docs[0])
+        with pytest.raises(WorkerDied):
+            await first.run_due()
+        published_date = blogs.docs[0]["published_date"]
+        assert blogs.docs[0]["status"] == "published"
+
+        # The dead worker's lease runs out
+        jobs.docs[0]["lease_expires"] = datetime(2000, 1, 1)
+        assert await second.run_due() == 1
+        return published_date
+
+    published_date = asyncio.run(main())
+    assert reported == ["a"]
+    assert blogs.docs[0]["published_date"] == published_date
+    assert jobs.docs[0]["status"] == job_queue.DONE
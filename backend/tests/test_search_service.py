@@ -0,0 +1,121 @@
+import asyncio
+
+import search_service
+from search_service import SearchService
+
+
+class FakeCursor:
+    def __init__(self, collection, docs):
+        self.collection = collection
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        if self.collection.gate is not None:
+            await self.collection.gate.wait()
+        self.collection.reads += 1
+        return list(self.docs)
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.gate = None
+        self.reads = 0
+
+    def find(self, query=None, projection=None):
+        return FakeCursor(self, self.docs)
+
+
+def blog(doc_id, title, content="", tags=None, status="published"):
+    return {"id": doc_id, "slug": doc_id, "title": title, "content": content, "tags": tags or [], "status": status}
+
+
+def use_collections(monkeypatch, blogs, papers=()):
+    blogs_collection = FakeCollection(list(blogs))
+    papers_collection = FakeCollection(list(papers))
+    monkeypatch.setattr(search_service, "blogs_collection", blogs_collection)
+    monkeypatch.setattr(search_service, "whitepapers_collection", papers_collection)
+    monkeypatch.setattr(search_service, "is_mongodb_available", lambda: True)
+    return blogs_collection
+
+
+def ids(result):
+    return [doc["id"] for doc in result["results"]]
+
+
+def test_title_matches_rank_above_body_matches():
+    index = SearchService()
+    index.upsert_blog(blog("body", "Notes", "a long post that mentions kubernetes once"))
+    index.upsert_blog(blog("title", "Kubernetes in production", "operations notes"))
+
+    assert ids(index.search("kubernetes")) == ["title", "body"]
+
+
+def test_prefix_expansion_and_filters():
+    index = SearchService()
+    index.upsert_blog(blog("a", "Kubernetes operators", tags=["devops"]))
+    index.upsert_blog(blog("b", "Kubernetes networking", tags=["networking"]))
+
+    assert sorted(ids(index.search("kube"))) == ["a", "b"]
+    assert ids(index.search("kube", prefix=False)) == []
+    assert ids(index.search("kubernetes", tag="devops")) == ["a"]
+
+
+def test_unpublished_posts_are_removed():
+    index = SearchService()
+    index.upsert_blog(blog("a", "Kubernetes"))
+    index.upsert_blog(blog("a", "Kubernetes", status="draft"))
+
+    assert index.search("kubernetes")["total"] == 0
+
+
+def test_writes_during_a_rebuild_are_kept(monkeypatch):
+    collection = use_collections(monkeypatch, [blog("old", "Stale post", "kubernetes")])
+    index = SearchService()
+
+    async def main():
+        collection.gate = asyncio.Event()
+        build = asyncio.create_task(index.build())
+        await asyncio.sleep(0)
+        # Admin writes land while the rebuild is reading MongoDB
+        index.upsert_blog(blog("new", "Fresh kubernetes post"))
+        index.remove("blog", "old")
+        collection.gate.set()
+        await build
+
+    asyncio.run(main())
+    assert ids(index.search("kubernetes")) == ["new"]
+
+
+def test_concurrent_queries_build_once(monkeypatch):
+    collection = use_collections(monkeypatch, [blog("a", "Kubernetes")])
+    index = SearchService()
+
+    async def main():
+        await asyncio.gather(*(index.ensure_fresh() for _ in range(5)))
+
+    asyncio.run(main())
+    assert collection.reads == 1
+    assert index.rebuilds == 1
+
+
+def test_stale_index_is_refreshed_in_the_background(monkeypatch):
+    collection = use_collections(monkeypatch, [blog("a", "Kubernetes")])
+    index = SearchService(refresh_seconds=60)
+
+    async def main():
+        await index.ensure_fresh()
+        collection.docs.append(blog("b", "Kubernetes networking"))
+        collection.gate = asyncio.Event()
+        index.mark_stale()
+
+        # The query is answered from the current index without waiting for MongoDB
+        await index.ensure_fresh()
+        assert ids(index.search("kubernetes")) == ["a"]
+
+        collection.gate.set()
+        await index._refresh_task
+
+    asyncio.run(main())
+    assert sorted(ids(index.search("kubernetes"))) == ["a", "b"]
+    assert index.rebuilds == 2
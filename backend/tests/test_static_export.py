@@ -0,0 +1,44 @@
+import os
+
+from static_export import write_site
+
+
+def sources(**post):
+    blog = {
+        "id": "1", "slug": "hello", "title": "Hello", "excerpt": "First post",
+        "content": "# Hello", "content_html": "<h1>Hello</h1>", "reading_time": 1,
+        "created_at": "2024-01-01", **post
+    }
+    return {
+        "profile": {"name": "Jane"}, "experience": [], "education": [], "skills": [],
+        "ventures": [], "achievements": {}, "whitepapers": [], "theme": {},
+        "sections": [{"section_name": "blog", "is_visible": True}], "blogs": [blog]
+    }
+
+
+def test_rerun_only_writes_changed_pages(tmp_path):
+    write_site(sources(), str(tmp_path))
+
+    report = write_site(sources(), str(tmp_path))
+    assert report["written"] == []
+
+    report = write_site(sources(content_html="<h1>Hello again</h1>"), str(tmp_path))
+    assert "blog/hello/index.html" in report["written"]
+    assert "index.html" not in report["written"]
+
+
+def test_fields_the_post_page_does_not_show_do_not_rewrite_it(tmp_path):
+    write_site(sources(), str(tmp_path))
+
+    report = write_site(sources(ai_generated=True), str(tmp_path))
+    assert "blog/hello/index.html" not in report["written"]
+
+
+def test_no_temporary_files_are_left_behind(tmp_path):
+    write_site(sources(), str(tmp_path))
+
+    leftovers = [
+        name for _, _, files in os.walk(tmp_path) for name in files if name.startswith(".tmp")
+    ]
+    assert leftovers == []
+    assert oct(os.stat(tmp_path / "index.html").st_mode & 0o777) == "0o644"
@@ -3929,6 +3929,7 @@ const BlogSection = ({ blogs, setBlogs, showMessage }) => {
   const [aiTone, setAiTone] = useState('professional');
   const [aiLength, setAiLength] = useState('medium');
   const [generatingAI, setGeneratingAI] = useState(false);
+  const [aiProgress, setAiProgress] = useState(null);
   const [viewMode, setViewMode] = useState('table');
   const [searchTerm, setSearchTerm] = useState('');
   const [filterStatus, setFilterStatus] = useState('all');
@@ -3949,7 +3950,8 @@ const BlogSection = ({ blogs, setBlogs, showMessage }) => {
   const loadBlogs = async () => {
     setLoading(true);
     try {
-      const data = await API.getBlogs();
+      // The editor is opened from these entries, so fetch complete posts
+      const data = await API.getBlogs(null, null, null, 'full');
       setBlogs(data || []);
     } catch (error) {
       console.error('Error loading blogs:', error);
@@ -3994,8 +3996,11 @@ const BlogSection = ({ blogs, setBlogs, showMessage }) => {
     }
 
     setGeneratingAI(true);
+    setAiProgress(null);
     try {
-      const generatedContent = await API.generateBlogWithAI(aiTopic, aiCategory, aiTone, aiLength);
+      const generatedContent = await API.generateBlogWithAI(
+        aiTopic, aiCategory, aiTone, aiLength, (job) => setAiProgress(job.progress)
+      );
       
       // Parse and structure the generated content properly
       const blogData = {
@@ -4038,6 +4043,7 @@ const BlogSection = ({ blogs, setBlogs, showMessage }) => {
     switch (status) {
       case 'published': return 'bg-green-100 text-green-800';
       case 'draft': return 'bg-yellow-100 text-yellow-800';
+      case 'scheduled': return 'bg-blue-100 text-blue-800';
       case 'archived': return 'bg-gray-100 text-gray-800';
       default: return 'bg-gray-100 text-gray-800';
     }
@@ -4113,6 +4119,7 @@ const BlogSection = ({ blogs, setBlogs, showMessage }) => {
             <option value="all">All Status</option>
             <option value="published">Published</option>
             <option value="draft">Draft</option>
+            <option value="scheduled">Scheduled</option>
             <option value="archived">Archived</option>
           </select>
         </div>
@@ -4386,7 +4393,7 @@ const BlogSection = ({ blogs, setBlogs, showMessage }) => {
                 {generatingAI ? (
                   <>
                     <div className="animate-spin rounded-full h-4 w-4 border-b-2 border-white"></div>
-                    Generating...
+                    {aiProgress ? `Generating... ${aiProgress.words}/${aiProgress.target_words} words` : 'Generating...'}
                   </>
                 ) : (
                   <>
@@ -4417,6 +4424,14 @@ const BlogSection = ({ blogs, setBlogs, showMessage }) => {
   );
 };
 
+// Format an ISO timestamp for a datetime-local input (local time, minutes precision)
+const toDateTimeInput = (iso) => {
+  if (!iso) return '';
+  const date = new Date(iso);
+  if (isNaN(date)) return '';
+  return new Date(date.getTime() - date.getTimezoneOffset() * 60000).toISOString().slice(0, 16);
+};
+
 // Blog Editor Modal Component
 const BlogEditorModal = ({ blog, onSave, onClose }) => {
   const [formData, setFormData] = useState({
@@ -4432,7 +4447,7 @@ const BlogEditorModal = ({ blog, onSave, onClose }) => {
     seo_title: blog?.seo_title || '',
     seo_description: blog?.seo_description || '',
     reading_time: blog?.reading_time || 0,
-    scheduled_date: blog?.scheduled_date || '',
+    scheduled_date: toDateTimeInput(blog?.scheduled_date),
     meta_keywords: blog?.meta_keywords || '',
     canonical_url: blog?.canonical_url || ''
   });
@@ -4514,7 +4529,7 @@ const BlogEditorModal = ({ blog, onSave, onClose }) => {
         seo_title: blog.seo_title || blog.title || '',
         seo_description: blog.seo_description || blog.excerpt || '',
         reading_time: readingTime,
-        scheduled_date: blog.scheduled_date || '',
+        scheduled_date: toDateTimeInput(blog.scheduled_date),
         meta_keywords: blog.meta_keywords || '',
         canonical_url: blog.canonical_url || ''
       });
@@ -4542,7 +4557,9 @@ const BlogEditorModal = ({ blog, onSave, onClose }) => {
     const blogData = {
       ...formData,
       tags: formData.tags.split(',').map(t => t.trim()).filter(Boolean),
-      images: formData.images || []
+      images: formData.images || [],
+      // The picker is in local time; the server schedules in UTC
+      scheduled_date: formData.scheduled_date ? new Date(formData.scheduled_date).toISOString() : null
     };
     onSave(blogData);
   };
@@ -4790,6 +4807,7 @@ const BlogEditorModal = ({ blog, onSave, onClose }) => {
                     className="w-full px-3 py-2 bg-gray-900 border border-gray-600 rounded-lg text-white focus:outline-none focus:border-red-500"
                   >
                     <option value="draft">Draft</option>
+                    <option value="scheduled">Scheduled</option>
                     <option value="published">Published</option>
                     <option value="archived">Archived</option>
                   </select>
@@ -304,7 +304,7 @@ const Blog = () => {
               <div className="prose prose-invert prose-primary max-w-none">
                 <div
                   className="text-gray-300 leading-relaxed whitespace-pre-wrap"
-                  dangerouslySetInnerHTML={{ __html: selectedBlog.content.replace(/\n/g, '<br />') }}
+                  dangerouslySetInnerHTML={{ __html: selectedBlog.content_html || selectedBlog.content.replace(/\n/g, '<br />') }}
                 />
               </div>
 
@@ -513,7 +513,7 @@ const BlogPage = () => {
           <div className="prose prose-lg prose-invert prose-primary max-w-none mb-12">
             <div
               className="text-gray-300 leading-relaxed blog-content"
-              dangerouslySetInnerHTML={{ __html: selectedBlog.content }}
+              dangerouslySetInnerHTML={{ __html: selectedBlog.content_html || selectedBlog.content }}
             />
           </div>
 
@@ -270,11 +270,25 @@ export const getAnalytics = async () => {
   return await apiCall('/api/analytics');
 };
 
+// Anonymous per-browser id used for unique visitor counting (hashed server-side)
+const getVisitorId = () => {
+  try {
+    let visitorId = localStorage.getItem('visitorId');
+    if (!visitorId) {
+      visitorId = `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+      localStorage.setItem('visitorId', visitorId);
+    }
+    return visitorId;
+  } catch (error) {
+    return null;
+  }
+};
+
 export const trackEvent = async (eventType) => {
   try {
     await apiCall('/api/analytics/track', {
       method: 'POST',
-      body: JSON.stringify({ event_type: eventType }),
+      body: JSON.stringify({ event_type: eventType, visitor_id: getVisitorId() }),
     });
   } catch (error) {
     // Silently fail for analytics
@@ -282,6 +296,12 @@ export const trackEvent = async (eventType) => {
   }
 };
 
+// ==================== PORTFOLIO SNAPSHOT ====================
+// All public sections in one request; the browser revalidates it with its ETag
+export const getPortfolio = async () => {
+  return await apiCall('/api/portfolio');
+};
+
 // ==================== THEME ====================
 export const getTheme = async () => {
   return await apiCall('/api/theme');
@@ -300,11 +320,13 @@ export const getSystemStatus = async () => {
 };
 
 // ==================== BLOG POSTS ====================
-export const getBlogs = async (status = null, category = null, limit = null) => {
+export const getBlogs = async (status = null, category = null, limit = null, view = null) => {
   let url = '/api/blogs?';
   if (status) url += `status=${status}&`;
   if (category) url += `category=${category}&`;
-  if (limit) url += `limit=${limit}`;
+  if (limit) url += `limit=${limit}&`;
+  // The listing omits post content unless view=full is requested
+  if (view) url += `view=${view}`;
   return await apiCall(url);
 };
 
@@ -332,13 +354,42 @@ export const deleteBlog = async (id) => {
   });
 };
 
-export const generateBlogWithAI = async (topic, category, tone = 'professional', length = 'medium') => {
-  return await apiCall('/api/blogs/generate', {
+export const submitBlogGeneration = async (topic, category, tone = 'professional', length = 'medium') => {
+  return await apiCall('/api/blogs/generate/jobs', {
     method: 'POST',
     body: JSON.stringify({ topic, category, tone, length }),
   });
 };
 
+export const getBlogGeneration = async (jobId) => {
+  return await apiCall(`/api/blogs/generate/jobs/${jobId}`);
+};
+
+// Queue the generation and poll the job until it finishes; onProgress receives each job state
+export const generateBlogWithAI = async (topic, category, tone = 'professional', length = 'medium', onProgress = null) => {
+  const { job_id } = await submitBlogGeneration(topic, category, tone, length);
+  for (;;) {
+    await new Promise(resolve => setTimeout(resolve, 2000));
+    const job = await getBlogGeneration(job_id);
+    if (job.status === 'done') return job.result;
+    if (job.status === 'failed') throw new Error(job.error || 'Blog generation failed');
+    if (onProgress) onProgress(job);
+  }
+};
+
+// ==================== SEARCH ====================
+export const searchContent = async (query, { type = null, tag = null, category = null, limit = 10, offset = 0 } = {}) => {
+  let url = `/api/search?q=${encodeURIComponent(query)}&limit=${limit}&offset=${offset}`;
+  if (type) url += `&type=${type}`;
+  if (tag) url += `&tag=${encodeURIComponent(tag)}`;
+  if (category) url += `&category=${encodeURIComponent(category)}`;
+  return await apiCall(url);
+};
+
+export const getSearchSuggestions = async (query, limit = 5) => {
+  return await apiCall(`/api/search/suggest?q=${encodeURIComponent(query)}&limit=${limit}`);
+};
+
 // ==================== SECTION VISIBILITY ====================
 export const getSectionVisibility = async () => {
   return await apiCall('/api/section-visibility');
@@ -67,7 +67,7 @@ export const streamChatMessage = async (message, onChunk) => {
   // This ensures we use the Mem0 integration and don't expose API keys in frontend
   try {
     const backendUrl = process.env.REACT_APP_BACKEND_URL || 'http://localhost:8001';
-    const response = await fetch(`${backendUrl}/api/ai/chat`, {
+    const response = await fetch(`${backendUrl}/api/ai/chat/stream`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -75,23 +75,50 @@ export const streamChatMessage = async (message, onChunk) => {
       body: JSON.stringify({ message }),
     });
 
-    if (!response.ok) {
+    if (!response.ok || !response.body) {
       throw new Error(`HTTP error! status: ${response.status}`);
     }
 
-    const data = await response.json();
-    
-    // Stream the response text character by character for smooth effect
-    const responseText = data.response || data.message || "Sorry, I couldn't generate a response.";
-    const words = responseText.split(' ');
-    
-    for (let i = 0; i < words.length; i++) {
-      onChunk(words[i] + ' ');
-      // Small delay between words to simulate streaming
-      await new Promise(resolve => setTimeout(resolve, 30));
+    // Read Server-Sent Events as they arrive and forward each chunk of text
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    let receivedText = false;
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let eventType = 'message';
+        let payload = '';
+        rawEvent.split('\n').forEach(line => {
+          if (line.startsWith('event:')) eventType = line.slice(6).trim();
+          else if (line.startsWith('data:')) payload += line.slice(5).trim();
+        });
+        if (!payload) continue;
+
+        const data = JSON.parse(payload);
+        if (eventType === 'error') {
+          throw new Error(data.detail || 'AI chat stream failed');
+        }
+        if (eventType === 'message' && data.text) {
+          receivedText = true;
+          onChunk(data.text);
+        }
+      }
+    }
+
+    if (!receivedText) {
+      onChunk("Sorry, I couldn't generate a response.");
     }
   } catch (error) {
     console.error('Error calling AI chat API:', error);
     onChunk("Sorry, I'm having trouble connecting to the AI service. Please try again later.");
   }
-};
\ No newline at end of file
+};
@@ -7,6 +7,9 @@ const app = express();
 app.use(cors());
 app.use(bodyParser.json({ limit: '5mb' }));
 
+// Health probe used by the backend's circuit breaker
+app.get('/health', (req, res) => res.json({ status: 'ok' }));
+
 app.post('/pdf', async (req, res) => {
   const { url, html, options } = req.body || {};
   if (!url && !html) return res.status(400).json({ error: 'Provide url or html in request body' });
@@ -0,0 +1,51 @@
+// Stub converter for local testing of the backend's PDF path without Playwright.
+// Returns a fixed one-page PDF. STUB_MODE=fail answers 500, STUB_MODE=unhealthy fails
+// the health probe too, and STUB_DELAY_MS delays every /pdf response.
+const express = require('express');
+const bodyParser = require('body-parser');
+
+const app = express();
+app.use(bodyParser.json({ limit: '5mb' }));
+
+const mode = process.env.STUB_MODE || 'ok';
+const delay = Number(process.env.STUB_DELAY_MS || 0);
+
+function minimalPdf(text) {
+  const content = `BT /F1 12 Tf 72 770 Td (${text.replace(/[()\\]/g, '')}) Tj ET`;
+  const objects = [
+    '<< /Type /Catalog /Pages 2 0 R >>',
+    '<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+    '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>',
+    `<< /Length ${content.length} >>\nstream\n${content}\nendstream`,
+    '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>'
+  ];
+  let pdf = '%PDF-1.4\n';
+  const offsets = objects.map((body, i) => {
+    const offset = pdf.length;
+    pdf += `${i + 1} 0 obj\n${body}\nendobj\n`;
+    return offset;
+  });
+  const xref = pdf.length;
+  pdf += `xref\n0 ${objects.length + 1}\n0000000000 65535 f \n`;
+  pdf += offsets.map((o) => `${String(o).padStart(10, '0')} 00000 n \n`).join('');
+  pdf += `trailer\n<< /Size ${objects.length + 1} /Root 1 0 R >>\nstartxref\n${xref}\n%%EOF\n`;
+  return Buffer.from(pdf, 'latin1');
+}
+
+app.get('/health', (req, res) => {
+  if (mode === 'unhealthy') return res.status(503).json({ status: 'unhealthy' });
+  res.json({ status: 'ok', stub: true });
+});
+
+app.post('/pdf', (req, res) => {
+  const { url, html } = req.body || {};
+  if (!url && !html) return res.status(400).json({ error: 'Provide url or html in request body' });
+  setTimeout(() => {
+    if (mode !== 'ok') return res.status(500).json({ error: 'Stub converter failure' });
+    res.setHeader('Content-Type', 'application/pdf');
+    res.send(minimalPdf(`Stub PDF: ${(html || url).length} characters received`));
+  }, delay);
+});
+
+const port = process.env.PORT || 4000;
+app.listen(port, () => console.log(`Stub PDF converter (${mode}) listening on ${port}`));